@@ -0,0 +1,115 @@
+import os
+import warnings
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Arguments of seed_data for each scale, named after the number of votes
+SCALES = {
+    "1k": {"users": 200, "restaurants": 10, "days": 10, "items": 5, "votes": 1_000},
+    "100k": {
+        "users": 5_000,
+        "restaurants": 50,
+        "days": 30,
+        "items": 5,
+        "votes": 100_000,
+    },
+    "1m": {
+        "users": 20_000,
+        "restaurants": 100,
+        "days": 60,
+        "items": 5,
+        "votes": 1_000_000,
+    },
+}
+
+SEED_PREFIX = "bench"
+
+
+def get_scale() -> str | None:
+    """
+    Get the scale of the run from the BENCHMARK_SCALE environment variable
+
+    :return: None when the benchmarks are not asked for
+    """
+
+    scale = os.environ.get("BENCHMARK_SCALE", "").lower() or None
+    if scale is not None and scale not in SCALES:
+        raise pytest.UsageError(
+            f"BENCHMARK_SCALE must be one of {', '.join(SCALES)}, not {scale!r}."
+        )
+    return scale
+
+
+def is_time_enforced() -> bool:
+    """
+    Check if the time budgets fail the cases, with the BENCHMARK_ENFORCE_TIME environment variable. The times
+    depend on the machine, so by default a case over its time budget only warns.
+
+    :return:
+    """
+
+    return os.environ.get("BENCHMARK_ENFORCE_TIME", "").lower() in ("1", "true", "yes")
+
+
+def pytest_collection_modifyitems(config, items):
+    # The benchmarks seed their own data, they only run when a scale is asked for
+    if get_scale() is not None:
+        return
+    skip = pytest.mark.skip(reason="Set BENCHMARK_SCALE to 1k, 100k or 1m to run.")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def scale() -> str:
+    return get_scale()
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker, scale):
+    """
+    Seed the test database once for the session. With --reuse-db, the data of a previous run is kept.
+    """
+
+    from core.models import User
+    from voting.seeding import seed_data
+
+    with django_db_blocker.unblock():
+        if not User.objects.filter(username=f"{SEED_PREFIX}-user-0").exists():
+            seed_data(**SCALES[scale], prefix=SEED_PREFIX)
+
+
+@pytest.fixture
+def check_budget(benchmark, scale):
+    """
+    Run a case under the benchmark, and fail it when it runs more queries than its budget. A mean time per run
+    over the budget at the scale of the run warns, or fails the case with BENCHMARK_ENFORCE_TIME.
+    """
+
+    def check(function, *, queries: int, seconds: dict[str, float]):
+        with CaptureQueriesContext(connection) as captured:
+            function()
+        assert (
+            len(captured) <= queries
+        ), f"{len(captured)} queries over the budget of {queries}:\n" + "\n".join(
+            query["sql"] for query in captured
+        )
+
+        benchmark.extra_info["queries"] = len(captured)
+        benchmark.extra_info["budget_seconds"] = seconds[scale]
+        benchmark(function)
+        if benchmark.stats is not None:
+            mean = benchmark.stats.stats.mean
+            if mean > seconds[scale]:
+                message = (
+                    f"{mean * 1000:.2f}ms per run over the budget of "
+                    f"{seconds[scale] * 1000:.2f}ms at {scale} votes"
+                )
+                if is_time_enforced():
+                    pytest.fail(message)
+                warnings.warn(message, stacklevel=2)
+
+    return check
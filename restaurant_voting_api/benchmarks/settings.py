@@ -0,0 +1,13 @@
+from restaurant_voting_api.settings import *
+from restaurant_voting_api.settings import BASE_DIR, env
+
+# The benchmarks run against the configured PostgreSQL database, or a local SQLite file with BENCHMARK_DATABASE=sqlite
+if env("BENCHMARK_DATABASE", default="postgresql") == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "benchmark.sqlite3",
+            # A file, so the seeded data can be kept between runs with --reuse-db
+            "TEST": {"NAME": BASE_DIR / "test_benchmark.sqlite3"},
+        }
+    }
@@ -0,0 +1,57 @@
+import pytest
+from core.models import User
+from restaurants.models import Menu, Restaurant
+from restaurants.serializers import MenuSerializer, RestaurantSerializer
+from voting.models import Vote
+from voting.serializers import VoteSerializer
+
+# The query budgets are exact and do not depend on the scale. The time budgets are the mean seconds per run at each
+# scale, about three times what the cases take on a developer machine, so only a regression fails them.
+pytestmark = pytest.mark.django_db
+
+
+def test_get_votes_for_day(check_budget):
+    check_budget(
+        lambda: Vote.get_votes_for_day(),
+        queries=1,
+        seconds={"1k": 0.005, "100k": 0.006, "1m": 0.006},
+    )
+
+
+def test_get_today_menu(check_budget):
+    check_budget(
+        lambda: list(Vote.get_today_menu()),
+        queries=2,
+        seconds={"1k": 0.01, "100k": 0.01, "1m": 0.012},
+    )
+
+
+def test_get_menu_by_date_serialized(check_budget):
+    check_budget(
+        lambda: MenuSerializer(Menu.get_menu_by_date(), many=True).data,
+        queries=2,
+        seconds={"1k": 0.015, "100k": 0.04, "1m": 0.08},
+    )
+
+
+def test_restaurants_serialized(check_budget):
+    check_budget(
+        lambda: RestaurantSerializer(
+            Restaurant.get_all_restaurants().order_by("id"), many=True
+        ).data,
+        queries=1,
+        seconds={"1k": 0.003, "100k": 0.005, "1m": 0.01},
+    )
+
+
+def test_vote_serializer_validate(check_budget):
+    # A user who has not voted yet, for a menu of today
+    user = User.objects.create(username="benchmark-voter")
+    menu = Menu.get_menu_by_date().first()
+    data = {"user": user, "menu": menu}
+
+    check_budget(
+        lambda: VoteSerializer().validate(data),
+        queries=2,
+        seconds={"1k": 0.003, "100k": 0.003, "1m": 0.003},
+    )
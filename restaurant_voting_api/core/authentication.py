@@ -0,0 +1,164 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken, Token
+
+from .metrics import cache_requests
+from .models import User
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from the claims of a validated access token. The User row is loaded on first access to an attribute
+    that is not a claim, so views that only read the ID or the admin flag run no query for the user.
+    """
+
+    @cached_property
+    def username(self) -> str:
+        if "username" in self.token:
+            return self.token["username"]
+        return self.instance.username
+
+    @cached_property
+    def is_admin(self) -> bool:
+        # Tokens issued before the claims were added do not carry it
+        if "is_admin" in self.token:
+            return self.token["is_admin"]
+        return self.instance.is_admin
+
+    @cached_property
+    def instance(self) -> User:
+        """
+        Load the user of the token
+
+        :return:
+        """
+
+        return User.objects.get(pk=self.id)
+
+    def __getattr__(self, attr: str):
+        if attr.startswith("_") or attr == "token":
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.instance, attr)
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified access tokens, keyed by a digest of the encoded token. An entry never outlives
+    the expiry of its token, nor the TTL of the cache.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[Token, float]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, raw_token: bytes) -> Token | None:
+        """
+        Get the verified token of an encoded token, if it was verified before and did not expire since
+
+        :param raw_token:
+        :return:
+        """
+
+        key = self.get_key(raw_token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                cache_requests.inc(cache="verified-token", result="miss")
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            cache_requests.inc(cache="verified-token", result="hit")
+            return entry[0]
+
+    def set(self, raw_token: bytes, token: Token) -> None:
+        """
+        Store a verified token, evicting the least recently used one when the cache is full
+
+        :param raw_token:
+        :param token:
+        :return:
+        """
+
+        key = self.get_key(raw_token)
+        expires = min(token["exp"], time.time() + self.ttl)
+        with self.lock:
+            self.entries[key] = (token, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Drop every entry and reset the counters
+
+        :return:
+        """
+
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    @staticmethod
+    def get_key(raw_token: bytes) -> str:
+        """
+        Get the cache key of an encoded token
+
+        :param raw_token:
+        :return:
+        """
+
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).hexdigest()
+
+
+verified_tokens = VerifiedTokenCache(
+    max_size=settings.VERIFIED_TOKEN_CACHE["MAX_SIZE"],
+    ttl=settings.VERIFIED_TOKEN_CACHE["TTL"],
+)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authenticates requests from the claims of their access token like JWTStatelessUserAuthentication, skipping
+    the signature and claim checks of access tokens verified before.
+
+    Only access tokens are cached. Refresh tokens, which are rotated and blacklisted, are always verified.
+    """
+
+    token_cache = verified_tokens
+
+    def get_validated_token(self, raw_token: bytes) -> Token:
+        """
+        Get the verified token of an encoded token from the cache, or verify it
+
+        :param raw_token:
+        :return:
+        """
+
+        if not settings.VERIFIED_TOKEN_CACHE["ENABLED"]:
+            return super().get_validated_token(raw_token)
+
+        token = self.token_cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            if isinstance(token, AccessToken):
+                self.token_cache.set(raw_token, token)
+        return token
@@ -0,0 +1,189 @@
+import math
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+from uuid import uuid4
+
+from django.core.cache import caches
+
+from .metrics import cache_requests
+
+# Seconds between two looks at the cache while waiting for another worker to compute a missing value
+WAIT_INTERVAL = 0.01
+
+# Keys computed in the process, a key is removed once computed so the set does not grow with the keys
+_computing: set[str] = set()
+_computing_lock = threading.Lock()
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], Any],
+    *,
+    timeout: float,
+    version: str | None = None,
+    alias: str = "default",
+    beta: float = 1.0,
+    lock_timeout: float = 10.0,
+) -> Any:
+    """
+    Get a value from the cache, computing it in a single worker when it is missing or stale.
+
+    A value is stale once its version differs from the given one or its timeout has passed. Before that it is
+    refreshed early with a probability that grows as the expiry gets closer and as the computation gets slower
+    (probabilistic early expiration with the given beta), so the refresh usually happens before the value expires.
+
+    Only the worker holding the lock of the key computes the value. The lock is taken in the process first, then
+    in the cache backend with an atomic add, so it works across threads and across processes sharing the backend.
+    The other workers serve the expired value meanwhile if it has the given version. A value of an older version is
+    never served, since the caller may already have sent the new version as a validator, e.g. an ETag, so they wait
+    for the value of the given version instead.
+
+    :param key: The part before the first colon names the cache in the metrics
+    :param compute: Function computing the value
+    :param timeout: Seconds the value stays fresh
+    :param version: Version the value must have, e.g. a version stamp of its source data
+    :param alias: Cache alias
+    :param beta: Eagerness of the early refresh, 0 disables it
+    :param lock_timeout: Seconds after which the lock of a crashed worker expires
+    :return:
+    """
+
+    cache = caches[alias]
+    entry = cache.get(key)
+    if entry is not None and is_fresh(entry, version, beta):
+        cache_requests.inc(cache=key.split(":")[0], result="hit")
+        return entry["value"]
+    cache_requests.inc(cache=key.split(":")[0], result="miss")
+
+    token = acquire_lock(cache, key, lock_timeout)
+    if token is None:
+        if entry is not None and entry["version"] == version:
+            return entry["value"]
+        return wait_for_value(cache, key, compute, version, lock_timeout)
+
+    try:
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        cache.set(
+            key,
+            {
+                "value": value,
+                "version": version,
+                "delta": delta,
+                "expires": time.time() + timeout,
+            },
+            # Keep the value after it expired, so it can be served while it is recomputed
+            timeout * 2 + lock_timeout,
+        )
+        return value
+    finally:
+        release_lock(cache, key, token)
+
+
+def is_fresh(entry: dict, version: str | None, beta: float) -> bool:
+    """
+    Check if a cached entry can be served without recomputing it
+
+    :param entry:
+    :param version:
+    :param beta:
+    :return:
+    """
+
+    if entry["version"] != version:
+        return False
+
+    # 1 - random() is in (0, 1], so the logarithm is defined and never positive
+    early = -entry["delta"] * beta * math.log(1.0 - random.random())
+    return time.time() + early < entry["expires"]
+
+
+def wait_for_value(
+    cache,
+    key: str,
+    compute: Callable[[], Any],
+    version: str | None,
+    lock_timeout: float,
+) -> Any:
+    """
+    Wait for the worker holding the lock to store the value, computing it here if that takes longer than the lock
+
+    :param cache:
+    :param key:
+    :param compute:
+    :param version:
+    :param lock_timeout:
+    :return:
+    """
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry["version"] == version:
+            return entry["value"]
+    return compute()
+
+
+def acquire_lock(cache, key: str, lock_timeout: float) -> str | None:
+    """
+    Take the compute lock of a key in the process and in the cache backend
+
+    :param cache:
+    :param key:
+    :param lock_timeout:
+    :return: A token to release the lock with, or None if another worker holds it
+    """
+
+    with _computing_lock:
+        if key in _computing:
+            return None
+        _computing.add(key)
+
+    token = uuid4().hex
+    if not cache.add(get_lock_key(key), token, lock_timeout):
+        release_local_lock(key)
+        return None
+    return token
+
+
+def release_lock(cache, key: str, token: str) -> None:
+    """
+    Release the compute lock of a key, unless it expired and was taken by another worker meanwhile
+
+    :param cache:
+    :param key:
+    :param token:
+    :return:
+    """
+
+    if cache.get(get_lock_key(key)) == token:
+        cache.delete(get_lock_key(key))
+    release_local_lock(key)
+
+
+def release_local_lock(key: str) -> None:
+    """
+    Release the compute lock of a key in the process
+
+    :param key:
+    :return:
+    """
+
+    with _computing_lock:
+        _computing.discard(key)
+
+
+def get_lock_key(key: str) -> str:
+    """
+    Get the cache key of the compute lock of a key
+
+    :param key:
+    :return:
+    """
+
+    return f"lock:{key}"
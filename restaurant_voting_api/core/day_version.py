@@ -0,0 +1,110 @@
+from datetime import date, datetime
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+# Seconds a version stamp is kept. An expired stamp is recreated, which only costs the clients one full response.
+DAY_VERSION_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def get_day_version(day: date | None = None) -> tuple[str, datetime]:
+    """
+    Get the version stamp of the menus, items and votes of a day, creating it on first use.
+    By default, it returns the version of today.
+
+    :param day:
+    :return: The version token and the time of the last change
+    """
+
+    cache = caches[settings.DAY_VERSION_CACHE]
+    key = get_day_version_key(day or date.today())
+
+    version = cache.get(key)
+    if version is None:
+        # Another process may create the stamp at the same time, keep the one that was stored first
+        cache.add(key, new_day_version(), DAY_VERSION_TIMEOUT)
+        version = cache.get(key) or new_day_version()
+    return version
+
+
+def bump_day_version(day: date) -> None:
+    """
+    Change the version stamp of a day once the current transaction commits, so no client gets the new
+    version together with data read before the change was visible.
+
+    :param day:
+    :return:
+    """
+
+    transaction.on_commit(
+        lambda: caches[settings.DAY_VERSION_CACHE].set(
+            get_day_version_key(day), new_day_version(), DAY_VERSION_TIMEOUT
+        )
+    )
+
+
+def get_day_version_key(day: date) -> str:
+    """
+    Get the cache key of the version stamp of a day
+
+    :param day:
+    :return:
+    """
+
+    return f"day-version:{day.isoformat()}"
+
+
+def new_day_version() -> tuple[str, datetime]:
+    """
+    Create a version stamp, HTTP dates only have a precision of seconds
+
+    :return:
+    """
+
+    return uuid4().hex, timezone.now().replace(microsecond=0)
+
+
+def get_request_day_version(request) -> tuple[str, datetime]:
+    """
+    Get the version of today once per request, the ETag and Last-Modified checks both need it
+
+    :param request:
+    :return:
+    """
+
+    if not hasattr(request, "day_version"):
+        request.day_version = get_day_version()
+    return request.day_version
+
+
+def today_etag(request, *args, **kwargs) -> str:
+    """
+    ETag of a response built from today's data
+
+    :param request:
+    :return:
+    """
+
+    return get_request_day_version(request)[0]
+
+
+def today_last_modified(request, *args, **kwargs) -> datetime:
+    """
+    Last-Modified of a response built from today's data
+
+    :param request:
+    :return:
+    """
+
+    return get_request_day_version(request)[1]
+
+
+# Answers If-None-Match / If-Modified-Since of a GET of today's data with a 304 before the view runs
+today_conditional = method_decorator(
+    condition(etag_func=today_etag, last_modified_func=today_last_modified)
+)
@@ -0,0 +1,112 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_request_timings: ContextVar["RequestTimings | None"] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class RequestTimings:
+    """
+    Time spent by a request in the database and in named spans, like the serializers.
+    """
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.spans: dict[str, float] = {}
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper counting the queries and their time
+
+        :param execute:
+        :param sql:
+        :param params:
+        :param many:
+        :param context:
+        :return:
+        """
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+    def add_span(self, name: str, seconds: float) -> None:
+        """
+        Add time to a named span
+
+        :param name:
+        :param seconds:
+        :return:
+        """
+
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def get_server_timing(self, total: float) -> str:
+        """
+        Format the timings as a Server-Timing header value, in milliseconds
+
+        :param total: Seconds spent by the whole request
+        :return:
+        """
+
+        metrics = [
+            f"total;dur={total * 1000:.1f}",
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+        ]
+        metrics += [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items()
+        ]
+        return ", ".join(metrics)
+
+
+def get_request_timings() -> RequestTimings | None:
+    """
+    Get the timings of the current request, None when it is not instrumented
+
+    :return:
+    """
+
+    return _request_timings.get()
+
+
+@contextmanager
+def instrument_request(timings: RequestTimings):
+    """
+    Make the timings the ones of the current request
+
+    :param timings:
+    :return:
+    """
+
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+@contextmanager
+def measure(name: str):
+    """
+    Add the time spent in the block to a span of the current request, if it is instrumented
+
+    :param name:
+    :return:
+    """
+
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_span(name, time.perf_counter() - started)
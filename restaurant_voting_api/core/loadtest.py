@@ -0,0 +1,355 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from rest_framework.test import APIClient
+
+from .models import User
+
+DEFAULT_MIX = {
+    "token": 1,
+    "menu": 10,
+    "today": 8,
+    "statistics": 2,
+    "vote": 4,
+}
+
+
+def get_lunch_rate(progress: float) -> float:
+    """
+    Share of the peak rate at a point of the lunch spike: a ramp up over the first 20% of the run from a tenth
+    of the peak, the peak until 60%, then a ramp down to a tenth of the peak
+
+    :param progress: Elapsed share of the run, from 0 to 1
+    :return:
+    """
+
+    if progress < 0.2:
+        return 0.1 + 0.9 * progress / 0.2
+    if progress < 0.6:
+        return 1.0
+    return 1.0 - 0.9 * (progress - 0.6) / 0.4
+
+
+PROFILES = {
+    "constant": lambda progress: 1.0,
+    "lunch": get_lunch_rate,
+}
+
+
+def get_credentials(
+    count: int, password: str, prefix: str = "loadtest"
+) -> list[tuple[str, str]]:
+    """
+    Create the users of the load test, or reuse them from a previous run. They share a password,
+    so it is hashed once.
+
+    :param count:
+    :param password:
+    :param prefix:
+    :return: The username and password of each user
+    """
+
+    usernames = [f"{prefix}-user-{index}" for index in range(count)]
+    existing = set(
+        User.objects.filter(username__in=usernames).values_list("username", flat=True)
+    )
+    hashed_password = make_password(password)
+    User.objects.bulk_create(
+        User(
+            username=username,
+            email=f"{username}@example.com",
+            password=hashed_password,
+        )
+        for username in usernames
+        if username not in existing
+    )
+    # The existing users may have another password, from a run with another one
+    User.objects.filter(username__in=existing).update(password=hashed_password)
+    return [(username, password) for username in usernames]
+
+
+class ClientTransport:
+    """
+    Sends the requests through the test client of the process, against the configured database. The exceptions
+    of the views are returned as 500 responses, like a server does.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def request(
+        self, method: str, path: str, body: dict | None, token: str | None
+    ) -> tuple[int, bytes]:
+        if not hasattr(self.local, "client"):
+            self.local.client = APIClient(
+                raise_request_exception=False, HTTP_HOST="localhost"
+            )
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        response = getattr(self.local.client, method.lower())(
+            path, body, format="json", **headers
+        )
+        return response.status_code, response.content
+
+    def close(self) -> None:
+        connection.close()
+
+
+class HttpTransport:
+    """
+    Sends the requests to a running server, over one keep-alive connection per worker
+    """
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.local = threading.local()
+
+    def request(
+        self, method: str, path: str, body: dict | None, token: str | None
+    ) -> tuple[int, bytes]:
+        if not hasattr(self.local, "connection"):
+            self.local.connection = self.connection_class(self.netloc, timeout=30)
+
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        try:
+            self.local.connection.request(
+                method,
+                self.prefix + path,
+                json.dumps(body) if body is not None else None,
+                headers,
+            )
+            response = self.local.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next request
+            self.local.connection.close()
+            del self.local.connection
+            raise
+
+    def close(self) -> None:
+        if hasattr(self.local, "connection"):
+            self.local.connection.close()
+
+
+class LoadTest:
+    """
+    Drives the API routes with a weighted mix of requests from concurrent workers, at a rate following a profile,
+    and records the latency and the status of every request by endpoint, or the type of the exception raised by
+    the transport for the requests that failed.
+
+    The requests are paced with a shared schedule, so the workers send them at the target rate as long as the
+    server keeps up. The run reports the achieved throughput when it does not.
+    """
+
+    def __init__(
+        self,
+        transport,
+        *,
+        credentials: list[tuple[str, str]],
+        mix: dict[str, float] | None = None,
+        concurrency: int = 8,
+        rate: float = 50.0,
+        duration: float = 900.0,
+        profile: str = "lunch",
+        seed: int = 0,
+    ):
+        self.transport = transport
+        self.credentials = credentials
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.profile = PROFILES[profile]
+        self.seed = seed
+
+        self.lock = threading.Lock()
+        self.results: dict[str, list[tuple[float, int | str]]] = defaultdict(list)
+        self.tokens: list[str] = []
+        self.menu_ids: list[int] = []
+        self.started = 0.0
+        self.next_at = 0.0
+
+    def setup(self) -> None:
+        """
+        Get a token for every user and the menus of today to vote for
+
+        :return:
+        """
+
+        for username, password in self.credentials:
+            status, content = self.transport.request(
+                "POST",
+                "/authentication/token/",
+                {"username": username, "password": password},
+                None,
+            )
+            if status != 200:
+                raise RuntimeError(f"Could not get a token for {username}: {status}")
+            self.tokens.append(json.loads(content)["access"])
+
+        status, content = self.transport.request(
+            "GET", "/restaurants/menu/", None, self.tokens[0]
+        )
+        if status == 200:
+            self.menu_ids = [menu["id"] for menu in json.loads(content)]
+        if not self.menu_ids:
+            raise RuntimeError("There is no menu today to vote for.")
+
+    def run(self) -> dict:
+        """
+        Run the load test for its duration
+
+        :return: The report of the run
+        """
+
+        self.setup()
+        self.started = self.next_at = time.monotonic()
+        workers = [
+            threading.Thread(target=self.work, args=(self.seed + index,))
+            for index in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return self.get_report(time.monotonic() - self.started)
+
+    def get_slot(self) -> float | None:
+        """
+        Take the time of the next request from the shared schedule
+
+        :return: The time to send it at, or None when the run is over
+        """
+
+        with self.lock:
+            slot = max(self.next_at, time.monotonic())
+            progress = (slot - self.started) / self.duration
+            if progress >= 1:
+                return None
+            self.next_at = slot + 1 / (self.rate * self.profile(progress))
+            return slot
+
+    def work(self, seed: int) -> None:
+        """
+        Send requests until the run is over
+
+        :param seed:
+        :return:
+        """
+
+        rng = random.Random(seed)
+        endpoints, weights = zip(*self.mix.items(), strict=True)
+        try:
+            while (slot := self.get_slot()) is not None:
+                time.sleep(max(slot - time.monotonic(), 0))
+                endpoint = rng.choices(endpoints, weights)[0]
+                started = time.perf_counter()
+                try:
+                    status = self.send(endpoint, rng)
+                except (OSError, http.client.HTTPException) as error:
+                    status = type(error).__name__
+                latency = time.perf_counter() - started
+                with self.lock:
+                    self.results[endpoint].append((latency, status))
+        finally:
+            self.transport.close()
+
+    def send(self, endpoint: str, rng: random.Random) -> int:
+        """
+        Send a request to an endpoint
+
+        :param endpoint:
+        :param rng:
+        :return: The status code
+        """
+
+        token = rng.choice(self.tokens)
+        if endpoint == "token":
+            username, password = rng.choice(self.credentials)
+            return self.transport.request(
+                "POST",
+                "/authentication/token/",
+                {"username": username, "password": password},
+                None,
+            )[0]
+        if endpoint == "menu":
+            return self.transport.request("GET", "/restaurants/menu/", None, token)[0]
+        if endpoint == "today":
+            return self.transport.request("GET", "/voting/today/", None, token)[0]
+        if endpoint == "statistics":
+            return self.transport.request("GET", "/voting/", None, token)[0]
+        if endpoint == "vote":
+            return self.transport.request(
+                "POST", "/voting/", {"menu": rng.choice(self.menu_ids)}, token
+            )[0]
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+    def get_report(self, elapsed: float) -> dict:
+        """
+        Summarize the results by endpoint
+
+        :param elapsed: Seconds the run took
+        :return:
+        """
+
+        endpoints = {}
+        for endpoint, results in sorted(self.results.items()):
+            latencies = sorted(latency for latency, _ in results)
+            statuses = defaultdict(int)
+            for _, status in results:
+                statuses[str(status)] += 1
+            # Failed requests are counted by exception type
+            errors = sum(
+                count
+                for status, count in statuses.items()
+                if not status.isdigit() or int(status) >= 500
+            )
+            endpoints[endpoint] = {
+                "requests": len(results),
+                "throughput": round(len(results) / elapsed, 2),
+                "p50_ms": round(get_percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(get_percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(get_percentile(latencies, 99) * 1000, 2),
+                "error_rate": round(errors / len(results), 4),
+                "statuses": dict(sorted(statuses.items())),
+            }
+
+        total = sum(endpoint["requests"] for endpoint in endpoints.values())
+        return {
+            "duration_s": round(elapsed, 2),
+            "concurrency": self.concurrency,
+            "peak_rate": self.rate,
+            "requests": total,
+            "throughput": round(total / elapsed, 2),
+            "endpoints": endpoints,
+        }
+
+
+def get_percentile(values: list[float], percentile: float) -> float:
+    """
+    Get a percentile of sorted values with the nearest-rank method
+
+    :param values:
+    :param percentile:
+    :return:
+    """
+
+    if not values:
+        return 0.0
+    rank = max(int(-(-percentile * len(values) // 100)), 1)
+    return values[rank - 1]
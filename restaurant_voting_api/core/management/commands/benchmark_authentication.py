@@ -0,0 +1,83 @@
+import time
+
+from core.authentication import StatelessJWTAuthentication, verified_tokens
+from core.models import User
+from core.tokens import ClaimsRefreshToken
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the queries and the time per request of authenticating a JWT and reading the user ID and "
+        "admin flag, with the user loaded from the database, built from the token claims, and built from the "
+        "claims of a cached verified token."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=2000,
+            help="Number of requests to authenticate with each backend.",
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username=f"auth-benchmark-{time.time_ns()}")
+        token = str(ClaimsRefreshToken.for_user(user).access_token)
+
+        try:
+            for name, authentication, cache_enabled in (
+                ("database", JWTAuthentication(), False),
+                ("claims", JWTStatelessUserAuthentication(), False),
+                ("cached", StatelessJWTAuthentication(), True),
+            ):
+                verified_tokens.clear()
+                with override_settings(
+                    VERIFIED_TOKEN_CACHE={
+                        **settings.VERIFIED_TOKEN_CACHE,
+                        "ENABLED": cache_enabled,
+                    }
+                ):
+                    queries, elapsed = self.run_backend(
+                        authentication, token, options["requests"]
+                    )
+                self.stdout.write(
+                    f"backend={name:<9} "
+                    f"queries/request={queries / options['requests']:.2f} "
+                    f"time/request={elapsed / options['requests'] * 1e6:.0f}us "
+                    f"cache_hits={verified_tokens.hits} "
+                    f"cache_misses={verified_tokens.misses}"
+                )
+        finally:
+            user.delete()
+
+    @staticmethod
+    def run_backend(authentication, token: str, requests: int) -> tuple[int, float]:
+        """
+        Authenticate the token the given number of times and read what the views read from the user
+
+        :param authentication:
+        :param token:
+        :param requests:
+        :return: The number of queries run and the seconds spent
+        """
+
+        factory = APIRequestFactory()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(requests):
+                request = factory.get("/voting/", HTTP_AUTHORIZATION=f"Bearer {token}")
+                user, _ = authentication.authenticate(request)
+                # Read what the views read from the user
+                _ = (user.id, user.is_admin)
+            elapsed = time.perf_counter() - started
+        return len(queries), elapsed
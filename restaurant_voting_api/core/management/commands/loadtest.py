@@ -0,0 +1,104 @@
+import json
+
+from core.loadtest import (
+    DEFAULT_MIX,
+    PROFILES,
+    ClientTransport,
+    HttpTransport,
+    LoadTest,
+    get_credentials,
+)
+from django.core.management.base import BaseCommand, CommandError
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """
+    Parse a request mix like "menu=10,vote=4"
+
+    :param value:
+    :return:
+    """
+
+    mix = {}
+    for pair in value.split(","):
+        endpoint, _, weight = pair.partition("=")
+        if endpoint not in DEFAULT_MIX:
+            raise CommandError(
+                f"Unknown endpoint {endpoint!r}, expected one of {', '.join(DEFAULT_MIX)}."
+            )
+        try:
+            mix[endpoint] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight for {endpoint}: {weight!r}") from None
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the API with a weighted mix of token, menu, statistics and vote requests from concurrent "
+        "workers, following the lunch spike by default, and report the throughput, the latency percentiles and "
+        "the error rate of each endpoint as JSON. Run seed_data first, so there are menus today."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="URL of a running server, e.g. http://127.0.0.1:8000. "
+            "The requests go through the test client of this process without it.",
+        )
+        parser.add_argument(
+            "--mix",
+            default=",".join(
+                f"{name}={weight}" for name, weight in DEFAULT_MIX.items()
+            ),
+            help="Weight of each endpoint, among token, menu, today, statistics and vote.",
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=50,
+            help="Peak number of requests per second.",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=900,
+            help="Seconds the run lasts, the 15 minutes of the lunch spike by default.",
+        )
+        parser.add_argument("--profile", choices=sorted(PROFILES), default="lunch")
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=100,
+            help="Number of users sending the requests, created on the first run.",
+        )
+        parser.add_argument("--password", default="loadtest-password")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="File to write the report to.")
+
+    def handle(self, *args, **options):
+        credentials = get_credentials(options["users"], options["password"])
+        transport = (
+            HttpTransport(options["url"]) if options["url"] else ClientTransport()
+        )
+        load_test = LoadTest(
+            transport,
+            credentials=credentials,
+            mix=parse_mix(options["mix"]),
+            concurrency=options["concurrency"],
+            rate=options["rate"],
+            duration=options["duration"],
+            profile=options["profile"],
+            seed=options["seed"],
+        )
+        try:
+            report = load_test.run()
+        except RuntimeError as error:
+            raise CommandError(error) from error
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        self.stdout.write(output)
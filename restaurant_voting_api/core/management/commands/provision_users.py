@@ -0,0 +1,106 @@
+import json
+import time
+from pathlib import Path
+
+from core.models import User
+from core.provisioning import ProvisioningError, parse_users, provision_users
+from core.serializers import UserSerializer
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the users listed in a CSV file with a username,email,password header or in a JSON array, "
+        "hashing their passwords across a process pool, and report the throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file with the users.")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "json"),
+            help="Format of the file, guessed from its extension by default.",
+        )
+        parser.add_argument(
+            "--admin", action="store_true", help="Create the users as admins."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of hashing processes, defaults to the number of CPUs.",
+        )
+        parser.add_argument(
+            "--tokens",
+            help="Write the created users with a jwt token for each to this JSON file.",
+        )
+        parser.add_argument(
+            "--compare",
+            type=int,
+            default=0,
+            help="Also create this many users one at a time like the registration endpoint, and delete them, "
+            "to compare the throughput.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        try:
+            rows = parse_users(path.read_text(encoding="utf-8"), file_format)
+        except (OSError, ValueError) as error:
+            raise CommandError(error) from error
+
+        started = time.perf_counter()
+        try:
+            created = provision_users(
+                rows,
+                is_admin=options["admin"],
+                with_tokens=bool(options["tokens"]),
+                workers=options["workers"],
+            )
+        except ProvisioningError as error:
+            for index, errors in sorted(error.errors.items()):
+                self.stderr.write(f"user {index}: {json.dumps(errors)}")
+            raise CommandError(
+                f"{len(error.errors)} invalid users, none created."
+            ) from None
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(created)} users in {elapsed:.2f}s "
+                f"({len(created) / elapsed:.0f} users/s)."
+            )
+        )
+
+        if options["tokens"]:
+            Path(options["tokens"]).write_text(json.dumps(created, indent=2))
+
+        if options["compare"]:
+            rate = self.run_single(options["compare"])
+            self.stdout.write(f"Single-user path: {rate:.0f} users/s.")
+
+    @staticmethod
+    def run_single(count: int) -> float:
+        """
+        Create users one at a time through the registration serializer, then delete them
+
+        :param count:
+        :return: The number of users created per second
+        """
+
+        prefix = f"provision-single-{time.time_ns()}"
+        started = time.perf_counter()
+        for index in range(count):
+            serializer = UserSerializer(
+                data={
+                    "username": f"{prefix}-{index}",
+                    "email": f"{prefix}-{index}@example.com",
+                    "password": f"{prefix}-password",
+                }
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        elapsed = time.perf_counter() - started
+
+        User.objects.filter(username__startswith=prefix).delete()
+        return count / elapsed
@@ -0,0 +1,12 @@
+from core.token_blacklist import token_blacklist
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Delete the blacklisted refresh tokens that have expired. Run it on a schedule, e.g. daily."
+
+    def handle(self, *args, **options):
+        deleted = token_blacklist.prune_table()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired blacklisted tokens.")
+        )
@@ -0,0 +1,78 @@
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize the slow query log by SQL fingerprint, with the number of runs, the total and maximum "
+        "duration, and the views and application code that ran them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=settings.SLOW_QUERY_LOG["PATH"],
+            help="Slow query log, its rotated files are read as well.",
+        )
+        parser.add_argument(
+            "--top", type=int, default=10, help="Number of fingerprints to show."
+        )
+        parser.add_argument(
+            "--sort",
+            choices=("total", "count", "max"),
+            default="total",
+            help="Order of the fingerprints.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        paths = sorted(path.parent.glob(f"{path.name}*"))
+        if not paths:
+            self.stdout.write(f"No slow query log at {path}.")
+            return
+
+        groups = defaultdict(
+            lambda: {
+                "count": 0,
+                "total": 0.0,
+                "max": 0.0,
+                "sql": "",
+                "views": Counter(),
+                "call_sites": Counter(),
+            }
+        )
+        for log_path in paths:
+            with log_path.open(encoding="utf-8") as log:
+                for line in log:
+                    try:
+                        query = json.loads(line)
+                    except ValueError:
+                        continue
+                    group = groups[query["fingerprint"]]
+                    group["count"] += 1
+                    group["total"] += query["duration_ms"]
+                    if query["duration_ms"] >= group["max"]:
+                        group["max"] = query["duration_ms"]
+                        group["sql"] = query["sql"]
+                    group["views"][query["view"]] += 1
+                    group["call_sites"][query["call_site"]] += 1
+
+        ranked = sorted(
+            groups.items(), key=lambda item: item[1][options["sort"]], reverse=True
+        )
+        for fingerprint, group in ranked[: options["top"]]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{group['count']} runs, {group['total']:.0f}ms total, "
+                    f"{group['total'] / group['count']:.1f}ms mean, {group['max']:.1f}ms max"
+                )
+            )
+            self.stdout.write(f"  {fingerprint}")
+            for call_site, count in group["call_sites"].most_common(3):
+                self.stdout.write(f"  {count:>6} from {call_site}")
+            for view, count in group["views"].most_common(3):
+                self.stdout.write(f"  {count:>6} in {view}")
@@ -0,0 +1,333 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Registry:
+    """
+    Registry of the metrics of the process, exposed in the Prometheus text format.
+
+    With settings.METRICS["MULTIPROCESS_DIR"] set, each process writes a snapshot of its metrics to its own file
+    in that directory, at most every FLUSH_INTERVAL seconds and when it exits, and the exposition sums the
+    snapshots of every process. The directory has to be shared by the workers and emptied when they are
+    deployed, like the multiprocess mode of the Prometheus client.
+    """
+
+    def __init__(self, process_id: str | None = None):
+        # Read from the PID on each flush by default, the registry is created before the workers are forked
+        self.process_id = process_id
+        self.metrics: dict[str, Metric] = {}
+        self.lock = threading.Lock()
+        self.flushed_at = 0.0
+
+    def register(self, metric: "Metric") -> None:
+        """
+        Add a metric to the registry
+
+        :param metric:
+        :return:
+        """
+
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric {metric.name} is already registered.")
+            self.metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        """
+        Get the samples of every metric of the process
+
+        :return:
+        """
+
+        with self.lock:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def get_directory(self) -> Path | None:
+        """
+        Get the directory shared by the processes, None when the metrics are not aggregated across processes
+
+        :return:
+        """
+
+        directory = settings.METRICS["MULTIPROCESS_DIR"]
+        return Path(directory) if directory else None
+
+    def flush(self, *, force: bool = False) -> None:
+        """
+        Write the snapshot of the process to the shared directory, at most every FLUSH_INTERVAL seconds unless forced
+
+        :param force:
+        :return:
+        """
+
+        directory = self.get_directory()
+        if directory is None:
+            return
+        if (
+            not force
+            and time.monotonic() - self.flushed_at < settings.METRICS["FLUSH_INTERVAL"]
+        ):
+            return
+
+        self.flushed_at = time.monotonic()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"metrics-{self.process_id or os.getpid()}.json"
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.write_text(json.dumps(self.snapshot()))
+        # Readers only ever see a complete snapshot
+        os.replace(temporary_path, path)
+
+    def collect(self) -> dict:
+        """
+        Get the samples of every metric, summed across the processes in the multiprocess mode
+
+        :return:
+        """
+
+        directory = self.get_directory()
+        if directory is None:
+            return self.snapshot()
+
+        self.flush(force=True)
+        collected: dict = {}
+        for path in sorted(directory.glob("metrics-*.json")):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                # The file of a process that exited while it was written
+                continue
+            for name, metric in snapshot.items():
+                merge_snapshot(collected, name, metric)
+        return collected
+
+    def expose(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+
+        :return:
+        """
+
+        lines = []
+        for name, metric in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for labels, value in sorted(
+                metric["samples"], key=lambda sample: sample[0]
+            ):
+                label_pairs = list(zip(metric["labelnames"], labels, strict=True))
+                if metric["type"] == "counter":
+                    lines.append(f"{name}{format_labels(label_pairs)} {value}")
+                    continue
+
+                *buckets, total, count = value
+                cumulative = 0
+                for bound, bucket in zip(metric["buckets"], buckets, strict=True):
+                    cumulative += bucket
+                    le = bound if bound == "+Inf" else repr(float(bound))
+                    lines.append(
+                        f"{name}_bucket{format_labels([*label_pairs, ('le', le)])} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{format_labels(label_pairs)} {total}")
+                lines.append(f"{name}_count{format_labels(label_pairs)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def merge_snapshot(collected: dict, name: str, metric: dict) -> None:
+    """
+    Add the samples of a metric from the snapshot of a process to the collected samples
+
+    :param collected:
+    :param name:
+    :param metric:
+    :return:
+    """
+
+    target = collected.setdefault(name, {**metric, "samples": []})
+    samples = {tuple(labels): value for labels, value in target["samples"]}
+    for labels, value in metric["samples"]:
+        labels = tuple(labels)
+        if labels not in samples:
+            samples[labels] = value
+        elif isinstance(value, list):
+            samples[labels] = [
+                a + b for a, b in zip(samples[labels], value, strict=True)
+            ]
+        else:
+            samples[labels] += value
+    target["samples"] = [[list(labels), value] for labels, value in samples.items()]
+
+
+def format_labels(label_pairs: list[tuple[str, str]]) -> str:
+    """
+    Format label pairs as a Prometheus label set
+
+    :param label_pairs:
+    :return:
+    """
+
+    if not label_pairs:
+        return ""
+    escaped = (
+        (
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in label_pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+registry = Registry()
+atexit.register(lambda: registry.flush(force=True))
+
+
+class Metric:
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        metrics_registry: Registry | None = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.registry = metrics_registry or registry
+        self.values: dict[tuple[str, ...], object] = {}
+        self.registry.register(self)
+
+    def get_key(self, labels: dict) -> tuple[str, ...]:
+        """
+        Get the label values in the order of the label names
+
+        :param labels:
+        :return:
+        """
+
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} has the labels {self.labelnames}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict:
+        """
+        Get the description and the samples of the metric, the caller holds the registry lock
+
+        :return:
+        """
+
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [
+                [list(labels), list(value) if isinstance(value, list) else value]
+                for labels, value in self.values.items()
+            ],
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """
+        Increment the counter of the labels
+
+        :param amount:
+        :param labels:
+        :return:
+        """
+
+        key = self.get_key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        metrics_registry: Registry | None = None,
+    ):
+        self.buckets = (*sorted(buckets), math.inf)
+        super().__init__(
+            name, documentation, labelnames, metrics_registry=metrics_registry
+        )
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Count a value in the first bucket it fits in
+
+        :param value:
+        :param labels:
+        :return:
+        """
+
+        key = self.get_key(labels)
+        index = next(
+            index for index, bound in enumerate(self.buckets) if value <= bound
+        )
+        with self.registry.lock:
+            # The count of each bucket, then the sum and the count of the values
+            counts = self.values.setdefault(key, [0] * (len(self.buckets) + 2))
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = [
+            "+Inf" if math.isinf(bound) else bound for bound in self.buckets
+        ]
+        return snapshot
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time spent on the requests, by URL name.",
+    ("view", "method"),
+)
+requests_total = Counter(
+    "http_requests_total",
+    "Number of requests, by URL name and status code.",
+    ("view", "method", "status"),
+)
+request_queries = Histogram(
+    "db_queries_per_request",
+    "Number of database queries run by the requests, by URL name.",
+    ("view",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+votes_ingested = Counter(
+    "votes_ingested_total",
+    "Number of votes accepted, by ingestion mode.",
+    ("mode",),
+)
+votes_dropped = Counter(
+    "votes_dropped_total",
+    "Number of accepted votes that could not be written, by ingestion mode.",
+    ("mode",),
+)
+cache_requests = Counter(
+    "cache_requests_total",
+    "Number of cache reads, by cache and result, to compute the hit ratio of each cache.",
+    ("cache", "result"),
+)
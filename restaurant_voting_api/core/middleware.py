@@ -1,6 +1,18 @@
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
 from django.http import JsonResponse
 from rest_framework import status
 
+from .instrumentation import RequestTimings, instrument_request
+from .metrics import registry, request_duration, request_queries, requests_total
+
+logger = logging.getLogger("core.performance")
+
 
 class AppVersionMiddleware:
     def __init__(self, get_response):
@@ -25,3 +37,98 @@ class AppVersionMiddleware:
 
         response = self.get_response(request)
         return response
+
+
+class PerformanceMiddleware:
+    """
+    Record the wall time, the database queries and time, and the serializer time of a sample of the requests,
+    and send them in a Server-Timing header and optionally in a JSON log line of the core.performance logger.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """
+        Middleware to instrument the request if it is sampled
+
+        :param request:
+        :return:
+        """
+        config = settings.PERFORMANCE_INSTRUMENTATION
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        started = time.perf_counter()
+        with instrument_request(timings), connection.execute_wrapper(
+            timings.execute_wrapper
+        ):
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        response["Server-Timing"] = timings.get_server_timing(total)
+        if config["LOG"]:
+            logger.info(
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "path": request.path,
+                        "view": getattr(request.resolver_match, "url_name", None),
+                        "status": response.status_code,
+                        "total_ms": round(total * 1000, 2),
+                        "db_queries": timings.db_queries,
+                        "db_ms": round(timings.db_time * 1000, 2),
+                        **{
+                            f"{name}_ms": round(seconds * 1000, 2)
+                            for name, seconds in timings.spans.items()
+                        },
+                    }
+                )
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, the status code and the number of database queries of every request in the metrics
+    registry, by URL name, or by route for the URLs without a name.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """
+        Middleware to record the metrics of the request
+
+        :param request:
+        :return:
+        """
+        if not settings.METRICS["ENABLED"]:
+            return self.get_response(request)
+
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        if match is None:
+            view = "unmatched"
+        else:
+            view = match.url_name or match.route
+        request_duration.observe(elapsed, view=view, method=request.method)
+        requests_total.inc(
+            view=view, method=request.method, status=response.status_code
+        )
+        request_queries.observe(queries, view=view)
+        registry.flush()
+        return response
@@ -7,3 +7,11 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class BlacklistedRefreshToken(models.Model):
+    jti: str = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
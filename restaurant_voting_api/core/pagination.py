@@ -0,0 +1,19 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that filters on the position of the last row of the previous page instead of using an
+    OFFSET, so a deep page costs the same index range scan as the first one. The ordering must be on a unique,
+    indexed column of the paginated rows.
+
+    The page size defaults to settings.PAGE_SIZE and can be changed with the page_size query parameter.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def __init__(self, ordering: tuple[str, ...]):
+        self.ordering = ordering
+        self.page_size = settings.PAGE_SIZE
@@ -0,0 +1,34 @@
+import ipaddress
+import secrets
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class MetricsPermission(BasePermission):
+    """
+    Allows the requests with the metrics token as a bearer token, or coming from one of the allowed networks
+    """
+
+    def has_permission(self, request, view) -> bool:
+        """
+        Method to check the token or the client address of a request to the metrics
+
+        :param request:
+        :param view:
+        :return:
+        """
+
+        token = settings.METRICS["TOKEN"]
+        authorization = request.META.get("HTTP_AUTHORIZATION", "")
+        if token and secrets.compare_digest(authorization, f"Bearer {token}"):
+            return True
+
+        try:
+            address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+        except ValueError:
+            return False
+        return any(
+            address in ipaddress.ip_network(network, strict=False)
+            for network in settings.METRICS["ALLOWED_NETWORKS"]
+        )
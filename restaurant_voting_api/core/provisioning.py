@@ -0,0 +1,193 @@
+import csv
+import io
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .models import User
+from .tokens import ClaimsRefreshToken
+
+USER_FIELDS = ("username", "email", "password")
+
+# Number of users below which the passwords are hashed in the calling process, a pool would cost more than it saves
+POOL_THRESHOLD = 16
+
+
+class ProvisioningError(Exception):
+    """
+    Raised when a list of users cannot be provisioned, with the errors of each invalid user by its index.
+    """
+
+    def __init__(self, errors: dict[int, dict[str, list[str]]]):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def parse_users(content: str, file_format: str) -> list[dict]:
+    """
+    Parse a list of users from a CSV file with a header row or from a JSON array
+
+    :param content:
+    :param file_format: "csv" or "json"
+    :return:
+    """
+
+    if file_format == "csv":
+        return list(csv.DictReader(io.StringIO(content)))
+    if file_format == "json":
+        return json.loads(content)
+    raise ValueError(f"Unsupported format: {file_format}")
+
+
+def provision_users(
+    rows: list[dict],
+    *,
+    is_admin: bool = False,
+    with_tokens: bool = False,
+    workers: int | None = None,
+) -> list[dict]:
+    """
+    Create users in bulk. The users are validated together, with a single query for the existing usernames and
+    emails, their passwords are hashed across a process pool and they are inserted in one transaction.
+    Either every user is created or none.
+
+    :param rows: Dicts with the username, email and password of each user
+    :param is_admin:
+    :param with_tokens: Add an access and a refresh token to each created user
+    :param workers: Number of hashing processes, defaults to the number of CPUs
+    :return: The username and email, and the tokens if asked, of each created user
+    :raises ProvisioningError: if a user is invalid, or was created by another request meanwhile
+    """
+
+    errors = validate_users(rows)
+    if errors:
+        raise ProvisioningError(errors)
+
+    passwords = hash_passwords([row["password"] for row in rows], workers)
+    try:
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                User(
+                    username=row["username"],
+                    email=row["email"],
+                    password=password,
+                    is_admin=is_admin,
+                    is_superuser=is_admin,
+                )
+                for row, password in zip(rows, passwords, strict=True)
+            )
+    except IntegrityError:
+        # A user was created with the same username or email since the users were validated
+        errors = validate_users(rows)
+        if not errors:
+            raise
+        raise ProvisioningError(errors) from None
+
+    results = []
+    for user in users:
+        result = {"username": user.username, "email": user.email}
+        if with_tokens:
+            refresh = ClaimsRefreshToken.for_user(user)
+            result["access_token"] = str(refresh.access_token)
+            result["refresh_token"] = str(refresh)
+        results.append(result)
+    return results
+
+
+def validate_users(rows: list[dict]) -> dict[int, dict[str, list[str]]]:
+    """
+    Validate a list of users against each other and against the existing users. Their usernames and emails are
+    normalized first, like create_user does, so the uniqueness is checked on the values that are stored.
+
+    :param rows: Normalized in place
+    :return: The errors of each invalid user by its index
+    """
+
+    errors: dict[int, dict[str, list[str]]] = {}
+
+    def add_error(index: int, field: str, message: str) -> None:
+        errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            add_error(index, "non_field_errors", "Expected an object.")
+            continue
+
+        extra_keys = set(row) - set(USER_FIELDS)
+        if extra_keys:
+            add_error(
+                index,
+                "non_field_errors",
+                f"Unexpected fields: {', '.join(sorted(extra_keys))}",
+            )
+        for field in USER_FIELDS:
+            if not row.get(field):
+                add_error(index, field, "This field is required.")
+            elif not isinstance(row[field], str):
+                add_error(index, field, "Not a valid string.")
+
+        if isinstance(row.get("username"), str):
+            row["username"] = User.normalize_username(row["username"])
+        if isinstance(row.get("email"), str):
+            row["email"] = User.objects.normalize_email(row["email"])
+
+        # The validators of the model fields, including their maximum length
+        for field in ("username", "email"):
+            if isinstance(row.get(field), str) and row[field]:
+                try:
+                    User._meta.get_field(field).run_validators(row[field])
+                except ValidationError as error:
+                    for message in error.messages:
+                        add_error(index, field, message)
+
+    # The uniqueness is only checked for the users that are valid on their own
+    valid_rows = {index: row for index, row in enumerate(rows) if index not in errors}
+    usernames = Counter(row["username"] for row in valid_rows.values())
+    emails = Counter(row["email"] for row in valid_rows.values())
+    existing = User.objects.filter(
+        Q(username__in=list(usernames)) | Q(email__in=list(emails))
+    ).values_list("username", "email")
+    existing_usernames = {username for username, _ in existing}
+    existing_emails = {email for _, email in existing}
+
+    for index, row in valid_rows.items():
+        if row["username"] in existing_usernames:
+            add_error(index, "username", "A user with that username already exists.")
+        elif usernames[row["username"]] > 1:
+            add_error(index, "username", "This username is listed more than once.")
+        if row["email"] in existing_emails:
+            add_error(index, "email", "A user with this email already exists.")
+        elif emails[row["email"]] > 1:
+            add_error(index, "email", "This email is listed more than once.")
+
+    return errors
+
+
+def hash_passwords(passwords: list[str], workers: int | None = None) -> list[str]:
+    """
+    Hash passwords with the configured hasher across a process pool
+
+    :param passwords:
+    :param workers: Number of processes, defaults to the number of CPUs
+    :return: The hashes, in the order of the passwords
+    """
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < POOL_THRESHOLD:
+        return [make_password(password) for password in passwords]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        return list(
+            pool.map(
+                make_password,
+                passwords,
+                chunksize=max(len(passwords) // (workers * 4), 1),
+            )
+        )
@@ -0,0 +1,215 @@
+import re
+from collections.abc import Callable
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+
+# Tables read from start to end, and indexes used, as reported by EXPLAIN on each backend
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(
+        r"^SCAN (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX \w+)?$"
+    ),
+    "postgresql": re.compile(r"\bSeq Scan on (\w+)"),
+}
+# PostgreSQL index scans, which read the whole index when they have no index condition
+INDEX_SCAN_PATTERN = re.compile(
+    r"\bIndex (?:Only )?Scan(?: Backward)? using \w+ on (\w+)"
+)
+# Tables aliased by the ORM, in subqueries and repeated joins, which SQLite reports by their alias
+ALIAS_PATTERN = re.compile(r'"(\w+)" (?:AS )?"?([A-Z]\d+)"?\b')
+INDEX_PATTERNS = {
+    "sqlite": re.compile(r"\bUSING (?:COVERING )?INDEX (\w+)"),
+    "postgresql": re.compile(
+        r"\b(?:Index (?:Only )?Scan(?: Backward)? using|Bitmap Index Scan on) (\w+)"
+    ),
+}
+
+
+def explain(sql: str, params=None, using: str = "default") -> list[str]:
+    """
+    Get the plan of a statement, one line per step
+
+    :param sql:
+    :param params:
+    :param using: The database alias
+    :return:
+    """
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+        rows = cursor.fetchall()
+    if connection.vendor != "sqlite":
+        # A line of text per row
+        return [row[0] for row in rows]
+
+    # (id, parent, not used, detail) rows
+    aliases = {alias: table for table, alias in ALIAS_PATTERN.findall(sql)}
+    return [
+        re.sub(
+            r"^(SCAN|SEARCH) ([A-Z]\d+)\b",
+            lambda match: f"{match.group(1)} {aliases.get(match.group(2), match.group(2))}",
+            row[-1],
+        )
+        for row in rows
+    ]
+
+
+def get_plans(target: QuerySet | Callable, using: str = "default") -> list[list[str]]:
+    """
+    Get the plans of the statements of a queryset, or of every SELECT a function runs
+
+    :param target: A queryset, or a function running queries
+    :param using: The database alias
+    :return: A plan per statement
+    """
+
+    if isinstance(target, QuerySet):
+        # Compiled by hand, QuerySet.explain() fails on querysets filtered on a window function on SQLite
+        sql, params = target.query.get_compiler(target.db).as_sql()
+        return [explain(sql, params, target.db)]
+
+    with CaptureQueriesContext(connections[using]) as captured:
+        target()
+    return [
+        explain(query["sql"], using=using)
+        for query in captured
+        if query["sql"].lstrip().upper().startswith("SELECT")
+    ]
+
+
+@contextmanager
+def prefer_indexes(using: str = "default"):
+    """
+    Make the PostgreSQL planner avoid sequential scans while in the block, so a plan only has one when no index
+    fits its query. On small tables, a sequential scan is cheaper than any index and chosen otherwise.
+
+    :param using: The database alias
+    :return:
+    """
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        yield
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET enable_seqscan = off")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+
+
+def get_full_scans(plan: list[str], vendor: str) -> set[str]:
+    """
+    Get the tables a plan reads from start to end, by a sequential scan or a scan of a whole index
+
+    :param plan:
+    :param vendor:
+    :return:
+    """
+
+    pattern = FULL_SCAN_PATTERNS[vendor]
+    scanned = {
+        match.group(1)
+        for line in plan
+        if (match := pattern.search(line.strip())) is not None
+    }
+    if vendor == "postgresql":
+        scanned |= get_whole_index_scans(plan)
+    return scanned
+
+
+def get_whole_index_scans(plan: list[str]) -> set[str]:
+    """
+    Get the tables a PostgreSQL plan reads through an index without an index condition
+
+    :param plan:
+    :return:
+    """
+
+    scanned = set()
+    for position, line in enumerate(plan):
+        match = INDEX_SCAN_PATTERN.search(line)
+        if match is None:
+            continue
+
+        depth = len(line) - len(line.lstrip())
+        has_condition = False
+        # The details of a node are the lines indented under it, until its first child
+        for detail in plan[position + 1 :]:
+            stripped = detail.lstrip()
+            if len(detail) - len(stripped) <= depth or stripped.startswith("->"):
+                break
+            has_condition = has_condition or stripped.startswith("Index Cond:")
+        if not has_condition:
+            scanned.add(match.group(1))
+    return scanned
+
+
+def get_used_indexes(plan: list[str], vendor: str) -> set[str]:
+    """
+    Get the names of the indexes a plan searches
+
+    :param plan:
+    :param vendor:
+    :return:
+    """
+
+    pattern = INDEX_PATTERNS[vendor]
+    return {match.group(1) for line in plan for match in pattern.finditer(line)}
+
+
+class QueryPlanAssertionsMixin:
+    """
+    Assertions on the EXPLAIN plans of querysets, for test cases. The SQLite planner only chooses indexes over
+    full scans on tables of a realistic size, so the test data should be seeded and analyzed first. PostgreSQL
+    still prefers sequential scans on the few pages of the test tables, so they are disabled while planning.
+    """
+
+    def assertNoFullScan(
+        self, target: QuerySet | Callable, *tables: str, using: str = "default"
+    ) -> None:
+        """
+        Assert that none of the statements of a queryset or a function reads one of the tables from start to end
+
+        :param target: A queryset, or a function running queries
+        :param tables:
+        :param using:
+        :return:
+        """
+
+        vendor = connections[using].vendor
+        with prefer_indexes(using):
+            plans = get_plans(target, using)
+        for plan in plans:
+            scanned = get_full_scans(plan, vendor) & set(tables)
+            if scanned:
+                self.fail(
+                    f"Full scan of {', '.join(sorted(scanned))}:\n" + "\n".join(plan)
+                )
+
+    def assertUsesIndex(
+        self, target: QuerySet | Callable, index: str, using: str = "default"
+    ) -> None:
+        """
+        Assert that a statement of a queryset or a function searches an index
+
+        :param target: A queryset, or a function running queries
+        :param index: The name of the index
+        :param using:
+        :return:
+        """
+
+        vendor = connections[using].vendor
+        with prefer_indexes(using):
+            plans = get_plans(target, using)
+        if not any(index in get_used_indexes(plan, vendor) for plan in plans):
+            self.fail(
+                f"{index} is not used:\n"
+                + "\n\n".join("\n".join(plan) for plan in plans)
+            )
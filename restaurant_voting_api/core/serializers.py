@@ -1,7 +1,14 @@
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 
 from .models import User
+from .tokens import ClaimsRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -47,3 +54,42 @@ class UserSerializer(serializers.ModelSerializer):
         :return:
         """
         return User.objects.create_user(**validated_data)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        """
+        Refresh the token with the claims of the user as they are now, rejecting the token of a missing or
+        inactive user. Otherwise a demoted or deactivated user would keep its claims as long as it refreshes.
+
+        :param attrs:
+        :return: The access token, and the rotated refresh token
+        """
+
+        refresh = self.token_class(attrs["refresh"])
+        user = (
+            User.objects.filter(
+                **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}
+            )
+            .only("username", "is_admin", "is_active")
+            .first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise InvalidToken("The user of the token is inactive or does not exist.")
+        refresh.set_user_claims(user)
+
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
@@ -0,0 +1,181 @@
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from datetime import UTC, datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.views import View
+
+logger = logging.getLogger("core.slow_queries")
+_logger_lock = threading.Lock()
+
+# Application code, as opposed to Django, third-party packages and this module
+APPLICATION_DIR = str(settings.BASE_DIR) + "/"
+
+FINGERPRINT_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"(?:\(\.\.\.\)\s*,\s*)+\(\.\.\.\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def install(sender, connection, **kwargs) -> None:
+    """
+    Add the slow query recorder to a new database connection, connected to the connection_created signal.
+    It goes below the wrappers already there, since the execute_wrapper contexts of the middlewares pop the last
+    wrapper on exit, which would be the recorder if the connection was opened during their request.
+
+    :param sender:
+    :param connection:
+    :param kwargs:
+    :return:
+    """
+
+    if settings.SLOW_QUERY_LOG["ENABLED"] and record_slow_query not in (
+        connection.execute_wrappers
+    ):
+        connection.execute_wrappers.insert(0, record_slow_query)
+
+
+def record_slow_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper logging the statements slower than settings.SLOW_QUERY_LOG["THRESHOLD_MS"]
+
+    :param execute:
+    :param sql:
+    :param params:
+    :param many:
+    :param context:
+    :return:
+    """
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= settings.SLOW_QUERY_LOG["THRESHOLD_MS"]:
+            view, call_site = get_call_site(sys._getframe(1))
+            get_logger().info(
+                json.dumps(
+                    {
+                        "time": datetime.now(UTC).isoformat(),
+                        "duration_ms": round(duration, 2),
+                        "fingerprint": get_fingerprint(sql),
+                        "sql": sql,
+                        "params": get_params_shape(params, many),
+                        "view": view,
+                        "call_site": call_site,
+                        "database": context["connection"].alias,
+                    }
+                )
+            )
+
+
+def get_logger() -> logging.Logger:
+    """
+    Get the slow query logger, adding the rotating file handler on first use
+
+    :return:
+    """
+
+    with _logger_lock:
+        if not logger.handlers:
+            config = settings.SLOW_QUERY_LOG
+            Path(config["PATH"]).parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                config["PATH"],
+                maxBytes=config["MAX_BYTES"],
+                backupCount=config["BACKUP_COUNT"],
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
+
+def get_call_site(frame) -> tuple[str | None, str | None]:
+    """
+    Find the view and the innermost application frame that ran a query
+
+    :param frame: The frame of the caller of the execute wrapper
+    :return: The view as "module.Class.method" and the application frame as "path:function",
+             e.g. "voting/models.py:get_votes_for_day"
+    """
+
+    view = call_site = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            call_site is None
+            and filename.startswith(APPLICATION_DIR)
+            and "site-packages" not in filename
+            and filename != __file__
+        ):
+            call_site = f"{filename[len(APPLICATION_DIR):]}:{frame.f_code.co_name}"
+
+        instance = frame.f_locals.get("self")
+        if isinstance(instance, View):
+            # Prefer the handler of the HTTP method to the helpers it called
+            is_handler = frame.f_code.co_name in instance.http_method_names
+            if view is None or is_handler:
+                view = (
+                    f"{type(instance).__module__}.{type(instance).__qualname__}"
+                    f".{frame.f_code.co_name}"
+                )
+            if is_handler:
+                break
+        frame = frame.f_back
+    return view, call_site
+
+
+def get_fingerprint(sql: str) -> str:
+    """
+    Normalize a statement by replacing its literals and placeholders and collapsing the lists of values,
+    so the statements that only differ in their values share a fingerprint
+
+    :param sql:
+    :return:
+    """
+
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def get_params_shape(params, many: bool) -> str | None:
+    """
+    Describe the parameters of a statement by their types, without their values
+
+    :param params:
+    :param many:
+    :return:
+    """
+
+    if params is None:
+        return None
+    if many:
+        if not isinstance(params, (list, tuple)):
+            # An iterator, consumed by the statement
+            return "many"
+        shape = get_params_shape(params[0], False) if params else "[]"
+        return f"{len(params)} x {shape}"
+    if isinstance(params, dict):
+        return (
+            "{"
+            + ", ".join(
+                f"{key}: {type(value).__name__}" for key, value in params.items()
+            )
+            + "}"
+        )
+    return "[" + ", ".join(type(value).__name__ for value in params) + "]"
@@ -0,0 +1,139 @@
+import time
+from datetime import timedelta
+
+from core.authentication import (
+    ClaimsUser,
+    StatelessJWTAuthentication,
+    VerifiedTokenCache,
+    verified_tokens,
+)
+from core.models import User
+from core.tokens import ClaimsRefreshToken
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class ClaimsAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="admin", password="password", email="admin@example.com"
+        )
+        self.user.is_admin = True
+        self.user.save()
+
+    def authenticate(self, token) -> ClaimsUser:
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        user, _ = JWTStatelessUserAuthentication().authenticate(request)
+        return user
+
+    def test_token_claims(self):
+        """Test that the tokens carry the username and the admin flag."""
+        access_token = ClaimsRefreshToken.for_user(self.user).access_token
+
+        self.assertEqual(access_token["username"], "admin")
+        self.assertTrue(access_token["is_admin"])
+
+    def test_obtain_token_claims(self):
+        """Test that the token endpoint issues tokens with the claims."""
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "admin", "password": "password"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(AccessToken(response.data["access"])["is_admin"])
+
+    def test_authenticate_without_query(self):
+        """Test that the ID and the admin flag are read without loading the user."""
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(token)
+            self.assertEqual(user.id, self.user.id)
+            self.assertTrue(user.is_admin)
+
+    def test_lazy_user_instance(self):
+        """Test that the user is loaded once, on first access to an attribute that is not a claim."""
+        user = self.authenticate(ClaimsRefreshToken.for_user(self.user).access_token)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "admin@example.com")
+            self.assertEqual(user.instance, self.user)
+
+    def test_token_without_claims(self):
+        """Test that tokens issued before the claims were added fall back to the user."""
+        user = self.authenticate(AccessToken.for_user(self.user))
+
+        with self.assertNumQueries(1):
+            self.assertTrue(user.is_admin)
+
+
+class VerifiedTokenCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.cache = VerifiedTokenCache(max_size=2, ttl=300)
+
+    def make_token(self, user_id: int = 1, lifetime: int = 300) -> AccessToken:
+        token = AccessToken()
+        token["user_id"] = user_id
+        token.set_exp(lifetime=timedelta(seconds=lifetime))
+        return token
+
+    def test_hit_and_miss(self):
+        """Test that a stored token is returned and counted as a hit."""
+        token = self.make_token()
+
+        self.assertIsNone(self.cache.get(str(token).encode()))
+        self.cache.set(str(token).encode(), token)
+        self.assertIs(self.cache.get(str(token).encode()), token)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_entry_never_outlives_expiry(self):
+        """Test that an entry expires with its token even when the TTL is longer."""
+        token = self.make_token(lifetime=1)
+        self.cache.set(str(token).encode(), token)
+
+        time.sleep(1.1)
+        self.assertIsNone(self.cache.get(str(token).encode()))
+        self.assertEqual(len(self.cache.entries), 0)
+
+    def test_least_recently_used_evicted(self):
+        """Test that the least recently used token is evicted when the cache is full."""
+        tokens = [self.make_token(user_id) for user_id in range(3)]
+        self.cache.set(str(tokens[0]).encode(), tokens[0])
+        self.cache.set(str(tokens[1]).encode(), tokens[1])
+        self.cache.get(str(tokens[0]).encode())
+        self.cache.set(str(tokens[2]).encode(), tokens[2])
+
+        self.assertIsNotNone(self.cache.get(str(tokens[0]).encode()))
+        self.assertIsNone(self.cache.get(str(tokens[1]).encode()))
+
+
+class StatelessJWTAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        verified_tokens.clear()
+        self.user = User.objects.create_user(username="user", password="password")
+
+    def test_access_token_cached(self):
+        """Test that an access token is verified once and then read from the cache."""
+        raw_token = str(ClaimsRefreshToken.for_user(self.user).access_token).encode()
+        authentication = StatelessJWTAuthentication()
+
+        first = authentication.get_validated_token(raw_token)
+        second = authentication.get_validated_token(raw_token)
+
+        self.assertIs(first, second)
+        self.assertEqual((verified_tokens.hits, verified_tokens.misses), (1, 1))
+
+    def test_refresh_token_not_accepted(self):
+        """Test that a refresh token is neither accepted nor cached."""
+        raw_token = str(ClaimsRefreshToken.for_user(self.user)).encode()
+
+        with self.assertRaises(InvalidToken):
+            StatelessJWTAuthentication().get_validated_token(raw_token)
+        self.assertEqual(len(verified_tokens.entries), 0)
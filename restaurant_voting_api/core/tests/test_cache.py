@@ -0,0 +1,145 @@
+import threading
+import time
+from datetime import date
+from unittest import mock
+
+from core.cache import _computing, get_lock_key, get_or_compute
+from core.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from restaurants.models import Menu, Restaurant
+from voting.cache import get_cached_vote_statistics
+from voting.models import Vote, VoteTally
+
+
+class GetOrComputeTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, delay: float = 0.0):
+        self.calls += 1
+        time.sleep(delay)
+        return self.calls
+
+    def test_cached_value_is_reused(self):
+        """Test that a fresh value is computed only once."""
+        for _ in range(3):
+            self.assertEqual(get_or_compute("key", self.compute, timeout=60), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_version_change_recomputes(self):
+        """Test that a value is recomputed once its version changed."""
+        get_or_compute("key", self.compute, timeout=60, version="a")
+        self.assertEqual(
+            get_or_compute("key", self.compute, timeout=60, version="b"), 2
+        )
+
+    def test_expired_value_served_while_locked(self):
+        """Test that an expired value is served while another worker recomputes it."""
+        get_or_compute("key", self.compute, timeout=60, version="a")
+        entry = cache.get("key")
+        cache.set("key", {**entry, "expires": time.time() - 1})
+        cache.add(get_lock_key("key"), "other-worker", 10)
+
+        self.assertEqual(
+            get_or_compute("key", self.compute, timeout=60, version="a"), 1
+        )
+        self.assertEqual(self.calls, 1)
+
+    def test_older_version_not_served_while_locked(self):
+        """Test that a value of an older version is not served while another worker recomputes it."""
+        get_or_compute("key", self.compute, timeout=60, version="a")
+        cache.add(get_lock_key("key"), "other-worker", 10)
+
+        self.assertEqual(
+            get_or_compute(
+                "key", self.compute, timeout=60, version="b", lock_timeout=0.05
+            ),
+            2,
+        )
+
+    def test_local_locks_released(self):
+        """Test that the process keeps no lock of the keys it computed."""
+        for index in range(10):
+            get_or_compute(f"key:{index}", self.compute, timeout=60)
+        cache.add(get_lock_key("key:locked"), "other-worker", 10)
+        get_or_compute("key:locked", self.compute, timeout=60, lock_timeout=0.05)
+
+        self.assertEqual(_computing, set())
+
+    def test_early_refresh(self):
+        """Test that a value close to its expiry is refreshed early with a slow computation."""
+        get_or_compute("key", self.compute, timeout=60)
+        entry = cache.get("key")
+        cache.set("key", {**entry, "delta": 10.0, "expires": time.time() + 1})
+
+        # A draw close to 1 makes the early expiration large
+        with mock.patch("core.cache.random.random", return_value=0.99):
+            self.assertEqual(get_or_compute("key", self.compute, timeout=60), 2)
+
+    def test_early_refresh_disabled(self):
+        """Test that a beta of 0 only recomputes a value once it expired."""
+        get_or_compute("key", self.compute, timeout=60)
+        entry = cache.get("key")
+        cache.set("key", {**entry, "delta": 10.0, "expires": time.time() + 1})
+
+        with mock.patch("core.cache.random.random", return_value=0.99):
+            self.assertEqual(get_or_compute("key", self.compute, timeout=60, beta=0), 1)
+
+
+class VoteStatisticsCacheTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(username="owner", password="password")
+        restaurant = Restaurant.objects.create(name="Test Restaurant", owner_id=owner)
+        self.menu = Menu.objects.create(restaurant=restaurant, date=date.today())
+        Vote.objects.create(user=owner, menu=self.menu)
+
+    def test_concurrent_misses_query_once(self):
+        """Test that concurrent workers missing the vote statistics run the aggregation query once."""
+        barrier = threading.Barrier(10)
+        results = []
+        queries = []
+        get_votes_for_day = Vote.get_votes_for_day
+
+        def slow_get_votes_for_day(day):
+            # Slow enough for every worker to miss the cache while the first one computes the statistics
+            time.sleep(0.2)
+            return get_votes_for_day(day)
+
+        def worker():
+            try:
+                barrier.wait()
+                with CaptureQueriesContext(connection) as captured:
+                    results.append(get_cached_vote_statistics())
+                queries.extend(captured)
+            finally:
+                connection.close()
+
+        with mock.patch.object(
+            Vote, "get_votes_for_day", side_effect=slow_get_votes_for_day
+        ):
+            threads = [threading.Thread(target=worker) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        tally_table = VoteTally._meta.db_table
+        self.assertEqual(
+            len(
+                [query for query in queries if f'FROM "{tally_table}"' in query["sql"]]
+            ),
+            1,
+        )
+        expected = [
+            {
+                "menu": self.menu.id,
+                "vote_count": 1,
+                "restaurant_id": self.menu.restaurant_id,
+            }
+        ]
+        self.assertEqual(results, [expected] * 10)
@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+
+from core.day_version import bump_day_version, get_day_version
+from django.core.cache import cache
+from django.test import TestCase
+
+
+class DayVersionTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_version_is_stable(self):
+        """Test that the version of a day does not change without a bump."""
+        self.assertEqual(get_day_version(), get_day_version(date.today()))
+
+    def test_bump_after_commit(self):
+        """Test that a bump only changes the version once the transaction commits."""
+        version = get_day_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            bump_day_version(date.today())
+            self.assertEqual(get_day_version(), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_day_version()[0], version[0])
+
+    def test_bump_is_per_day(self):
+        """Test that bumping a day does not change the version of another day."""
+        tomorrow = date.today() + timedelta(days=1)
+        version = get_day_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_day_version(tomorrow)
+
+        self.assertEqual(get_day_version(), version)
@@ -0,0 +1,115 @@
+from datetime import date
+
+from core.loadtest import (
+    ClientTransport,
+    LoadTest,
+    get_credentials,
+    get_lunch_rate,
+    get_percentile,
+)
+from core.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from restaurants.models import Menu, Restaurant
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+class LoadTestHelpersTestCase(SimpleTestCase):
+    def test_get_percentile(self):
+        """Test that the percentiles use the nearest rank."""
+        values = [float(value) for value in range(1, 101)]
+
+        self.assertEqual(get_percentile(values, 50), 50)
+        self.assertEqual(get_percentile(values, 99), 99)
+        self.assertEqual(get_percentile([3.0], 95), 3)
+        self.assertEqual(get_percentile([], 50), 0)
+
+    def test_get_lunch_rate(self):
+        """Test that the lunch profile ramps up to the peak and back down."""
+        self.assertAlmostEqual(get_lunch_rate(0), 0.1)
+        self.assertEqual(get_lunch_rate(0.4), 1)
+        self.assertAlmostEqual(get_lunch_rate(0.8), 0.55)
+        self.assertLess(get_lunch_rate(0.1), get_lunch_rate(0.2))
+
+    def test_failed_requests_by_exception_type(self):
+        """Test that the requests failed by the transport are counted as errors by exception type."""
+
+        class FailingTransport:
+            def request(self, method, path, body, token):
+                if path == "/authentication/token/":
+                    return 200, b'{"access": "token"}'
+                if path == "/restaurants/menu/":
+                    return 200, b'[{"id": 1}]'
+                raise ConnectionResetError()
+
+            def close(self):
+                pass
+
+        load_test = LoadTest(
+            FailingTransport(),
+            credentials=[("user", "password")],
+            mix={"menu": 1, "today": 1},
+            concurrency=1,
+            rate=40,
+            duration=0.2,
+            profile="constant",
+        )
+
+        report = load_test.run()
+
+        today = report["endpoints"]["today"]
+        self.assertEqual(today["statuses"], {"ConnectionResetError": today["requests"]})
+        self.assertEqual(today["error_rate"], 1)
+        self.assertEqual(report["endpoints"]["menu"]["error_rate"], 0)
+
+
+# The workers run in their own threads, which only see committed data
+@override_settings(ALLOWED_HOSTS=["localhost"], PASSWORD_HASHERS=FAST_HASHERS)
+class LoadTestTestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create_user(username="owner", password="password")
+        restaurant = Restaurant.objects.create(name="Restaurant", owner_id=owner)
+        Menu.objects.create(restaurant=restaurant, date=date.today())
+
+    def test_get_credentials_reuses_users(self):
+        """Test that the users of a previous run are reused with the new password."""
+        get_credentials(3, "first")
+        credentials = get_credentials(3, "second")
+
+        self.assertEqual(credentials[0], ("loadtest-user-0", "second"))
+        self.assertEqual(
+            User.objects.filter(username__startswith="loadtest-").count(), 3
+        )
+        self.assertTrue(
+            User.objects.get(username="loadtest-user-2").check_password("second")
+        )
+
+    def test_run(self):
+        """Test that a short run reports every endpoint of the mix."""
+        load_test = LoadTest(
+            ClientTransport(),
+            credentials=get_credentials(3, "password"),
+            mix={"menu": 1, "today": 1, "vote": 1},
+            concurrency=2,
+            rate=40,
+            duration=0.5,
+            profile="constant",
+        )
+
+        report = load_test.run()
+
+        self.assertEqual(set(report["endpoints"]), {"menu", "today", "vote"})
+        self.assertEqual(
+            report["requests"],
+            sum(endpoint["requests"] for endpoint in report["endpoints"].values()),
+        )
+        for endpoint in report["endpoints"].values():
+            self.assertEqual(endpoint["error_rate"], 0)
+            self.assertLessEqual(endpoint["p50_ms"], endpoint["p99_ms"])
+        # One vote per user and day, the others are rejected
+        self.assertEqual(
+            report["endpoints"]["vote"]["statuses"].get("201", 0),
+            min(report["endpoints"]["vote"]["requests"], 3),
+        )
@@ -0,0 +1,139 @@
+import tempfile
+from datetime import date
+
+from core.metrics import Counter, Histogram, Registry
+from core.models import User
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurants.models import Menu, Restaurant
+
+
+class RegistryTestCase(SimpleTestCase):
+    def setUp(self):
+        self.registry = Registry(process_id="1")
+        self.counter = Counter(
+            "votes_total", "Votes.", ("mode",), metrics_registry=self.registry
+        )
+        self.histogram = Histogram(
+            "latency_seconds",
+            "Latency.",
+            ("view",),
+            buckets=(0.1, 1.0),
+            metrics_registry=self.registry,
+        )
+
+    def test_exposition(self):
+        """Test that counters and cumulative histogram buckets are rendered in the text format."""
+        self.counter.inc(mode="sync")
+        self.counter.inc(2, mode="sync")
+        for value in (0.05, 0.5, 5):
+            self.histogram.observe(value, view="menu")
+
+        lines = self.registry.expose().splitlines()
+
+        self.assertIn("# TYPE votes_total counter", lines)
+        self.assertIn('votes_total{mode="sync"} 3', lines)
+        self.assertIn('latency_seconds_bucket{view="menu",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{view="menu",le="1.0"} 2', lines)
+        self.assertIn('latency_seconds_bucket{view="menu",le="+Inf"} 3', lines)
+        self.assertIn('latency_seconds_count{view="menu"} 3', lines)
+        self.assertIn('latency_seconds_sum{view="menu"} 5.55', lines)
+
+    def test_wrong_labels(self):
+        """Test that a sample with other labels than the metric is refused."""
+        with self.assertRaises(ValueError):
+            self.counter.inc(view="menu")
+
+    def test_multiprocess_aggregation(self):
+        """Test that the metrics of the processes sharing a directory are summed."""
+        other_registry = Registry(process_id="2")
+        other_counter = Counter(
+            "votes_total", "Votes.", ("mode",), metrics_registry=other_registry
+        )
+        self.counter.inc(mode="sync")
+        other_counter.inc(mode="sync")
+        other_counter.inc(mode="write_behind")
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            METRICS={
+                "ENABLED": True,
+                "MULTIPROCESS_DIR": directory,
+                "FLUSH_INTERVAL": 1,
+            }
+        ):
+            other_registry.flush(force=True)
+            lines = self.registry.expose().splitlines()
+
+        self.assertIn('votes_total{mode="sync"} 2', lines)
+        self.assertIn('votes_total{mode="write_behind"} 1', lines)
+
+
+class MetricsViewTests(APITestCase):
+    def test_request_metrics(self):
+        """Test that the latency and the queries of a request are exposed by URL name."""
+        user = User.objects.create_user(username="user", password="password")
+        restaurant = Restaurant.objects.create(name="Restaurant", owner_id=user)
+        Menu.objects.create(restaurant=restaurant, date=date.today())
+        self.client.force_authenticate(user=user)
+        self.client.get("/restaurants/menu/")
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = response.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count{view="menu",method="GET"}', content
+        )
+        self.assertIn('db_queries_per_request_count{view="menu"}', content)
+        self.assertIn('cache_requests_total{cache="today-menu",result="miss"}', content)
+
+    def test_request_metrics_by_route(self):
+        """Test that every route gets its own label, and the unknown URLs a shared one."""
+        user = User.objects.create_user(username="user", password="password")
+        self.client.force_authenticate(user=user)
+        self.client.get("/restaurants/")
+        self.client.get("/missing/")
+
+        content = self.client.get("/metrics").content.decode()
+
+        self.assertIn(
+            'http_requests_total{view="restaurant-list",method="GET",status="200"}',
+            content,
+        )
+        self.assertNotIn('view="token_refresh"', content)
+        self.assertIn(
+            'http_requests_total{view="unmatched",method="GET",status="404"}', content
+        )
+
+    def test_metrics_remote_client_forbidden(self):
+        """Test that a client outside of the allowed networks cannot read the metrics."""
+        response = self.client.get("/metrics", REMOTE_ADDR="203.0.113.5")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_allowed_network(self):
+        """Test that a client in an allowed network reads the metrics."""
+        metrics = {**settings.METRICS, "ALLOWED_NETWORKS": ["203.0.113.0/24"]}
+        with override_settings(METRICS=metrics):
+            allowed = self.client.get("/metrics", REMOTE_ADDR="203.0.113.5")
+            local = self.client.get("/metrics")
+
+        self.assertEqual(allowed.status_code, status.HTTP_200_OK)
+        self.assertEqual(local.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_token(self):
+        """Test that a remote client with the metrics token reads the metrics."""
+        with override_settings(METRICS={**settings.METRICS, "TOKEN": "secret"}):
+            allowed = self.client.get(
+                "/metrics",
+                REMOTE_ADDR="203.0.113.5",
+                HTTP_AUTHORIZATION="Bearer secret",
+            )
+            denied = self.client.get(
+                "/metrics", REMOTE_ADDR="203.0.113.5", HTTP_AUTHORIZATION="Bearer other"
+            )
+
+        self.assertEqual(allowed.status_code, status.HTTP_200_OK)
+        self.assertEqual(denied.status_code, status.HTTP_403_FORBIDDEN)
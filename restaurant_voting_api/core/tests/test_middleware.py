@@ -1,6 +1,10 @@
-from core.middleware import AppVersionMiddleware
+import json
+
+from core.instrumentation import measure
+from core.middleware import AppVersionMiddleware, PerformanceMiddleware
+from core.models import User
 from django.http import JsonResponse
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 from rest_framework import status
 
 
@@ -37,3 +41,48 @@ class AppVersionMiddlewareTestCase(TestCase):
         self.assertJSONEqual(
             response.content, {"error": "Unsupported app version. Please update."}
         )
+
+
+class PerformanceMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = PerformanceMiddleware(self._dummy_get_response)
+
+    def _dummy_get_response(self, request):
+        with measure("serializer"):
+            count = User.objects.count()
+        User.objects.exists()
+        return JsonResponse({"count": count}, status=status.HTTP_200_OK)
+
+    def test_server_timing_header(self):
+        """Test that the database queries and the spans are reported in the Server-Timing header."""
+        response = self.middleware(self.factory.get("/"))
+
+        metrics = [
+            metric.split(";")[0] for metric in response["Server-Timing"].split(", ")
+        ]
+        self.assertEqual(metrics, ["total", "db", "serializer"])
+        self.assertIn('desc="2 queries"', response["Server-Timing"])
+
+    @override_settings(
+        PERFORMANCE_INSTRUMENTATION={"ENABLED": True, "SAMPLE_RATE": 0, "LOG": True}
+    )
+    def test_not_sampled(self):
+        """Test that requests outside the sample are not instrumented."""
+        with self.assertNoLogs("core.performance"):
+            response = self.middleware(self.factory.get("/"))
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(
+        PERFORMANCE_INSTRUMENTATION={"ENABLED": True, "SAMPLE_RATE": 1, "LOG": True}
+    )
+    def test_log_line(self):
+        """Test that the timings are logged as a JSON line."""
+        with self.assertLogs("core.performance", level="INFO") as logs:
+            self.middleware(self.factory.get("/voting/"))
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["path"], "/voting/")
+        self.assertEqual(line["db_queries"], 2)
+        self.assertIn("serializer_ms", line)
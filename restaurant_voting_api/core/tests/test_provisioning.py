@@ -0,0 +1,177 @@
+from unittest import mock
+
+from core import provisioning
+from core.models import User
+from core.provisioning import (
+    ProvisioningError,
+    hash_passwords,
+    parse_users,
+    provision_users,
+)
+from django.contrib.auth.hashers import check_password
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def make_rows(count: int, prefix: str = "user") -> list[dict]:
+    return [
+        {
+            "username": f"{prefix}{index}",
+            "email": f"{prefix}{index}@example.com",
+            "password": f"password-{index}",
+        }
+        for index in range(count)
+    ]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ProvisionUsersTestCase(TestCase):
+    def test_provision_users(self):
+        """Test that the users are created with hashed passwords in a constant number of queries."""
+        # Existing users, then the insert in a savepoint
+        with self.assertNumQueries(4):
+            created = provision_users(make_rows(20), workers=1)
+
+        self.assertEqual(len(created), 20)
+        user = User.objects.get(username="user3")
+        self.assertTrue(user.check_password("password-3"))
+        self.assertFalse(user.is_admin)
+
+    def test_provision_users_with_tokens(self):
+        """Test that tokens with the claims are returned for the created users."""
+        created = provision_users(make_rows(2), is_admin=True, with_tokens=True)
+
+        token = AccessToken(created[1]["access_token"])
+        self.assertEqual(token["username"], "user1")
+        self.assertTrue(token["is_admin"])
+
+    def test_invalid_users_create_none(self):
+        """Test that no user is created when one of them is invalid."""
+        User.objects.create_user(username="taken", email="taken@example.com")
+        rows = make_rows(3)
+        rows[0]["email"] = "not-an-email"
+        rows[1]["username"] = "taken"
+        rows[2]["email"] = rows[1]["email"] = "same@example.com"
+
+        with self.assertRaises(ProvisioningError) as context:
+            provision_users(rows)
+
+        self.assertEqual(set(context.exception.errors), {0, 1, 2})
+        self.assertIn("username", context.exception.errors[1])
+        self.assertIn("email", context.exception.errors[2])
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_users_normalized(self):
+        """Test that the usernames and emails are normalized before their uniqueness is checked."""
+        User.objects.create_user(username="taken", email="taken@example.com")
+        rows = make_rows(3)
+        rows[0]["email"] = "taken@EXAMPLE.com"
+        # A fullwidth t, which NFKC normalizes to ASCII
+        rows[1]["username"] = "\uff54aken"
+
+        with self.assertRaises(ProvisioningError) as context:
+            provision_users(rows)
+
+        self.assertEqual(set(context.exception.errors), {0, 1})
+        self.assertIn("email", context.exception.errors[0])
+        self.assertIn("username", context.exception.errors[1])
+
+        created = provision_users([{**make_rows(1)[0], "email": "New@EXAMPLE.com"}])
+
+        self.assertEqual(created[0]["email"], "New@example.com")
+
+    def test_too_long_users_create_none(self):
+        """Test that the lengths of the model fields are checked before the users are inserted."""
+        rows = make_rows(2)
+        rows[0]["username"] = "u" * 151
+        rows[1]["email"] = f"{'e' * 64}@{'d' * 63}.{'d' * 63}.{'d' * 63}.com"
+
+        with self.assertRaises(ProvisioningError) as context:
+            provision_users(rows)
+
+        self.assertIn("username", context.exception.errors[0])
+        self.assertIn("email", context.exception.errors[1])
+        self.assertEqual(User.objects.count(), 0)
+
+    def test_concurrent_duplicate_creates_none(self):
+        """Test that a user created by another request after the validation is reported as taken."""
+        hash_passwords = provisioning.hash_passwords
+
+        def create_duplicate(passwords, workers):
+            User.objects.create_user(username="user1", email="other@example.com")
+            return hash_passwords(passwords, workers)
+
+        with (
+            mock.patch.object(
+                provisioning, "hash_passwords", side_effect=create_duplicate
+            ),
+            self.assertRaises(ProvisioningError) as context,
+        ):
+            provision_users(make_rows(3))
+
+        self.assertEqual(set(context.exception.errors), {1})
+        self.assertIn("username", context.exception.errors[1])
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_hash_passwords_pool(self):
+        """Test that passwords hashed across processes keep their order."""
+        passwords = [f"password-{index}" for index in range(20)]
+
+        hashes = hash_passwords(passwords, workers=2)
+
+        self.assertTrue(all(map(check_password, passwords, hashes)))
+
+    def test_parse_users(self):
+        """Test that users are parsed from CSV and JSON."""
+        csv_users = parse_users(
+            "username,email,password\na,a@example.com,secret\n", "csv"
+        )
+        json_users = parse_users(
+            '[{"username": "a", "email": "a@example.com", "password": "secret"}]',
+            "json",
+        )
+
+        self.assertEqual(csv_users, json_users)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BulkUserRegistrationViewTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", is_admin=True)
+        self.url = "/authentication/register/bulk/"
+
+    def test_bulk_registration(self):
+        """Test that an admin registers a list of users with their tokens."""
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.post(
+            self.url, {"users": make_rows(3), "tokens": True}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["users"]), 3)
+        self.assertIn("access_token", response.data["users"][0])
+
+    def test_bulk_registration_invalid(self):
+        """Test that the errors of the invalid users are returned by index."""
+        self.client.force_authenticate(user=self.admin)
+        rows = make_rows(2)
+        rows[1]["password"] = ""
+
+        response = self.client.post(self.url, {"users": rows}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("password", response.data["errors"][1])
+
+    def test_bulk_registration_permission_denied(self):
+        """Test that only admins register users in bulk."""
+        user = User.objects.create_user(username="user")
+        self.client.force_authenticate(user=user)
+
+        response = self.client.post(self.url, {"users": make_rows(1)}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
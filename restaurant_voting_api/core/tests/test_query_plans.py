@@ -0,0 +1,90 @@
+from datetime import date
+
+from core.query_plans import (
+    QueryPlanAssertionsMixin,
+    get_full_scans,
+    get_plans,
+    get_used_indexes,
+)
+from django.db.models import Count
+from django.test import SimpleTestCase, TestCase
+from restaurants.models import Menu
+from voting.models import Vote
+
+POSTGRESQL_PLAN = [
+    "Nested Loop  (cost=4.59..312.08 rows=80 width=4)",
+    "  ->  Index Only Scan using restaurants_menu_date_idx on restaurants_menu  (cost=0.28..8.29 rows=1 width=4)",
+    "        Index Cond: (date = '2024-12-10'::date)",
+    "  ->  Bitmap Heap Scan on voting_vote  (cost=4.31..302.99 rows=80 width=8)",
+    "        Recheck Cond: (menu_id = restaurants_menu.id)",
+    "        ->  Bitmap Index Scan on voting_vote_menu_id_acf529bb  (cost=0.00..4.29 rows=80 width=0)",
+    "              Index Cond: (menu_id = restaurants_menu.id)",
+    "  ->  Seq Scan on voting_votetally u0  (cost=0.00..35.50 rows=2550 width=4)",
+]
+
+
+class QueryPlanParsingTestCase(SimpleTestCase):
+    def test_postgresql_plan(self):
+        """Test that the sequential scans and the indexes are read from a PostgreSQL plan."""
+        self.assertEqual(
+            get_full_scans(POSTGRESQL_PLAN, "postgresql"), {"voting_votetally"}
+        )
+        self.assertEqual(
+            get_used_indexes(POSTGRESQL_PLAN, "postgresql"),
+            {"restaurants_menu_date_idx", "voting_vote_menu_id_acf529bb"},
+        )
+
+    def test_postgresql_whole_index_scan(self):
+        """Test that the index scans without an index condition are read as full scans."""
+        plan = [
+            "GroupAggregate  (cost=0.15..68.06 rows=7 width=16)",
+            "  ->  Index Scan using voting_vote_menu_id_acf529bb on voting_vote  (cost=0.15..67.95 rows=7 width=16)",
+            "        Filter: (vote_date = '2024-12-10'::date)",
+            "  ->  Index Only Scan using restaurants_menu_date_idx on restaurants_menu  (cost=0.28..8.29 rows=1 width=4)",
+            "        Index Cond: (date = '2024-12-10'::date)",
+        ]
+
+        self.assertEqual(get_full_scans(plan, "postgresql"), {"voting_vote"})
+
+    def test_sqlite_plan(self):
+        """Test that the scans of a whole table or index are read from a SQLite plan, but not the searches."""
+        plan = [
+            "SEARCH restaurants_menu USING COVERING INDEX menu_restaurant_date_idx (restaurant_id=?)",
+            "SCAN voting_vote USING INDEX voting_vote_menu_id_acf529bb",
+            "SCAN voting_votetally",
+            "SCAN CONSTANT ROW",
+            "SCAN (subquery-1)",
+        ]
+
+        self.assertEqual(
+            get_full_scans(plan, "sqlite"), {"voting_vote", "voting_votetally"}
+        )
+        self.assertEqual(
+            get_used_indexes(plan, "sqlite"),
+            {"menu_restaurant_date_idx", "voting_vote_menu_id_acf529bb"},
+        )
+
+
+class QueryPlanAssertionsTestCase(QueryPlanAssertionsMixin, TestCase):
+    def test_full_scan_is_detected(self):
+        """Test that a filter on a column without an index fails the assertion."""
+        queryset = (
+            Vote.objects.filter(vote_date=date.today())
+            .values("menu")
+            .annotate(vote_count=Count("id"))
+        )
+
+        with self.assertRaises(AssertionError):
+            self.assertNoFullScan(queryset, "voting_vote")
+
+    def test_function_plans(self):
+        """Test that the plans of every SELECT a function runs are captured, with the subquery tables unaliased."""
+        plans = get_plans(
+            lambda: list(
+                Vote.objects.filter(menu__in=Menu.objects.filter(date=date.today()))
+            )
+        )
+
+        self.assertEqual(len(plans), 1)
+        self.assertIn("restaurants_menu", "\n".join(plans[0]))
+        self.assertNoFullScan(lambda: Menu.is_menu_exists(1), "restaurants_menu")
@@ -0,0 +1,104 @@
+import json
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from core import slow_queries
+from core.models import User
+from core.views import MetricsView
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from restaurants.models import Menu, Restaurant
+
+
+class SlowQueryLogTestCase(APITestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "slow_queries.log"
+
+        settings_override = override_settings(
+            SLOW_QUERY_LOG={
+                "ENABLED": True,
+                "THRESHOLD_MS": 0,
+                "PATH": str(self.path),
+                "MAX_BYTES": 1024 * 1024,
+                "BACKUP_COUNT": 1,
+            }
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for handler in slow_queries.logger.handlers[:]:
+            slow_queries.logger.removeHandler(handler)
+            self.addCleanup(handler.close)
+
+        slow_queries.install(None, connection)
+        self.addCleanup(
+            connection.execute_wrappers.remove, slow_queries.record_slow_query
+        )
+
+    def read_log(self) -> list[dict]:
+        return [json.loads(line) for line in self.path.read_text().splitlines()]
+
+    def test_call_site_attribution(self):
+        """Test that a query is logged with its view and the application code that ran it."""
+        user = User.objects.create_user(username="user", password="password")
+        restaurant = Restaurant.objects.create(name="Restaurant", owner_id=user)
+        menu = Menu.objects.create(restaurant=restaurant, date=date.today())
+        self.client.force_authenticate(user=user)
+
+        self.client.get(f"/restaurants/{restaurant.id}/menu/")
+
+        queries = [
+            query for query in self.read_log() if "restaurants_menu" in query["sql"]
+        ]
+        query = queries[-1]
+        self.assertEqual(query["view"], "restaurants.views.MenuView.get")
+        self.assertTrue(query["call_site"].startswith("core/views.py:"))
+        self.assertNotIn(str(menu.id), query["fingerprint"].split("LIMIT")[0])
+
+    def test_connection_created_during_request(self):
+        """Test that a connection opened during a request keeps the wrappers of the middlewares balanced."""
+        connection.execute_wrappers.remove(slow_queries.record_slow_query)
+        wrappers = list(connection.execute_wrappers)
+
+        def get(request):
+            connection_created.send(sender=type(connection), connection=connection)
+            return HttpResponse()
+
+        with mock.patch.object(MetricsView, "get", side_effect=get):
+            self.client.get("/metrics")
+            self.client.get("/metrics")
+
+        self.assertEqual(
+            connection.execute_wrappers, [slow_queries.record_slow_query, *wrappers]
+        )
+
+    def test_fingerprint(self):
+        """Test that statements differing only in their values share a fingerprint."""
+        self.assertEqual(
+            slow_queries.get_fingerprint(
+                "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'a'"
+            ),
+            slow_queries.get_fingerprint(
+                "SELECT *  FROM t WHERE id IN (%s) AND name = %s"
+            ),
+        )
+
+    def test_command(self):
+        """Test that the command groups the logged queries by fingerprint."""
+        for username in ("a", "b"):
+            User.objects.filter(username=username).exists()
+
+        output = StringIO()
+        call_command("slow_queries", path=str(self.path), stdout=output)
+
+        self.assertIn("2 runs", output.getvalue())
+        self.assertIn("core/tests/test_slow_queries.py:test_command", output.getvalue())
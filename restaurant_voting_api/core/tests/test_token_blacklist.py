@@ -0,0 +1,107 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from core.models import BlacklistedRefreshToken, User
+from core.token_blacklist import TokenBlacklist
+from core.tokens import ClaimsRefreshToken
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class TokenBlacklistTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="password")
+        self.refresh_url = "/authentication/token/refresh/"
+        self.blacklist = TokenBlacklist()
+        patcher = mock.patch("core.tokens.token_blacklist", self.blacklist)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def refresh(self, token: str):
+        return self.client.post(self.refresh_url, {"refresh": token}, format="json")
+
+    def test_rotated_token_rejected(self):
+        """Test that a refresh token cannot be used again once it was rotated."""
+        token = str(ClaimsRefreshToken.for_user(self.user))
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data["refresh"], token)
+        self.assertEqual(self.refresh(response.data["refresh"]).status_code, 200)
+
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_token_rejected_by_other_process(self):
+        """Test that a token rotated by another process is rejected by the table."""
+        token = str(ClaimsRefreshToken.for_user(self.user))
+        self.refresh(token)
+        self.blacklist.jtis.clear()
+
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_query_count(self):
+        """Test that a refresh loads the user and runs a single insert however many tokens are blacklisted."""
+        for _ in range(20):
+            self.refresh(str(ClaimsRefreshToken.for_user(self.user)))
+        token = str(ClaimsRefreshToken.for_user(self.user))
+
+        with self.assertNumQueries(2):
+            response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_refresh_reads_claims_from_user(self):
+        """Test that a refresh stamps the tokens with the current admin flag of the user."""
+        self.user.is_admin = True
+        self.user.save()
+        token = str(ClaimsRefreshToken.for_user(self.user))
+        self.user.is_admin = False
+        self.user.save()
+
+        response = self.refresh(token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(AccessToken(response.data["access"])["is_admin"])
+        self.assertFalse(ClaimsRefreshToken(response.data["refresh"])["is_admin"])
+
+    def test_refresh_rejected_for_inactive_user(self):
+        """Test that the refresh token of a deactivated or deleted user is rejected."""
+        token = str(ClaimsRefreshToken.for_user(self.user))
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        other_user = User.objects.create_user(username="other", password="password")
+        token = str(ClaimsRefreshToken.for_user(other_user))
+        other_user.delete()
+
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_replay_rejected_without_query(self):
+        """Test that a token blacklisted by the process is rejected without a query."""
+        token = str(ClaimsRefreshToken.for_user(self.user))
+        self.refresh(token)
+
+        with self.assertNumQueries(0):
+            response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_prune(self):
+        """Test that the expired tokens are pruned from the table and the set."""
+        now = timezone.now()
+        self.blacklist.add("expired", now - timedelta(minutes=1))
+        self.blacklist.add("valid", now + timedelta(days=1))
+
+        call_command("prune_token_blacklist", stdout=StringIO())
+        with self.blacklist.lock:
+            self.blacklist.prune()
+
+        self.assertEqual(
+            list(BlacklistedRefreshToken.objects.values_list("jti", flat=True)),
+            ["valid"],
+        )
+        self.assertEqual(list(self.blacklist.jtis), ["valid"])
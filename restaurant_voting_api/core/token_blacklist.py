@@ -0,0 +1,83 @@
+import threading
+import time
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import BlacklistedRefreshToken
+
+
+class TokenBlacklist:
+    """
+    Blacklist of rotated refresh tokens. The IDs blacklisted or seen blacklisted by the process are kept in a hash
+    set, so a replayed token is rejected without a query. A token is blacklisted by inserting its ID in the
+    BlacklistedRefreshToken table, which fails if another process already did, so a refresh costs a single insert
+    however many tokens are blacklisted.
+    """
+
+    # Minimum number of seconds between two removals of the expired IDs from the set
+    PRUNE_INTERVAL = 60.0
+
+    def __init__(self):
+        self.jtis: dict[str, datetime] = {}
+        self.lock = threading.Lock()
+        self.pruned_at = time.monotonic()
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self.jtis
+
+    def add(self, jti: str, expires_at: datetime) -> bool:
+        """
+        Blacklist a token ID until the token expires
+
+        :param jti:
+        :param expires_at:
+        :return: False if the ID was already blacklisted
+        """
+
+        if jti in self.jtis:
+            return False
+
+        with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {BlacklistedRefreshToken._meta.db_table} (jti, expires_at) "
+                "VALUES (%s, %s) ON CONFLICT DO NOTHING",
+                [jti, expires_at],
+            )
+            added = cursor.rowcount == 1
+
+        with self.lock:
+            self.jtis[jti] = expires_at
+            if time.monotonic() - self.pruned_at >= self.PRUNE_INTERVAL:
+                self.prune()
+        return added
+
+    def prune(self) -> None:
+        """
+        Remove the IDs of the expired tokens from the set, the caller holds the lock
+
+        :return:
+        """
+
+        now = timezone.now()
+        self.jtis = {
+            jti: expires_at for jti, expires_at in self.jtis.items() if expires_at > now
+        }
+        self.pruned_at = time.monotonic()
+
+    @staticmethod
+    def prune_table() -> int:
+        """
+        Delete the rows of the expired tokens, which are rejected on their expiry anyway
+
+        :return: The number of deleted rows
+        """
+
+        deleted, _ = BlacklistedRefreshToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        return deleted
+
+
+token_blacklist = TokenBlacklist()
@@ -0,0 +1,65 @@
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import User
+from .token_blacklist import token_blacklist
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the claims the views read from the user, so requests can be authenticated without
+    loading the user. The claims are copied to the access tokens made from it, and read again from the user when
+    it is refreshed, see ClaimsTokenRefreshSerializer.
+
+    A rotated token is blacklisted, see TokenBlacklist.
+    """
+
+    @classmethod
+    def for_user(cls, user: User) -> "ClaimsRefreshToken":
+        """
+        Create a token for the user with its username and admin flag as claims
+
+        :param user:
+        :return:
+        """
+
+        token = super().for_user(user)
+        token.set_user_claims(user)
+        return token
+
+    def set_user_claims(self, user: User) -> None:
+        """
+        Set the username and admin flag claims from the user
+
+        :param user:
+        :return:
+        """
+
+        self["username"] = user.username
+        self["is_admin"] = user.is_admin
+
+    def verify(self) -> None:
+        """
+        Verify the token, rejecting it if the process knows it is blacklisted
+
+        :return:
+        """
+
+        super().verify()
+        if self[api_settings.JTI_CLAIM] in token_blacklist:
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self) -> None:
+        """
+        Blacklist the token, called by the refresh serializer when it is rotated
+
+        :return:
+        :raises TokenError: if the token was already blacklisted, e.g. by a concurrent refresh in another process
+        """
+
+        if not token_blacklist.add(
+            self[api_settings.JTI_CLAIM], datetime_from_epoch(self["exp"])
+        ):
+            raise TokenError("Token is blacklisted")
@@ -1,11 +1,24 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .views import SuperUserRegistrationView, UserRegistrationView
+from .views import (
+    BulkUserRegistrationView,
+    SuperUserRegistrationView,
+    UserRegistrationView,
+)
 
 urlpatterns = [
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("register/", UserRegistrationView.as_view(), name="user-registration"),
-    path("register/admin/", SuperUserRegistrationView.as_view()),
+    path(
+        "register/admin/",
+        SuperUserRegistrationView.as_view(),
+        name="admin-registration",
+    ),
+    path(
+        "register/bulk/",
+        BulkUserRegistrationView.as_view(),
+        name="bulk-registration",
+    ),
 ]
@@ -1,10 +1,17 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from .instrumentation import measure
+from .metrics import registry
+from .pagination import KeysetPagination
+from .permissions import MetricsPermission
+from .provisioning import ProvisioningError, provision_users
 from .serializers import UserSerializer
+from .tokens import ClaimsRefreshToken
 
 
 class BaseView(APIView):
@@ -18,10 +25,11 @@ class BaseView(APIView):
         :param serializer:
         :return:
         """
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        with measure("serializer"):
+            if serializer.is_valid():
+                serializer.save()
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @staticmethod
     def response_200(serializer):
@@ -32,7 +40,27 @@ class BaseView(APIView):
         :return:
         """
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        with measure("serializer"):
+            data = serializer.data
+        return Response(data, status=status.HTTP_200_OK)
+
+    def response_paginated(
+        self, queryset, serializer_class, *, ordering: tuple[str, ...]
+    ) -> Response:
+        """
+        Method to return a 200 response with a page of the queryset
+
+        :param queryset:
+        :param serializer_class:
+        :param ordering: The unique, indexed ordering the pages are keyed on
+        :return:
+        """
+
+        paginator = KeysetPagination(ordering)
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        with measure("serializer"):
+            data = serializer_class(page, many=True).data
+        return paginator.get_paginated_response(data)
 
     @staticmethod
     def validate_user_creation(serializer, *, is_admin=False):
@@ -44,10 +72,12 @@ class BaseView(APIView):
         :return:
         """
 
-        if serializer.is_valid():
+        with measure("serializer"):
+            valid = serializer.is_valid()
+        if valid:
             user = serializer.save(is_admin=is_admin, is_superuser=is_admin)
 
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             access_token = str(refresh.access_token)
 
             return Response(
@@ -97,3 +127,57 @@ class SuperUserRegistrationView(BaseView):
         return self.validate_user_creation(
             UserSerializer(data=request.data), is_admin=True
         )
+
+
+class BulkUserRegistrationView(BaseView):
+    def post(self, request):
+        """
+        Method to register a list of users at once, only for admin users.
+        The body holds the users in "users" and optionally "tokens": true to get a jwt token for each user.
+
+        :param request:
+        :return:
+        """
+        if not request.user.is_admin:
+            return Response(
+                {"detail": "You do not have permission to perform this action."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        users = request.data.get("users")
+        if not isinstance(users, list) or not users:
+            return Response(
+                {"errors": {"users": ["Expected a non-empty list of users."]}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            created = provision_users(
+                users, with_tokens=bool(request.data.get("tokens", False))
+            )
+        except ProvisioningError as error:
+            return Response(
+                {"errors": error.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({"users": created}, status=status.HTTP_201_CREATED)
+
+
+class MetricsView(APIView):
+    authentication_classes = []
+    permission_classes = [MetricsPermission]
+
+    def get(self, request):
+        """
+        Method to return the metrics in the Prometheus text format
+
+        :param request:
+        :return:
+        """
+
+        if not settings.METRICS["ENABLED"]:
+            raise Http404()
+
+        return HttpResponse(
+            registry.expose(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
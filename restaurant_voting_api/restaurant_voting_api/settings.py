@@ -53,6 +53,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,6 +65,44 @@ MIDDLEWARE = [
     "core.middleware.AppVersionMiddleware",
 ]
 
+# A SAMPLE_RATE share of the requests get a Server-Timing header with their wall, database and serializer time,
+# and a JSON line on the core.performance logger if LOG is set
+PERFORMANCE_INSTRUMENTATION = {
+    "ENABLED": env.bool("PERFORMANCE_INSTRUMENTATION", default=True),
+    "SAMPLE_RATE": env.float("PERFORMANCE_SAMPLE_RATE", default=1.0),
+    "LOG": env.bool("PERFORMANCE_LOG", default=False),
+}
+
+# Metrics exposed on /metrics. Set MULTIPROCESS_DIR to a directory shared by the worker processes, and emptied
+# on deploy, to sum their metrics. Each process writes its metrics there at most every FLUSH_INTERVAL seconds.
+# Only the clients in ALLOWED_NETWORKS, or sending TOKEN as a bearer token, can read them.
+METRICS = {
+    "ENABLED": env.bool("METRICS_ENABLED", default=True),
+    "ALLOWED_NETWORKS": env.list(
+        "METRICS_ALLOWED_NETWORKS", default=["127.0.0.1/32", "::1/128"]
+    ),
+    "TOKEN": env("METRICS_TOKEN", default=""),
+    "MULTIPROCESS_DIR": env("METRICS_MULTIPROCESS_DIR", default=""),
+    "FLUSH_INTERVAL": env.float("METRICS_FLUSH_INTERVAL", default=1.0),
+}
+
+# Statements slower than THRESHOLD_MS are logged as JSON lines to PATH, rotated at MAX_BYTES, with the view and the
+# application code that ran them. Read them with the slow_queries command.
+SLOW_QUERY_LOG = {
+    "ENABLED": env.bool("SLOW_QUERY_LOG", default=False),
+    "THRESHOLD_MS": env.float("SLOW_QUERY_THRESHOLD_MS", default=100),
+    "PATH": env("SLOW_QUERY_LOG_PATH", default=str(BASE_DIR / "slow_queries.log")),
+    "MAX_BYTES": env.int("SLOW_QUERY_LOG_MAX_BYTES", default=10 * 1024 * 1024),
+    "BACKUP_COUNT": env.int("SLOW_QUERY_LOG_BACKUP_COUNT", default=5),
+}
+
+# Votes of the menus older than RETAIN_DAYS are moved by the archive_votes command to a directory of daily shards
+# in PATH, with a column file per field, and read back with voting.archive.
+VOTE_ARCHIVE = {
+    "PATH": env("VOTE_ARCHIVE_PATH", default=str(BASE_DIR / "vote_archive")),
+    "RETAIN_DAYS": env.int("VOTE_ARCHIVE_RETAIN_DAYS", default=90),
+}
+
 ROOT_URLCONF = "restaurant_voting_api.urls"
 
 TEMPLATES = [
@@ -85,15 +125,44 @@ TEMPLATES = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.StatelessJWTAuthentication",
     ),
 }
 
+# Default number of rows per page of the paginated listings, clients can ask for up to 500 with ?page_size=
+PAGE_SIZE = env.int("PAGE_SIZE", default=50)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(env("ACCESS_TOKEN_LIFETIME"))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=int(env("REFRESH_TOKEN_LIFETIME"))),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    # Requests are authenticated from the token claims, the user is only loaded when a view needs more than them
+    "TOKEN_OBTAIN_SERIALIZER": "core.serializers.ClaimsTokenObtainPairSerializer",
+    # Rotated refresh tokens are blacklisted by core.token_blacklist, prune it with prune_token_blacklist
+    "TOKEN_REFRESH_SERIALIZER": "core.serializers.ClaimsTokenRefreshSerializer",
+    "TOKEN_USER_CLASS": "core.authentication.ClaimsUser",
+}
+
+# Access tokens verified once are kept in a per-process LRU cache, up to MAX_SIZE tokens and at most TTL seconds,
+# and never past their expiry
+VERIFIED_TOKEN_CACHE = {
+    "ENABLED": env.bool("VERIFIED_TOKEN_CACHE_ENABLED", default=True),
+    "MAX_SIZE": env.int("VERIFIED_TOKEN_CACHE_MAX_SIZE", default=10000),
+    "TTL": env.int("VERIFIED_TOKEN_CACHE_TTL", default=300),
+}
+
+# Number of counter rows per menu in the vote tally. More shards spread the row locks of a popular menu
+# over more rows at the cost of summing more rows on read.
+VOTE_TALLY_SHARDS = env.int("VOTE_TALLY_SHARDS", default=8)
+
+# "sync" writes every vote in its request. "write_behind" validates votes against an in-memory index of the day,
+# answers 202 Accepted and writes the queued votes in batches from a background thread.
+VOTE_INGESTION = {
+    "MODE": env("VOTE_INGESTION_MODE", default="sync"),
+    "QUEUE_SIZE": env.int("VOTE_INGESTION_QUEUE_SIZE", default=10000),
+    "BATCH_SIZE": env.int("VOTE_INGESTION_BATCH_SIZE", default=500),
+    "FLUSH_INTERVAL_MS": env.int("VOTE_INGESTION_FLUSH_INTERVAL_MS", default=200),
 }
 
 WSGI_APPLICATION = "restaurant_voting_api.wsgi.application"
@@ -114,6 +183,37 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# The local memory cache is per process. Deployments running several worker processes need a shared backend,
+# e.g. CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache with CACHE_LOCATION=/var/tmp/django_cache
+
+CACHES = {
+    "default": {
+        "BACKEND": env(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": env("CACHE_LOCATION", default=""),
+    }
+}
+
+# Cache alias and timeout in seconds of the pre-rendered JSON of today's menus
+TODAY_MENU_CACHE = env("TODAY_MENU_CACHE", default="default")
+TODAY_MENU_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Cached vote statistics are recomputed by a single worker once a vote changed them or TIMEOUT seconds passed.
+# BETA sets how eagerly they are refreshed before the timeout, LOCK_TIMEOUT frees the lock of a crashed worker.
+VOTE_STATS_CACHE = {
+    "ALIAS": "default",
+    "TIMEOUT": 30,
+    "BETA": 1.0,
+    "LOCK_TIMEOUT": 10,
+}
+
+# Cache alias holding the per-day version stamps used for the ETag / Last-Modified of the daily endpoints
+DAY_VERSION_CACHE = "default"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -15,9 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from core.views import MetricsView
 from django.urls import include, path
 
 urlpatterns = [
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("authentication/", include("core.urls")),
     path("restaurants/", include("restaurants.urls")),
     path("voting/", include("voting.urls")),
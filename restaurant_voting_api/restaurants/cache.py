@@ -0,0 +1,115 @@
+from datetime import date
+
+from core.metrics import cache_requests
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from .models import Menu
+from .serializers import MenuSerializer
+
+
+def get_menu_cache():
+    """
+    Get the cache backend configured by settings.TODAY_MENU_CACHE
+
+    :return:
+    """
+
+    return caches[settings.TODAY_MENU_CACHE]
+
+
+def get_today_menu_content(day: date | None = None) -> bytes:
+    """
+    Get the rendered JSON of the menus of a day, rendering and caching it on a miss.
+    By default, it returns the menus of today.
+
+    :param day:
+    :return:
+    """
+
+    day = day or date.today()
+    content = get_menu_cache().get(get_menu_content_key(day, get_menu_generation(day)))
+    cache_requests.inc(cache="today-menu", result="miss" if content is None else "hit")
+    if content is None:
+        content = warm_today_menu(day)
+    return content
+
+
+def warm_today_menu(day: date) -> bytes:
+    """
+    Render the menus of a day and store them in the cache.
+
+    The generation is read before the menus, so content rendered from data that changed meanwhile is stored
+    under an outdated key and never served.
+
+    :param day:
+    :return:
+    """
+
+    generation = get_menu_generation(day)
+    content = JSONRenderer().render(
+        MenuSerializer(Menu.get_menu_by_date(day), many=True).data
+    )
+    get_menu_cache().set(
+        get_menu_content_key(day, generation),
+        content,
+        settings.TODAY_MENU_CACHE_TIMEOUT,
+    )
+    return content
+
+
+def invalidate_today_menu(day: date) -> None:
+    """
+    Drop the cached menus of a day once the current transaction commits
+
+    :param day:
+    :return:
+    """
+
+    def invalidate():
+        cache = get_menu_cache()
+        key = get_menu_generation_key(day)
+        cache.add(key, 0, settings.TODAY_MENU_CACHE_TIMEOUT)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # The generation expired in between, a new one makes the old content unreachable as well
+            cache.set(key, 1, settings.TODAY_MENU_CACHE_TIMEOUT)
+
+    transaction.on_commit(invalidate)
+
+
+def get_menu_generation(day: date) -> int:
+    """
+    Get the generation of the menus of a day, it changes on every invalidation
+
+    :param day:
+    :return:
+    """
+
+    return get_menu_cache().get(get_menu_generation_key(day), 0)
+
+
+def get_menu_generation_key(day: date) -> str:
+    """
+    Get the cache key of the generation of the menus of a day
+
+    :param day:
+    :return:
+    """
+
+    return f"today-menu-generation:{day.isoformat()}"
+
+
+def get_menu_content_key(day: date, generation: int) -> str:
+    """
+    Get the cache key of the rendered menus of a day for a generation
+
+    :param day:
+    :param generation:
+    :return:
+    """
+
+    return f"today-menu:{day.isoformat()}:{generation}"
@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from restaurants.cache import get_menu_cache, warm_today_menu
+
+
+class Command(BaseCommand):
+    help = "Render the menus of a day into the menu cache. Run it at day rollover."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            type=date.fromisoformat,
+            help="Date of the menus in YYYY-MM-DD format. Defaults to today.",
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(get_menu_cache(), LocMemCache):
+            raise CommandError(
+                f"The {settings.TODAY_MENU_CACHE!r} cache is a local memory cache, which only this command "
+                "would read. Set CACHE_BACKEND and CACHE_LOCATION, or TODAY_MENU_CACHE, to a shared cache."
+            )
+
+        day = options["date"] or date.today()
+        content = warm_today_menu(day)
+        self.stdout.write(
+            self.style.SUCCESS(f"Cached {len(content)} bytes of menus for {day}.")
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0002_alter_restaurant_owner_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="menu",
+            index=models.Index(
+                fields=["restaurant", "-date"], name="menu_restaurant_date_idx"
+            ),
+        ),
+    ]
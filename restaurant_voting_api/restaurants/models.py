@@ -45,6 +45,18 @@ class Restaurant(models.Model):
         return Restaurant.objects.filter(owner_id=owner_id)
 
 
+class MenuQuerySet(models.QuerySet):
+    def with_details(self) -> models.QuerySet:
+        """
+        Load the restaurant and the items together with the menus, so serializing a list of menus
+        does not run a query per menu.
+
+        :return: QuerySet
+        """
+
+        return self.select_related("restaurant").prefetch_related("items")
+
+
 class Menu(models.Model):
     """
     Represents a menu in the restaurant voting system.
@@ -61,6 +73,8 @@ class Menu(models.Model):
         "Restaurant", on_delete=models.CASCADE, related_name="menus"
     )
 
+    objects = MenuQuerySet.as_manager()
+
     def __str__(self) -> str:
         return str(self.date) + " - " + self.restaurant.name
 
@@ -70,6 +84,12 @@ class Menu(models.Model):
                 fields=["date", "restaurant"], name="unique_menu_per_day_per_restaurant"
             )
         ]
+        indexes = [
+            # Pages of the menus of a restaurant are keyed on the date
+            models.Index(
+                fields=["restaurant", "-date"], name="menu_restaurant_date_idx"
+            ),
+        ]
 
     @staticmethod
     def get_menu_by_restaurant_id(restaurant_id: int) -> models.QuerySet:
@@ -80,12 +100,10 @@ class Menu(models.Model):
         :return: QuerySet
         """
 
-        return Menu.objects.filter(restaurant=restaurant_id)
+        return Menu.objects.filter(restaurant=restaurant_id).with_details()
 
     @staticmethod
-    def get_menu_by_date(
-        date_menu: date_datetime = date_datetime.today(),
-    ) -> models.QuerySet:
+    def get_menu_by_date(date_menu: date_datetime | None = None) -> models.QuerySet:
         """
         Get the menu for a restaurant by the date. By default, it returns the menu for today.
 
@@ -93,7 +111,9 @@ class Menu(models.Model):
         :return: QuerySet
         """
 
-        return Menu.objects.filter(date=date_menu)
+        return Menu.objects.filter(
+            date=date_menu or date_datetime.today()
+        ).with_details()
 
     def is_vote_allowed(self) -> bool:
         """
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -43,8 +44,21 @@ class MenuSerializer(serializers.ModelSerializer):
         fields = ["id", "date", "restaurant", "items"]
 
     def create(self, validated_data):
-        items_data = validated_data.pop("items")
-        menu = Menu.objects.create(**validated_data)
-        for item_data in items_data:
-            Item.objects.create(menu=menu, **item_data)
+        """
+        Create the menu with its items. The item prices are validated before anything is written,
+        and the items are inserted with one statement in the same transaction as the menu.
+
+        :param validated_data:
+        :return:
+        """
+        items = [Item(**item_data) for item_data in validated_data.pop("items")]
+        for item in items:
+            item.clean()
+
+        with transaction.atomic():
+            menu = Menu.objects.create(**validated_data)
+            for item in items:
+                item.menu = menu
+            Item.objects.bulk_create(items)
+
         return menu
@@ -0,0 +1,48 @@
+from core.day_version import bump_day_version
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_today_menu
+from .models import Item, Menu
+
+
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+def menu_changed(sender, instance: Menu, **kwargs) -> None:
+    """
+    Change the version and drop the cached menus of the day of a saved or deleted menu
+
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+
+    bump_day_version(instance.date)
+    invalidate_today_menu(instance.date)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def item_changed(sender, instance: Item, **kwargs) -> None:
+    """
+    Change the version and drop the cached menus of the day of the menu of a saved or deleted item.
+    Items created with bulk_create are covered by the save of their menu in the same transaction.
+
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+
+    if instance.menu_id is None:
+        return
+
+    try:
+        date_menu = instance.menu.date
+    except Menu.DoesNotExist:
+        # Deleted together with its menu, whose own signal covers the day
+        return
+
+    bump_day_version(date_menu)
+    invalidate_today_menu(date_menu)
@@ -0,0 +1,121 @@
+from base64 import b64encode
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurants.models import Menu, Restaurant
+
+
+def encode_cursor(position) -> str:
+    """Build the cursor of the page that starts after the given position."""
+    return b64encode(urlencode({"p": position}).encode()).decode()
+
+
+class RestaurantPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="user", password="password"
+        )
+        Restaurant.objects.bulk_create(
+            Restaurant(name=f"Restaurant {index}", owner_id=cls.user)
+            for index in range(20000)
+        )
+        cls.ids = list(Restaurant.objects.order_by("id").values_list("id", flat=True))
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_first_page(self):
+        response = self.client.get("/restaurants/", {"page_size": 100})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [restaurant["id"] for restaurant in response.data["results"]],
+            self.ids[:100],
+        )
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+    def test_follow_next_links(self):
+        response = self.client.get("/restaurants/", {"page_size": 500})
+        seen = []
+        while True:
+            seen.extend(restaurant["id"] for restaurant in response.data["results"])
+            if response.data["next"] is None:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(seen, self.ids)
+
+    def test_deep_page_is_keyed_on_id(self):
+        position = self.ids[19000]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/restaurants/", {"cursor": encode_cursor(position), "page_size": 50}
+            )
+
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"id" >', queries[0]["sql"])
+        self.assertNotIn("OFFSET", queries[0]["sql"])
+        self.assertEqual(
+            [restaurant["id"] for restaurant in response.data["results"]],
+            self.ids[19001:19051],
+        )
+
+
+class MenuPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="user", password="password"
+        )
+        cls.restaurant = Restaurant.objects.create(name="Test", owner_id=cls.user)
+        Menu.objects.bulk_create(
+            Menu(restaurant=cls.restaurant, date=date.today() - timedelta(days=days))
+            for days in range(20000)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def test_first_page_newest_first(self):
+        response = self.client.get(
+            f"/restaurants/{self.restaurant.id}/menu/", {"page_size": 10}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(response.data["results"][0]["date"], str(date.today()))
+
+    def test_deep_page_query_count(self):
+        position = date.today() - timedelta(days=19000)
+
+        # Menus with their restaurant, items
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f"/restaurants/{self.restaurant.id}/menu/",
+                {"cursor": encode_cursor(position), "page_size": 50},
+            )
+
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("OFFSET", queries[0]["sql"])
+        self.assertEqual(
+            response.data["results"][0]["date"], str(position - timedelta(days=1))
+        )
+
+    def test_page_past_the_end_is_empty(self):
+        position = date.today() - timedelta(days=30000)
+
+        response = self.client.get(
+            f"/restaurants/{self.restaurant.id}/menu/",
+            {"cursor": encode_cursor(position)},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
@@ -0,0 +1,46 @@
+from datetime import date
+
+from core.query_plans import QueryPlanAssertionsMixin
+from django.db import connection
+from django.test import TestCase
+from restaurants.models import Menu, Restaurant
+from voting.seeding import seed_data
+
+
+class MenuQueryPlanTestCase(QueryPlanAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Enough menus for the planner to prefer the indexes, with statistics to base its choice on
+        seed_data(users=200, restaurants=50, days=60, items=3, votes=0)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        cls.restaurant = Restaurant.objects.first()
+
+    def test_get_menu_by_date(self):
+        """Test that the menus of a day and their items are read without a full scan."""
+        self.assertNoFullScan(
+            lambda: list(Menu.get_menu_by_date(date.today())),
+            "restaurants_menu",
+            "restaurants_item",
+        )
+
+    def test_get_menu_by_restaurant_id(self):
+        """Test that a page of the menus of a restaurant is read from the restaurant and date index."""
+        # A first page of the view, newest first, shorter than the 60 menus of the restaurant, which the index
+        # returns in order without sorting them
+        self.assertUsesIndex(
+            Menu.get_menu_by_restaurant_id(self.restaurant.id).order_by("-date")[:10],
+            "menu_restaurant_date_idx",
+        )
+        self.assertNoFullScan(
+            lambda: list(Menu.get_menu_by_restaurant_id(self.restaurant.id)),
+            "restaurants_menu",
+            "restaurants_item",
+        )
+
+    def test_is_menu_exists(self):
+        """Test that a menu is looked up by its primary key."""
+        menu = Menu.objects.first()
+
+        self.assertNoFullScan(lambda: Menu.is_menu_exists(menu.id), "restaurants_menu")
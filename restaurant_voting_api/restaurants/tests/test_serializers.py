@@ -1,7 +1,9 @@
 from core.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.exceptions import ValidationError
 from rest_framework.test import APITestCase
-from restaurants.models import Menu, Restaurant
+from restaurants.models import Item, Menu, Restaurant
 from restaurants.serializers import ItemSerializer, MenuSerializer, RestaurantSerializer
 
 
@@ -57,6 +59,40 @@ class MenuSerializerTest(APITestCase):
         self.assertEqual(menu.restaurant.id, self.valid_menu_data["restaurant"])
         self.assertEqual(len(menu.items.all()), len(self.valid_menu_data["items"]))
 
+    def test_menu_items_bulk_inserted(self):
+        """Test that the items of a menu are inserted with a single statement"""
+        data = {
+            **self.valid_menu_data,
+            "items": [{"name": f"Item {index}", "price": index} for index in range(40)],
+        }
+        serializer = MenuSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+
+        with CaptureQueriesContext(connection) as queries:
+            menu = serializer.save()
+
+        inserts = [query for query in queries if query["sql"].startswith("INSERT INTO")]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(menu.items.count(), 40)
+
+    def test_menu_with_negative_price_not_created(self):
+        """Test that a menu with an invalid item price is not written at all"""
+        data = {
+            **self.valid_menu_data,
+            "items": [
+                {"name": "Item 1", "price": 9.99},
+                {"name": "Item 2", "price": -1},
+            ],
+        }
+        serializer = MenuSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+
+        with self.assertRaises(ValidationError):
+            serializer.save()
+
+        self.assertFalse(Menu.objects.exists())
+        self.assertFalse(Item.objects.exists())
+
 
 class ItemSerializerTest(APITestCase):
     def setUp(self):
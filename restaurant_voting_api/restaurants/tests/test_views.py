@@ -1,7 +1,14 @@
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.test import override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
-from restaurants.models import Menu, Restaurant
+from restaurants.models import Item, Menu, Restaurant
 
 
 class RestaurantViewTests(APITestCase):
@@ -24,7 +31,7 @@ class RestaurantViewTests(APITestCase):
         Restaurant.objects.create(name="Test Restaurant", owner_id=self.admin_user)
         response = self.client.get("/restaurants/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_create_restaurant_with_invalid_data(self):
         self.client.force_authenticate(user=self.admin_user)
@@ -75,10 +82,127 @@ class MenuViewTests(APITestCase):
         Menu.objects.create(restaurant=self.restaurant, date="2024-12-10")
         response = self.client.get(f"/restaurants/{self.restaurant.id}/menu/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_create_menu_for_nonexistent_restaurant(self):
         self.client.force_authenticate(user=self.admin_user)
         data = {"restaurant": 9999, "date": "2024-12-10", "items": []}
         response = self.client.post("/restaurants/9999/menu/", data, format="json")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_menu_for_restaurant_query_count(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        for days in range(10):
+            menu = Menu.objects.create(
+                restaurant=self.restaurant, date=date.today() - timedelta(days=days)
+            )
+            Item.objects.create(name="Soup", menu=menu, price=4.5)
+            Item.objects.create(name="Salad", menu=menu, price=3.5)
+
+        # Menus with their restaurant, items
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/restaurants/{self.restaurant.id}/menu/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(len(response.data["results"][0]["items"]), 2)
+
+    def test_get_menu_for_restaurant_without_menus(self):
+        self.client.force_authenticate(user=self.admin_user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/restaurants/{self.restaurant.id}/menu/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TodayMenuViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="user", password="password"
+        )
+
+    def test_get_today_menu_query_count(self):
+        self.client.force_authenticate(user=self.user)
+
+        for count in (1, 20):
+            with self.captureOnCommitCallbacks(execute=True):
+                for index in range(count):
+                    restaurant = Restaurant.objects.create(
+                        name=f"Restaurant {count}-{index}", owner_id=self.user
+                    )
+                    menu = Menu.objects.create(restaurant=restaurant, date=date.today())
+                    Item.objects.create(name="Soup", menu=menu, price=4.5)
+
+            # Menus with their restaurant, items
+            with self.assertNumQueries(2):
+                response = self.client.get("/restaurants/menu/")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.json()), Menu.objects.count())
+
+            # Served from the cache until a menu or item changes
+            with self.assertNumQueries(0):
+                cached = self.client.get("/restaurants/menu/")
+            self.assertEqual(cached.content, response.content)
+
+    def test_get_today_menu_not_modified(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get("/restaurants/menu/")
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                "/restaurants/menu/", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        not_modified = self.client.get(
+            "/restaurants/menu/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_today_menu_modified_by_item(self):
+        self.client.force_authenticate(user=self.user)
+        restaurant = Restaurant.objects.create(name="Restaurant", owner_id=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            menu = Menu.objects.create(restaurant=restaurant, date=date.today())
+        etag = self.client.get("/restaurants/menu/")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.create(name="Soup", menu=menu, price=4.5)
+        response = self.client.get("/restaurants/menu/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()[0]["items"][0]["name"], "Soup")
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "menus": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": tempfile.gettempdir() + "/restaurant_voting_api_test_menus",
+            },
+        },
+        TODAY_MENU_CACHE="menus",
+    )
+    def test_get_today_menu_file_cache(self):
+        caches["menus"].clear()
+        self.client.force_authenticate(user=self.user)
+        restaurant = Restaurant.objects.create(name="Restaurant", owner_id=self.user)
+        Menu.objects.create(restaurant=restaurant, date=date.today())
+
+        call_command("warm_menu_cache", stdout=StringIO())
+        with self.assertNumQueries(0):
+            response = self.client.get("/restaurants/menu/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]["restaurant"], restaurant.id)
+        caches["menus"].clear()
+
+    def test_warm_menu_cache_local_memory(self):
+        """Test that the menus are not warmed into a local memory cache, which the servers do not read."""
+        with self.assertRaisesMessage(CommandError, "local memory cache"):
+            call_command("warm_menu_cache", stdout=StringIO())
@@ -1,9 +1,12 @@
+from core.day_version import today_conditional
 from core.views import BaseView
+from django.http import HttpResponse
 from rest_framework import status
 from rest_framework.exceptions import NotFound
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from .cache import get_today_menu_content
 from .models import Menu, Restaurant
 from .serializers import MenuSerializer, RestaurantSerializer
 
@@ -12,14 +15,14 @@ class RestaurantView(BaseView):
 
     def get(self, request: Request) -> Response:
         """
-        Method to get the list of all restaurants
+        Method to get a page of all restaurants
 
         :param request:
         :return:
         """
 
-        return self.response_200(
-            RestaurantSerializer(Restaurant.get_all_restaurants(), many=True)
+        return self.response_paginated(
+            Restaurant.get_all_restaurants(), RestaurantSerializer, ordering=("id",)
         )
 
     def post(self, request) -> Response:
@@ -55,7 +58,7 @@ class MenuView(BaseView):
         except Restaurant.DoesNotExist:
             raise NotFound(detail="Restaurant not found.")
 
-        if not (user.is_admin or user.id == restaurant.owner_id.id):
+        if not (user.is_admin or user.id == restaurant.owner_id_id):
             return Response(
                 {"detail": "You do not have permission to perform this action."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -68,30 +71,35 @@ class MenuView(BaseView):
 
     def get(self, request: Request, restaurant_id: int) -> Response:
         """
-        Method to get the menu of a restaurant
+        Method to get a page of the menus of a restaurant, newest first
 
         :param restaurant_id:
         :param request:
         :return:
         """
-        menus = Menu.get_menu_by_restaurant_id(restaurant_id)
-        if not menus:
+        response = self.response_paginated(
+            Menu.get_menu_by_restaurant_id(restaurant_id),
+            MenuSerializer,
+            ordering=("-date",),
+        )
+        if not response.data["results"] and "cursor" not in request.query_params:
             return Response(
                 {"detail": "No menus found for this restaurant."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        return self.response_200(MenuSerializer(menus, many=True))
+        return response
 
 
 class TodayMenuView(BaseView):
 
-    def get(self, request: Request) -> Response:
+    @today_conditional
+    def get(self, request: Request) -> HttpResponse:
         """
-        Method to get the menu of all restaurants for today
+        Method to get the menu of all restaurants for today, served from the pre-rendered cache
 
         :param request:
         :return:
         """
 
-        return self.response_200(MenuSerializer(Menu.get_menu_by_date(), many=True))
+        return HttpResponse(get_today_menu_content(), content_type="application/json")
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
-from .models import Vote
+from .models import ArchivedVoteSummary, Vote, VoteTally
 
 admin.site.register(Vote)
+admin.site.register(VoteTally)
+admin.site.register(ArchivedVoteSummary)
@@ -0,0 +1,244 @@
+import os
+import shutil
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import ArchivedVoteSummary, Vote
+
+# A file per column in the directory of each day, in the order of the votes
+COLUMNS = ("id", "user", "menu", "restaurant")
+# The IDs of every model are BigAutoFields, shards written with 32-bit integers before are read and extended as they are
+DTYPE = np.int64
+# Votes deleted per statement, under the limit of query parameters of SQLite
+DELETE_BATCH_SIZE = 500
+
+
+def get_archive_path(path: str | Path | None = None) -> Path:
+    """
+    Get the directory of the archive, settings.VOTE_ARCHIVE["PATH"] by default
+
+    :param path:
+    :return:
+    """
+
+    return Path(path or settings.VOTE_ARCHIVE["PATH"])
+
+
+def get_shard_path(day: date, path: str | Path | None = None) -> Path:
+    """
+    Get the directory of the archived votes of a day
+
+    :param day:
+    :param path:
+    :return:
+    """
+
+    return get_archive_path(path) / day.isoformat()
+
+
+def archive_votes(before: date, path: str | Path | None = None) -> dict[date, int]:
+    """
+    Move the votes of the menus dated before a day from the votes table to the archive, a day at a time.
+
+    The votes of a day are locked, written to a shard directory with an uncompressed .npy file per column, so they
+    can be memory-mapped when read, and the directory is renamed into place once complete. The votes are then
+    deleted by ID and counted in a summary row per menu, in the same transaction. The vote tallies are left as they
+    are, so the statistics of the archived days are still served.
+
+    :param before: The first day to keep in the votes table
+    :param path: The directory of the archive
+    :return: The number of archived votes by day
+    """
+
+    archived = {}
+    days = (
+        Vote.objects.filter(menu_date__lt=before)
+        .values_list("menu_date", flat=True)
+        .distinct()
+        .order_by("menu_date")
+    )
+    for day in list(days):
+        archived[day] = archive_day(day, path)
+    return archived
+
+
+def archive_day(day: date, path: str | Path | None = None) -> int:
+    """
+    Move the votes of the menus of a day to the archive
+
+    :param day:
+    :param path:
+    :return: The number of archived votes
+    """
+
+    with transaction.atomic():
+        # Locked, so the votes written are the ones deleted, and the votes written meanwhile are left for the next run
+        votes = np.array(
+            Vote.objects.select_for_update(of=("self",))
+            .filter(menu_date=day)
+            .order_by("id")
+            .values_list("id", "user_id", "menu_id", "menu__restaurant_id"),
+            dtype=DTYPE,
+        ).reshape(-1, len(COLUMNS))
+        if not len(votes):
+            return 0
+
+        # Kept with the votes archived before. The shard is in place before the transaction commits, so the votes of
+        # a run that failed after writing it are both in the shard and in the table, and are not added again.
+        previous = load_day(day, path)
+        added = ~np.isin(votes[:, COLUMNS.index("id")], previous["id"])
+        write_shard(
+            get_shard_path(day, path),
+            {
+                name: np.concatenate([previous[name], votes[added, index]])
+                for index, name in enumerate(COLUMNS)
+            },
+        )
+
+        ids = votes[:, COLUMNS.index("id")].tolist()
+        # Deleted without the signals of the votes, which would uncount them from the tallies
+        with connection.cursor() as cursor:
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                batch = ids[start : start + DELETE_BATCH_SIZE]
+                cursor.execute(
+                    f"DELETE FROM {Vote._meta.db_table} WHERE id IN ({', '.join(['%s'] * len(batch))})",
+                    batch,
+                )
+        ArchivedVoteSummary.add_vote_counts(
+            day, Counter(votes[:, COLUMNS.index("menu")].tolist())
+        )
+    return len(votes)
+
+
+def write_shard(shard_path: Path, columns: dict[str, np.ndarray]) -> None:
+    """
+    Write the columns of a day to a temporary directory, then replace the shard with it
+
+    :param shard_path:
+    :param columns:
+    :return:
+    """
+
+    temporary_path = shard_path.with_name(f".{shard_path.name}.tmp")
+    shutil.rmtree(temporary_path, ignore_errors=True)
+    temporary_path.mkdir(parents=True)
+    for name, column in columns.items():
+        np.save(temporary_path / f"{name}.npy", np.ascontiguousarray(column, DTYPE))
+
+    if shard_path.exists():
+        # Replaced in two renames, a reader sees either shard
+        previous_path = shard_path.with_name(f".{shard_path.name}.old")
+        shutil.rmtree(previous_path, ignore_errors=True)
+        os.replace(shard_path, previous_path)
+        os.replace(temporary_path, shard_path)
+        shutil.rmtree(previous_path)
+    else:
+        os.replace(temporary_path, shard_path)
+
+
+def get_archived_days(path: str | Path | None = None) -> list[date]:
+    """
+    Get the days with archived votes
+
+    :param path:
+    :return:
+    """
+
+    archive_path = get_archive_path(path)
+    if not archive_path.is_dir():
+        return []
+    return sorted(
+        date.fromisoformat(shard.name)
+        for shard in archive_path.iterdir()
+        if shard.is_dir() and not shard.name.startswith(".")
+    )
+
+
+def load_day(day: date, path: str | Path | None = None) -> dict[str, np.ndarray]:
+    """
+    Load the archived votes of a day as memory-mapped columns, read from disk as they are used
+
+    :param day:
+    :param path:
+    :return: The vote, user, menu and restaurant IDs of each vote by column name, empty when the day is not archived
+    """
+
+    shard_path = get_shard_path(day, path)
+    if not shard_path.is_dir():
+        return {name: np.empty(0, DTYPE) for name in COLUMNS}
+    return {
+        name: np.load(shard_path / f"{name}.npy", mmap_mode="r") for name in COLUMNS
+    }
+
+
+def iter_days(start: date, end: date, path: str | Path | None = None):
+    """
+    Iterate over the archived days from start to end, both included, with their columns
+
+    :param start:
+    :param end:
+    :param path:
+    :return:
+    """
+
+    for day in get_archived_days(path):
+        if start <= day <= end:
+            yield day, load_day(day, path)
+
+
+def count_votes_by_restaurant(
+    start: date, end: date, path: str | Path | None = None
+) -> dict[int, int]:
+    """
+    Count the archived votes of every restaurant over a period
+
+    :param start:
+    :param end:
+    :param path:
+    :return: The number of votes by restaurant ID
+    """
+
+    totals = Counter()
+    for _, columns in iter_days(start, end, path):
+        restaurants, counts = np.unique(columns["restaurant"], return_counts=True)
+        totals.update(dict(zip(restaurants.tolist(), counts.tolist(), strict=True)))
+    return dict(sorted(totals.items()))
+
+
+def count_restaurant_votes_by_day(
+    restaurant_id: int, start: date, end: date, path: str | Path | None = None
+) -> dict[date, int]:
+    """
+    Count the archived votes of a restaurant on each day of a period
+
+    :param restaurant_id:
+    :param start:
+    :param end:
+    :param path:
+    :return: The number of votes by day, for the days the restaurant got votes
+    """
+
+    daily = {}
+    for day, columns in iter_days(start, end, path):
+        count = int(np.count_nonzero(columns["restaurant"] == restaurant_id))
+        if count:
+            daily[day] = count
+    return daily
+
+
+def get_cutoff(retain_days: int | None = None) -> date:
+    """
+    Get the first day to keep in the votes table
+
+    :param retain_days: Defaults to settings.VOTE_ARCHIVE["RETAIN_DAYS"]
+    :return:
+    """
+
+    if retain_days is None:
+        retain_days = settings.VOTE_ARCHIVE["RETAIN_DAYS"]
+    return date.today() - timedelta(days=retain_days)
@@ -0,0 +1,77 @@
+from datetime import date
+
+from core.cache import get_or_compute
+from core.day_version import get_day_version
+from core.instrumentation import measure
+from django.conf import settings
+from restaurants.serializers import MenuSerializer
+
+from .models import Vote
+from .serializers import VoteStatisticsSerializer
+
+
+def get_cached_vote_statistics(day: date | None = None) -> list:
+    """
+    Get the serialized vote statistics of a day, recomputed by a single worker once a vote changed them.
+    By default, it returns the statistics of today.
+
+    :param day:
+    :return:
+    """
+
+    day = day or date.today()
+    return get_vote_stats(
+        f"vote-statistics:{day.isoformat()}",
+        lambda: serialize(VoteStatisticsSerializer, Vote.get_votes_for_day(day)),
+        day,
+    )
+
+
+def get_cached_today_menu() -> list:
+    """
+    Get the serialized menus with the most votes today, recomputed by a single worker once a vote changed them.
+
+    :return:
+    """
+
+    day = date.today()
+    return get_vote_stats(
+        f"vote-today-menu:{day.isoformat()}",
+        lambda: serialize(MenuSerializer, Vote.get_today_menu()),
+        day,
+    )
+
+
+def serialize(serializer_class, instances) -> list:
+    """
+    Serialize the instances into a list that can be cached
+
+    :param serializer_class:
+    :param instances:
+    :return:
+    """
+
+    with measure("serializer"):
+        return list(serializer_class(instances, many=True).data)
+
+
+def get_vote_stats(key: str, compute, day: date) -> list:
+    """
+    Get a cached value that depends on the votes of a day, using settings.VOTE_STATS_CACHE
+
+    :param key:
+    :param compute:
+    :param day:
+    :return:
+    """
+
+    config = settings.VOTE_STATS_CACHE
+    return get_or_compute(
+        key,
+        compute,
+        timeout=config["TIMEOUT"],
+        version=get_day_version(day)[0],
+        alias=config["ALIAS"],
+        beta=config["BETA"],
+        lock_timeout=config["LOCK_TIMEOUT"],
+    )
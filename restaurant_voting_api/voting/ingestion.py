@@ -0,0 +1,293 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+from core.day_version import bump_day_version
+from core.metrics import votes_dropped
+from core.models import User
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from restaurants.models import Menu
+
+from .models import Vote, VoteTally
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """
+    Raised when a vote is submitted while the ingestion queue is full.
+    """
+
+
+class VoteIngestionQueue:
+    """
+    Write-behind queue for votes. Votes are checked against an in-memory index of the open menus and of the
+    votes of the day, queued, and written in batches by a background thread.
+
+    The index is local to the process, so a duplicate vote submitted to another worker is accepted and then
+    dropped by the unique constraint when the batch is written.
+    """
+
+    # Minimum number of seconds between two reloads of the open menus on an unknown menu ID
+    MENU_RELOAD_INTERVAL = 1.0
+    # Number of times a batch is written before its votes are dropped, and seconds to wait after the first failure
+    WRITE_ATTEMPTS = 3
+    RETRY_DELAY = 0.5
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.queue = queue.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.lock = threading.Lock()
+        self.day = None
+        self.open_menus: dict[int, date] = {}
+        self.menus_loaded_at = 0.0
+        self.voted: set[tuple[int, int]] = set()
+
+        self.thread = None
+        self.stopping = threading.Event()
+
+    def submit(self, user_id: int, menu_id: int) -> str | None:
+        """
+        Validate a vote against the index of the day and queue it
+
+        :param user_id:
+        :param menu_id:
+        :return: None if the vote was queued, otherwise the reason it was rejected
+        :raises QueueFull: if the queue has no room for the vote
+        """
+
+        with self.lock:
+            self.load_day()
+
+            if menu_id not in self.open_menus:
+                self.reload_menus()
+            if menu_id not in self.open_menus:
+                # Imported here, the serializers module imports the models of this app
+                from .serializers import VoteCreateSerializer
+
+                return VoteCreateSerializer.get_rejection_reason(menu_id)
+
+            if (user_id, menu_id) in self.voted:
+                return "You have already voted for this menu."
+
+            try:
+                self.queue.put_nowait((user_id, menu_id, self.open_menus[menu_id]))
+            except queue.Full:
+                raise QueueFull() from None
+
+            self.voted.add((user_id, menu_id))
+            return None
+
+    def load_day(self) -> None:
+        """
+        Load the open menus and the votes for them when the day changes
+
+        :return:
+        """
+
+        today = date.today()
+        if self.day == today:
+            return
+
+        self.reload_menus(force=True)
+        self.voted = set(
+            Vote.objects.filter(menu_date__gte=today).values_list("user", "menu")
+        )
+        self.day = today
+
+    def reload_menus(self, *, force: bool = False) -> None:
+        """
+        Reload the menus that are open for voting, at most once per MENU_RELOAD_INTERVAL unless forced
+
+        :param force:
+        :return:
+        """
+
+        elapsed = time.monotonic() - self.menus_loaded_at
+        if not force and elapsed < self.MENU_RELOAD_INTERVAL:
+            return
+
+        self.open_menus = dict(
+            Menu.objects.filter(date__gte=date.today()).values_list("id", "date")
+        )
+        self.menus_loaded_at = time.monotonic()
+
+    def start(self) -> None:
+        """
+        Start the background flusher and flush the remaining votes when the process exits
+
+        :return:
+        """
+
+        if self.thread is not None:
+            return
+
+        self.thread = threading.Thread(
+            target=self.run, name="vote-ingestion", daemon=True
+        )
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """
+        Stop the background flusher after it has written every queued vote
+
+        :return:
+        """
+
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def run(self) -> None:
+        """
+        Write batches until the queue is stopped and empty
+
+        :return:
+        """
+
+        while not (self.stopping.is_set() and self.queue.empty()):
+            batch = self.take_batch()
+            if batch:
+                self.write_batch(batch)
+        connection.close()
+
+    def flush(self) -> int:
+        """
+        Write every queued vote in the calling thread
+
+        :return: The number of votes written
+        """
+
+        written = 0
+        while batch := self.take_batch(timeout=0):
+            self.write_batch(batch)
+            written += len(batch)
+        return written
+
+    def take_batch(self, timeout: float | None = None) -> list[tuple[int, int, date]]:
+        """
+        Take up to batch_size votes from the queue, waiting at most the flush interval for them
+
+        :param timeout: Seconds to wait for the batch to fill. Defaults to the flush interval.
+        :return:
+        """
+
+        deadline = time.monotonic() + (
+            self.flush_interval if timeout is None else timeout
+        )
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(
+                    self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                )
+            except queue.Empty:
+                break
+        return batch
+
+    def write_batch(self, batch: list[tuple[int, int, date]]) -> None:
+        """
+        Write a batch of votes, retrying up to WRITE_ATTEMPTS times. The votes of a batch that could not be
+        written are dropped and removed from the index, so their users can vote again.
+
+        :param batch:
+        :return:
+        """
+
+        for attempt in range(1, self.WRITE_ATTEMPTS + 1):
+            if not connection.in_atomic_block:
+                # Not inside a transaction of the caller, which would be closed with it
+                close_old_connections()
+            try:
+                self.insert_batch(batch)
+                return
+            except DatabaseError:
+                logger.exception(
+                    "Failed to write a batch of %d votes (attempt %d of %d)",
+                    len(batch),
+                    attempt,
+                    self.WRITE_ATTEMPTS,
+                )
+            if attempt < self.WRITE_ATTEMPTS:
+                time.sleep(self.RETRY_DELAY * attempt)
+
+        with self.lock:
+            self.voted.difference_update(
+                (user_id, menu_id) for user_id, menu_id, _ in batch
+            )
+        votes_dropped.inc(len(batch), mode="write_behind")
+
+    @staticmethod
+    @transaction.atomic
+    def insert_batch(batch: list[tuple[int, int, date]]) -> None:
+        """
+        Insert a batch of votes and add the inserted ones to the tallies of their menus in one transaction.
+        The votes for menus or from users deleted meanwhile, and the votes written by another process meanwhile,
+        are skipped.
+
+        :param batch:
+        :return:
+        """
+
+        today = date.today()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Vote._meta.db_table} (user_id, menu_id, menu_date, vote_date)
+                SELECT queued.column1, menu.id, menu.date, %s
+                FROM (VALUES {", ".join(["(%s, %s)"] * len(batch))}) AS queued
+                JOIN {Menu._meta.db_table} menu ON menu.id = queued.column2
+                WHERE queued.column1 IN (SELECT id FROM {User._meta.db_table})
+                ON CONFLICT DO NOTHING
+                RETURNING menu_id
+                """,
+                [today]
+                + [
+                    value
+                    for user_id, menu_id, _ in batch
+                    for value in (user_id, menu_id)
+                ],
+            )
+            inserted = Counter(menu_id for (menu_id,) in cursor.fetchall())
+
+        days = {
+            VoteTally.increment(menu_id, amount=count)
+            for menu_id, count in inserted.items()
+        }
+        for day in days:
+            bump_day_version(day)
+
+
+_ingestion_queue = None
+_ingestion_queue_lock = threading.Lock()
+
+
+def get_ingestion_queue() -> VoteIngestionQueue:
+    """
+    Get the started ingestion queue of the process, creating it from settings.VOTE_INGESTION on first use
+
+    :return:
+    """
+
+    global _ingestion_queue
+
+    with _ingestion_queue_lock:
+        if _ingestion_queue is None:
+            config = settings.VOTE_INGESTION
+            _ingestion_queue = VoteIngestionQueue(
+                max_size=config["QUEUE_SIZE"],
+                batch_size=config["BATCH_SIZE"],
+                flush_interval=config["FLUSH_INTERVAL_MS"] / 1000,
+            )
+            _ingestion_queue.start()
+        return _ingestion_queue
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from voting.archive import archive_votes, get_archive_path, get_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the votes of the menus older than the retention period to the archive, as memory-mappable "
+        "column files per day, with a summary row per menu. Run it on a schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Number of days of votes to keep in the votes table. "
+            'Defaults to settings.VOTE_ARCHIVE["RETAIN_DAYS"].',
+        )
+        parser.add_argument(
+            "--path",
+            help='Directory of the archive. Defaults to settings.VOTE_ARCHIVE["PATH"].',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        archived = archive_votes(get_cutoff(options["days"]), options["path"])
+        elapsed = time.perf_counter() - started
+
+        for day, count in archived.items():
+            self.stdout.write(f"{day}: {count} votes")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{sum(archived.values())} votes of {len(archived)} days archived to "
+                f"{get_archive_path(options['path'])} in {elapsed:.1f}s."
+            )
+        )
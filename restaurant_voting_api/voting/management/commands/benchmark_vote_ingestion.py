@@ -0,0 +1,112 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from core.models import User
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+from restaurants.models import Menu, Restaurant
+from voting import ingestion
+from voting.models import Vote
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sustained votes per second of the synchronous and the write-behind vote ingestion "
+        "by posting votes to /voting/ against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--votes",
+            type=int,
+            default=2000,
+            help="Number of votes to post for each mode.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Number of parallel clients.",
+        )
+        parser.add_argument(
+            "--menus",
+            type=int,
+            default=5,
+            help="Number of menus the votes are spread over.",
+        )
+
+    def handle(self, *args, **options):
+        prefix = f"ingestion-benchmark-{time.time_ns()}"
+        users = User.objects.bulk_create(
+            User(username=f"{prefix}-{index}") for index in range(options["votes"])
+        )
+        menus = [
+            Menu.objects.create(
+                restaurant=Restaurant.objects.create(
+                    name=f"{prefix}-{index}", owner_id=users[0]
+                ),
+                date=date.today(),
+            )
+            for index in range(options["menus"])
+        ]
+
+        try:
+            for mode in ("sync", "write_behind"):
+                accepted, elapsed, flushed = self.run_mode(
+                    mode, users, menus, options["concurrency"]
+                )
+                self.stdout.write(
+                    f"mode={mode:<12} votes={accepted:<6} "
+                    f"accept={accepted / elapsed:.0f}/s "
+                    f"sustained={accepted / flushed:.0f}/s"
+                )
+                Vote.objects.filter(menu__in=menus).delete()
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
+
+    @staticmethod
+    def run_mode(
+        mode: str, users: list[User], menus: list[Menu], concurrency: int
+    ) -> tuple[int, float, float]:
+        """
+        Post one vote per user with the given ingestion mode
+
+        :param mode:
+        :param users:
+        :param menus:
+        :param concurrency:
+        :return: The number of accepted votes, the seconds until the last response and the seconds until
+                 the last vote was written
+        """
+
+        def post(index: int) -> bool:
+            client = APIClient(HTTP_HOST="localhost")
+            client.force_authenticate(user=users[index])
+            try:
+                response = client.post(
+                    "/voting/", {"menu": menus[index % len(menus)].id}, format="json"
+                )
+            finally:
+                connection.close()
+            return response.status_code in (201, 202)
+
+        with override_settings(
+            VOTE_INGESTION={**settings.VOTE_INGESTION, "MODE": mode}
+        ):
+            ingestion._ingestion_queue = None
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                accepted = sum(executor.map(post, range(len(users))))
+            elapsed = time.perf_counter() - started
+
+            if ingestion._ingestion_queue is not None:
+                ingestion._ingestion_queue.stop()
+                ingestion._ingestion_queue = None
+            flushed = time.perf_counter() - started
+
+        return accepted, elapsed, flushed
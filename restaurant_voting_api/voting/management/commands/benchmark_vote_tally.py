@@ -0,0 +1,99 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from core.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.db.models import Sum
+from restaurants.models import Menu, Restaurant
+from voting.models import VoteTally
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the throughput of concurrent vote tally increments for a single hot menu "
+        "against the configured database, for one or more shard counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=32,
+            help="Number of parallel writer threads.",
+        )
+        parser.add_argument(
+            "--increments",
+            type=int,
+            default=200,
+            help="Number of increments done by each writer.",
+        )
+        parser.add_argument(
+            "--shards",
+            default="1,4,8,16",
+            help="Comma separated list of shard counts to compare.",
+        )
+
+    def handle(self, *args, **options):
+        shard_counts = [int(shards) for shards in options["shards"].split(",")]
+        writers, increments = options["writers"], options["increments"]
+
+        if connection.vendor == "sqlite":
+            self.stdout.write(
+                self.style.WARNING(
+                    "SQLite serializes all writers on a database lock, "
+                    "so shards are not expected to change the throughput."
+                )
+            )
+
+        owner = User.objects.create_user(username=f"tally-benchmark-{time.time_ns()}")
+        restaurant = Restaurant.objects.create(name=owner.username, owner_id=owner)
+        menu = Menu.objects.create(restaurant=restaurant, date=date.today())
+
+        try:
+            for shards in shard_counts:
+                elapsed, errors = self.run_writers(menu.id, shards, writers, increments)
+                counted = VoteTally.objects.filter(menu=menu).aggregate(
+                    total=Sum("count")
+                )["total"]
+                self.stdout.write(
+                    f"shards={shards:<3} writers={writers:<3} "
+                    f"increments={counted:<7} errors={errors:<5} "
+                    f"elapsed={elapsed:.2f}s throughput={counted / elapsed:.0f}/s"
+                )
+                VoteTally.objects.filter(menu=menu).delete()
+        finally:
+            owner.delete()
+
+    @staticmethod
+    def run_writers(
+        menu_id: int, shards: int, writers: int, increments: int
+    ) -> tuple[float, int]:
+        """
+        Run the writers in parallel, each incrementing the tally in its own transaction
+
+        :param menu_id:
+        :param shards:
+        :param writers:
+        :param increments:
+        :return: The elapsed time in seconds and the number of failed increments
+        """
+
+        def write() -> int:
+            errors = 0
+            try:
+                for _ in range(increments):
+                    try:
+                        with transaction.atomic():
+                            VoteTally.increment(menu_id, shards=shards)
+                    except OperationalError:
+                        errors += 1
+            finally:
+                connection.close()
+            return errors
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers) as executor:
+            errors = sum(executor.map(lambda _: write(), range(writers)))
+        return time.perf_counter() - started, errors
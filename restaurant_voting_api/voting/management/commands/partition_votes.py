@@ -0,0 +1,74 @@
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from voting.partitioning import (
+    add_months,
+    convert_to_partitioned,
+    create_partitions,
+    detach_partitions,
+    is_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Partition the votes table by month of the menu date on PostgreSQL. Creates the partitions of the coming "
+        "months and detaches the partitions of the old ones, run it on a schedule once the table is converted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Convert the votes table to a partitioned table first. "
+            "The table is locked while its rows are copied.",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Number of months after the current one to create partitions for.",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            help="Detach the partitions of the months before the given number of months before the current one.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the detached partitions instead of keeping them as tables.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["convert"]:
+                created = convert_to_partitioned(options["months_ahead"])
+            elif is_partitioned():
+                created = create_partitions(
+                    date.today(), add_months(date.today(), options["months_ahead"])
+                )
+            else:
+                raise CommandError(
+                    "The votes table is not partitioned, run the command with --convert first."
+                )
+
+            detached = []
+            if options["retain_months"] is not None:
+                detached = detach_partitions(
+                    add_months(date.today(), -options["retain_months"]),
+                    drop=options["drop"],
+                )
+        except (ImproperlyConfigured, ValueError) as error:
+            raise CommandError(error) from error
+
+        for name in created:
+            self.stdout.write(f"Created {name}.")
+        for name in detached:
+            self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name}.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(created)} partitions created, {len(detached)} detached."
+            )
+        )
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from restaurants.models import Menu
+from voting.models import VoteTally
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the vote tallies from the votes table and fix the menus that drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            action="append",
+            type=date.fromisoformat,
+            dest="dates",
+            help="Date to reconcile in YYYY-MM-DD format. Can be repeated. Defaults to today.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Reconcile the given number of days up to and including today.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Reconcile every day that has a menu.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report the drift without changing the tallies.",
+        )
+
+    def handle(self, *args, **options):
+        dates = self.get_dates(options)
+        fixed = 0
+
+        for date_menu in dates:
+            with transaction.atomic():
+                drift = VoteTally.rebuild(date_menu)
+                if options["check"]:
+                    transaction.set_rollback(True)
+
+            for menu_id, tally_count, vote_count in drift:
+                self.stdout.write(
+                    f"{date_menu} menu {menu_id}: tally {tally_count}, votes {vote_count}"
+                )
+            fixed += len(drift)
+
+        action = "Found" if options["check"] else "Fixed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{action} {fixed} drifted tallies over {len(dates)} day(s)."
+            )
+        )
+
+    @staticmethod
+    def get_dates(options) -> list[date]:
+        """
+        Get the dates to reconcile from the command options
+
+        :param options:
+        :return:
+        """
+
+        if options["all"]:
+            return list(
+                Menu.objects.order_by("date").values_list("date", flat=True).distinct()
+            )
+
+        if options["days"] is not None:
+            if options["days"] < 1:
+                raise CommandError("--days must be a positive number.")
+            today = date.today()
+            return [today - timedelta(days=days) for days in range(options["days"])]
+
+        return options["dates"] or [date.today()]
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from voting.seeding import clear_seed_data, seed_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with generated users, restaurants, daily menus with items, and votes skewed towards "
+        "a few popular restaurants, for scale testing. The same seed always generates the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--restaurants", type=int, default=50)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Number of days with menus, up to today.",
+        )
+        parser.add_argument(
+            "--items", type=int, default=5, help="Number of items per menu."
+        )
+        parser.add_argument(
+            "--votes",
+            type=int,
+            default=100000,
+            help="Number of votes, at most one per user and day.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of the restaurant popularity, 0 spreads the votes evenly.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="Number of rows per insert."
+        )
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Prefix of the generated usernames and restaurant names.",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete the data generated before with the same prefix first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted = clear_seed_data(options["prefix"])
+            self.stdout.write(f"Deleted {deleted} rows.")
+
+        started = time.perf_counter()
+        try:
+            created = seed_data(
+                users=options["users"],
+                restaurants=options["restaurants"],
+                days=options["days"],
+                items=options["items"],
+                votes=options["votes"],
+                seed=options["seed"],
+                skew=options["skew"],
+                batch_size=options["batch_size"],
+                prefix=options["prefix"],
+            )
+        except ValueError as error:
+            raise CommandError(error) from error
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                ", ".join(f"{count} {name}" for name, count in created.items())
+                + f" created in {elapsed:.1f}s."
+            )
+        )
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def populate_vote_tallies(apps, schema_editor):
+    Vote = apps.get_model("voting", "Vote")
+    VoteTally = apps.get_model("voting", "VoteTally")
+
+    VoteTally.objects.bulk_create(
+        VoteTally(menu_id=vote["menu"], date=vote["date"], count=vote["count"])
+        for vote in Vote.objects.values("menu")
+        .annotate(date=F("menu__date"), count=Count("id"))
+        .order_by()
+        .iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0002_alter_restaurant_owner_id"),
+        ("voting", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoteTally",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(db_index=True)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "menu",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tallies",
+                        to="restaurants.menu",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("menu",), name="unique_tally_per_menu"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_vote_tallies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0002_alter_restaurant_owner_id"),
+        ("voting", "0002_votetally"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="votetally",
+            name="unique_tally_per_menu",
+        ),
+        migrations.AddField(
+            model_name="votetally",
+            name="shard",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name="votetally",
+            constraint=models.UniqueConstraint(
+                fields=("menu", "shard"), name="unique_tally_shard_per_menu"
+            ),
+        ),
+    ]
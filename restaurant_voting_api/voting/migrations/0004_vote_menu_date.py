@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("voting", "0003_votetally_shard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="vote",
+            name="menu_date",
+            field=models.DateField(null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:19
+
+from django.db import migrations, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+
+BATCH_SIZE = 10000
+
+
+def backfill_menu_dates(apps, schema_editor):
+    """
+    Copy the date of the menu of each vote, a range of IDs per transaction, so the rows of a large table
+    are not all locked at once and the progress of the batches already done is kept if it is interrupted.
+    """
+
+    Menu = apps.get_model("restaurants", "Menu")
+    Vote = apps.get_model("voting", "Vote")
+
+    bounds = Vote.objects.filter(menu_date__isnull=True).aggregate(
+        first=Min("id"), last=Max("id")
+    )
+    if bounds["first"] is None:
+        return
+
+    menu_date = Subquery(Menu.objects.filter(id=OuterRef("menu_id")).values("date"))
+    for start in range(bounds["first"], bounds["last"] + 1, BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Vote.objects.filter(
+                id__gte=start, id__lt=start + BATCH_SIZE, menu_date__isnull=True
+            ).update(menu_date=menu_date)
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ("restaurants", "0003_menu_restaurant_date_idx"),
+        ("voting", "0004_vote_menu_date"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_menu_dates, migrations.RunPython.noop),
+    ]
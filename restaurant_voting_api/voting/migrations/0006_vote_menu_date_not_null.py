@@ -0,0 +1,87 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:19
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class SetNotNull(migrations.AlterField):
+    """
+    Make a nullable column NOT NULL. On PostgreSQL, SET NOT NULL scans the table under an ACCESS EXCLUSIVE lock,
+    unless a valid CHECK constraint already proves it, so the constraint is added NOT VALID and validated first,
+    which only blocks the writes of the table for the time of the catalog changes.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        model = to_state.apps.get_model(app_label, self.model_name)
+        quote_name = schema_editor.quote_name
+        table = quote_name(model._meta.db_table)
+        column = quote_name(model._meta.get_field(self.name).column)
+        constraint = quote_name(f"{model._meta.db_table}_{self.name}_not_null")
+        schema_editor.execute(
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID"
+        )
+        schema_editor.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
+        schema_editor.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+        schema_editor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}")
+
+
+class AddIndexConcurrentlyOnPostgreSQL(AddIndexConcurrently):
+    """
+    Build an index without blocking the writes of the table on PostgreSQL, like a regular index elsewhere
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            migrations.AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+
+class Migration(migrations.Migration):
+    # The indexes are built concurrently, which PostgreSQL does not allow in a transaction
+    atomic = False
+
+    dependencies = [
+        ("restaurants", "0003_menu_restaurant_date_idx"),
+        ("voting", "0005_backfill_vote_menu_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        SetNotNull(
+            model_name="vote",
+            name="menu_date",
+            field=models.DateField(),
+        ),
+        AddIndexConcurrentlyOnPostgreSQL(
+            model_name="vote",
+            index=models.Index(
+                fields=["menu_date", "menu"], name="vote_menu_date_menu_idx"
+            ),
+        ),
+        AddIndexConcurrentlyOnPostgreSQL(
+            model_name="vote",
+            index=models.Index(
+                fields=["user", "menu_date"], name="vote_user_menu_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0003_menu_restaurant_date_idx"),
+        ("voting", "0006_vote_menu_date_not_null"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedVoteSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(db_index=True)),
+                ("vote_count", models.IntegerField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "menu",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_summary",
+                        to="restaurants.menu",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,9 +1,13 @@
+import random
 from collections import namedtuple
 from datetime import date
 
+from core.day_version import bump_day_version
 from core.models import User
-from django.db import models
-from django.db.models import Count, Max
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Sum, Window
+from django.db.models.functions import Rank
 from restaurants.models import Menu
 
 
@@ -11,17 +15,31 @@ class Vote(models.Model):
     user: User = models.ForeignKey(User, on_delete=models.CASCADE)
     menu: Menu = models.ForeignKey(Menu, on_delete=models.CASCADE)
     vote_date: date = models.DateField(auto_now_add=True)
+    # The date of the menu, denormalized to filter the votes of a day without a join
+    menu_date: date = models.DateField()
 
     class Meta:
         """
         Metaclass for the Vote model. Defines the unique_together attribute to ensure that a user can only vote once
-        for a menu.
+        for a menu, and the indexes of the votes of a day by menu and of a user by day.
         """
 
+        # Once the votes table is partitioned by partition_votes, the database constraint is on (user, menu, menu_date),
+        # since a unique constraint of a partitioned table has to include its partition key. It is as strict, a menu
+        # having a single date, but no migration knows of it, so do not alter this one without partitioning in mind.
         unique_together = ("user", "menu")
+        indexes = [
+            models.Index(fields=["menu_date", "menu"], name="vote_menu_date_menu_idx"),
+            models.Index(fields=["user", "menu_date"], name="vote_user_menu_date_idx"),
+        ]
 
     def __str__(self):
-        return f"Vote by {self.user.username} for {self.menu.date}"
+        return f"Vote by {self.user.username} for {self.menu_date}"
+
+    def save(self, *args, **kwargs):
+        if self.menu_date is None:
+            self.menu_date = self.menu.date
+        super().save(*args, **kwargs)
 
     @staticmethod
     def is_user_voted(user: User, menu: Menu) -> bool:
@@ -33,10 +51,57 @@ class Vote(models.Model):
         :return:
         """
 
-        return Vote.objects.filter(user=user, menu=menu).exists()
+        # The menu date only narrows the lookup down to a partition when the votes table is partitioned
+        return Vote.objects.filter(user=user, menu=menu, menu_date=menu.date).exists()
+
+    @staticmethod
+    def cast_vote(user_id: int, menu_id: int) -> bool:
+        """
+        Insert a vote in a single statement. The menu existence and date checks are part of the INSERT ... SELECT,
+        and a duplicate vote is swallowed by ON CONFLICT DO NOTHING instead of raising an IntegrityError.
+        The vote tally of the menu is updated in the same transaction, and the version of the menu day is bumped
+        once it commits.
+
+        :param user_id:
+        :param menu_id:
+        :return: True if the vote was inserted, False if the menu is missing, closed or already voted for
+        """
+
+        today = date.today()
+        with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Vote._meta.db_table} (user_id, menu_id, menu_date, vote_date)
+                SELECT %s, id, date, %s FROM {Menu._meta.db_table} WHERE id = %s AND date >= %s
+                ON CONFLICT DO NOTHING
+                """,
+                [user_id, today, menu_id, today],
+            )
+            if cursor.rowcount != 1:
+                return False
+
+            bump_day_version(VoteTally.increment(menu_id))
+            return True
+
+    @staticmethod
+    def count_votes_by_menu(date_menu: date) -> models.QuerySet:
+        """
+        Count the votes of every menu for a specific date straight from the votes table.
+        The votes are counted from the index on the menu date and menu alone.
+
+        :param date_menu:
+        :return: QuerySet of dictionaries with menu IDs and vote counts
+        """
+
+        return (
+            Vote.objects.filter(menu_date=date_menu)
+            .values("menu")
+            .annotate(vote_count=Count("*"))
+            .order_by("menu")
+        )
 
     @staticmethod
-    def get_votes_for_day(date_menu: date = date.today()):
+    def get_votes_for_day(date_menu: date | None = None):
         """
         Get the votes for a specific date, including restaurant ID and the corresponding vote counts.
         By default, it returns the votes for today.
@@ -45,18 +110,19 @@ class Vote(models.Model):
         :return: A list of namedtuples with menu IDs, restaurant IDs, vote counts, and menu dates
         """
 
-        # The query retrieves the menu ID, restaurant ID, and vote count for each menu on the specified date.
-        votes = (
-            Vote.objects.filter(menu__date=date_menu)
-            .values("menu", "menu__date", "menu__restaurant", "menu__restaurant__id")
-            .annotate(vote_count=Count("id"))
+        # The tally keeps a few shard rows per menu, so the query does not depend on the number of votes.
+        tallies = (
+            VoteTally.objects.filter(date=date_menu or date.today())
+            .values("menu", "menu__restaurant")
+            .annotate(vote_count=Sum("count"))
+            .filter(vote_count__gt=0)
             .order_by("menu")
         )
 
         VoteCount = namedtuple("VoteCount", ["menu", "restaurant_id", "vote_count"])
         return [
-            VoteCount(vote["menu"], vote["menu__restaurant__id"], vote["vote_count"])
-            for vote in votes
+            VoteCount(tally["menu"], tally["menu__restaurant"], tally["vote_count"])
+            for tally in tallies
         ]
 
     @staticmethod
@@ -65,25 +131,199 @@ class Vote(models.Model):
         Get the menus with the maximum vote count for today, including restaurant ID and the corresponding vote counts.
         If multiple menus have the same vote count, they are all returned.
 
-        :return: A list of dictionaries with menu IDs, restaurant IDs, vote counts, and menu dates
+        The menus are ranked by the sum of their tally shards with a window function, so the winners are found
+        in one query, and their restaurant and items are loaded with it instead of once per menu.
+
+        :return: QuerySet of menus annotated with vote_count
         """
 
-        # Annotate each menu with its vote count for today
-        votes = (
-            Vote.objects.filter(menu__date=date.today())
-            .values("menu", "menu__restaurant")
-            .annotate(vote_count=Count("id"))
+        return (
+            Menu.objects.filter(date=date.today())
+            .annotate(vote_count=Sum("tallies__count"))
+            .filter(vote_count__gt=0)
+            .annotate(rank=Window(Rank(), order_by=F("vote_count").desc()))
+            .filter(rank=1)
+            .with_details()
+            .order_by("id")
         )
 
-        # Get the maximum vote count for today
-        max_vote_count = votes.aggregate(max_votes=Max("vote_count"))["max_votes"]
 
-        # Filter menus that have the maximum vote count
-        top_votes = votes.filter(vote_count=max_vote_count)
+class VoteTally(models.Model):
+    """
+    Keeps the number of votes of a menu, so the daily statistics read a few rows per menu instead of every vote.
+    The count of a menu is split over settings.VOTE_TALLY_SHARDS rows, so concurrent votes for a popular menu
+    do not all wait for the lock of the same row. The votes of a menu are the sum of its shards.
+
+    Attributes:
+        menu (Menu): The menu the votes were cast for.
+        date (date): The date of the menu, denormalized to filter the tallies of a day without a join.
+        shard (int): The shard number of the row.
+        count (int): The number of votes counted by the shard.
+    """
+
+    menu: Menu = models.ForeignKey(
+        Menu, on_delete=models.CASCADE, related_name="tallies"
+    )
+    date: date = models.DateField(db_index=True)
+    shard: int = models.PositiveSmallIntegerField(default=0)
+    count: int = models.IntegerField(default=0)
 
-        # Get the actual menus based on the top votes
-        menus_with_max_votes = Menu.objects.filter(
-            id__in=[vote["menu"] for vote in top_votes]
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["menu", "shard"], name="unique_tally_shard_per_menu"
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.count} votes for {self.menu_id} on {self.date} (shard {self.shard})"
         )
 
-        return menus_with_max_votes
+    @staticmethod
+    def increment(menu_id: int, amount: int = 1, shards: int | None = None) -> date:
+        """
+        Add votes to a random shard of the menu tally, creating the shard row on its first vote.
+        Must run in the transaction that inserts the votes.
+
+        :param menu_id:
+        :param amount:
+        :param shards: The number of shards to pick from. Defaults to settings.VOTE_TALLY_SHARDS.
+        :return: The date of the menu
+        """
+
+        shard = random.randrange(shards or settings.VOTE_TALLY_SHARDS)
+        table = VoteTally._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (menu_id, date, shard, count)
+                SELECT id, date, %s, %s FROM {Menu._meta.db_table} WHERE id = %s
+                ON CONFLICT (menu_id, shard) DO UPDATE SET count = {table}.count + excluded.count
+                RETURNING date
+                """,
+                [shard, amount, menu_id],
+            )
+            (date_menu,) = cursor.fetchone()
+        # SQLite returns the date of a raw query as a string
+        return VoteTally._meta.get_field("date").to_python(date_menu)
+
+    @staticmethod
+    def decrement(menu_id: int, amount: int = 1) -> None:
+        """
+        Remove votes from the largest shard of the menu tally. Only updates an existing row, so it is safe to call
+        while the menu itself is being deleted.
+
+        :param menu_id:
+        :param amount:
+        :return:
+        """
+
+        shard_id = (
+            VoteTally.objects.filter(menu_id=menu_id)
+            .order_by("-count")
+            .values_list("id", flat=True)
+            .first()
+        )
+        VoteTally.objects.filter(id=shard_id).update(count=models.F("count") - amount)
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(
+        date_menu: date, menu_ids: list[int] | None = None
+    ) -> list[tuple[int, int, int]]:
+        """
+        Recount the tallies of a day from the votes table and fix the menus that drifted.
+        The shards of a fixed menu are collapsed into a single row.
+
+        :param date_menu:
+        :param menu_ids: Only recount these menus of the day. Defaults to every menu of the day.
+        :return: A list of (menu ID, tally count, actual count) tuples for the menus that were fixed
+        """
+
+        tallies = VoteTally.objects.filter(date=date_menu)
+        votes = Vote.count_votes_by_menu(date_menu)
+        if menu_ids is not None:
+            tallies = tallies.filter(menu__in=menu_ids)
+            votes = votes.filter(menu__in=menu_ids)
+
+        # Lock the tally rows, so no vote is counted while they are rebuilt
+        list(tallies.select_for_update().values_list("id", flat=True))
+
+        actual = {vote["menu"]: vote["vote_count"] for vote in votes}
+        # The votes moved to the archive still count
+        archived = ArchivedVoteSummary.objects.filter(date=date_menu)
+        if menu_ids is not None:
+            archived = archived.filter(menu__in=menu_ids)
+        for summary in archived.values("menu", "vote_count"):
+            actual[summary["menu"]] = (
+                actual.get(summary["menu"], 0) + summary["vote_count"]
+            )
+        current = {
+            tally["menu"]: tally["vote_count"]
+            for tally in tallies.values("menu")
+            .annotate(vote_count=Sum("count"))
+            .order_by()
+        }
+
+        drift = [
+            (menu_id, current.get(menu_id, 0), actual.get(menu_id, 0))
+            for menu_id in sorted(actual.keys() | current.keys())
+            if current.get(menu_id, 0) != actual.get(menu_id, 0)
+        ]
+
+        tallies.filter(menu__in=[menu_id for menu_id, _, _ in drift]).delete()
+        VoteTally.objects.bulk_create(
+            VoteTally(menu_id=menu_id, date=date_menu, count=count)
+            for menu_id, _, count in drift
+            if count
+        )
+
+        return drift
+
+
+class ArchivedVoteSummary(models.Model):
+    """
+    The number of votes of a menu moved from the votes table to the archive, written by the archive_votes command.
+
+    Attributes:
+        menu (Menu): The menu the votes were cast for.
+        date (date): The date of the menu.
+        vote_count (int): The number of archived votes.
+        archived_at (datetime): When the votes were archived.
+    """
+
+    menu: Menu = models.OneToOneField(
+        Menu, on_delete=models.CASCADE, related_name="archived_summary"
+    )
+    date: date = models.DateField(db_index=True)
+    vote_count: int = models.IntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.vote_count} archived votes for {self.menu_id} on {self.date}"
+
+    @staticmethod
+    def add_vote_counts(date_menu: date, counts: dict[int, int]) -> None:
+        """
+        Add the votes of the menus of a day moved out of the votes table to their summaries
+
+        :param date_menu:
+        :param counts: The number of votes moved by menu ID
+        :return:
+        """
+
+        existing = set(
+            ArchivedVoteSummary.objects.filter(
+                date=date_menu, menu__in=counts
+            ).values_list("menu", flat=True)
+        )
+        for menu_id in existing:
+            ArchivedVoteSummary.objects.filter(menu=menu_id).update(
+                vote_count=F("vote_count") + counts[menu_id]
+            )
+        ArchivedVoteSummary.objects.bulk_create(
+            ArchivedVoteSummary(menu_id=menu_id, date=date_menu, vote_count=count)
+            for menu_id, count in counts.items()
+            if menu_id not in existing
+        )
@@ -0,0 +1,283 @@
+import re
+from collections import defaultdict
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+
+from .models import ArchivedVoteSummary, Vote
+
+TABLE = Vote._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_PATTERN = re.compile(rf"^{TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+# Every unique constraint of a partitioned table has to include its partition key
+PARTITION_KEY = "menu_date"
+
+
+def check_vendor() -> None:
+    """
+    Raise an error when the database does not support declarative partitioning
+
+    :return:
+    """
+
+    if connection.vendor != "postgresql":
+        raise ImproperlyConfigured("Vote partitioning needs PostgreSQL.")
+
+
+def add_months(day: date, months: int) -> date:
+    """
+    Get the first day of the month a number of months after the month of a day
+
+    :param day:
+    :param months: Can be negative
+    :return:
+    """
+
+    month = day.year * 12 + day.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def get_partition_name(month: date) -> str:
+    """
+    Get the name of the partition of the votes for the menus of a month
+
+    :param month:
+    :return:
+    """
+
+    return f"{TABLE}_p{month.year}_{month.month:02d}"
+
+
+def set_constraints_immediate(cursor) -> None:
+    """
+    Check the deferred foreign keys of the transaction now, and the ones of its next statements as they run.
+    PostgreSQL cannot alter or drop a table with pending trigger events, which the deferred checks of the rows
+    written earlier in the transaction are.
+
+    :param cursor:
+    :return:
+    """
+
+    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+def is_partitioned() -> bool:
+    """
+    Check if the votes table has been converted to a partitioned table
+
+    :return:
+    """
+
+    check_vendor()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)",
+            [TABLE],
+        )
+        return cursor.fetchone()[0]
+
+
+def get_partitions() -> dict[date, str]:
+    """
+    Get the monthly partitions attached to the votes table, without the default partition
+
+    :return: The name of each partition by the first day of its month
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match is not None:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return dict(sorted(partitions.items()))
+
+
+@transaction.atomic
+def convert_to_partitioned(months_ahead: int = 3) -> list[str]:
+    """
+    Replace the votes table with a table partitioned by month of the menu date, with the same rows, columns,
+    indexes and foreign keys. The primary key and the unique constraints get the menu date appended, which keeps
+    them unique since a menu has a single date. The table is locked while its rows are copied.
+
+    :param months_ahead: Number of months after the current one to create partitions for
+    :return: The names of the created partitions
+    """
+
+    check_vendor()
+    if is_partitioned():
+        raise ValueError(f"{TABLE} is already partitioned.")
+
+    old_table = f"{TABLE}_unpartitioned"
+    with connection.cursor() as cursor:
+        set_constraints_immediate(cursor)
+        cursor.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            """
+            SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')
+            """,
+            [TABLE],
+        )
+        constraints = cursor.fetchall()
+        # The indexes backing the constraints are recreated with them
+        cursor.execute(
+            """
+            SELECT indexdef FROM pg_indexes
+            WHERE tablename = %s AND indexname NOT IN (
+                SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass
+            )
+            """,
+            [TABLE, TABLE],
+        )
+        indexes = [indexdef for (indexdef,) in cursor.fetchall()]
+        cursor.execute(f"SELECT MIN({PARTITION_KEY}) FROM {TABLE}")
+        (first_date,) = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {old_table}")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (LIKE {old_table} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({PARTITION_KEY})"
+        )
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT")
+
+    created = create_partitions(
+        first_date or date.today(), add_months(date.today(), months_ahead)
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {old_table}")
+        # Frees the names of the constraints, indexes and sequence of the old table
+        cursor.execute(f"DROP TABLE {old_table}")
+
+        for name, constraint_type, definition in constraints:
+            if constraint_type in ("p", "u") and PARTITION_KEY not in definition:
+                # Appended to the column list, the first parenthesized part of the definition
+                definition = definition.replace(")", f", {PARTITION_KEY})", 1)
+            cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+        # Read before the table was renamed, they create the indexes on the partitioned table
+        for indexdef in indexes:
+            cursor.execute(indexdef)
+
+        sequence = f"{TABLE}_id_seq"
+        cursor.execute(f"CREATE SEQUENCE {sequence} OWNED BY {TABLE}.id")
+        cursor.execute(
+            f"SELECT setval(%s, COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}",
+            [sequence],
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{sequence}')"
+        )
+    return created
+
+
+@transaction.atomic
+def create_partitions(first_month: date, last_month: date) -> list[str]:
+    """
+    Create the missing partitions of the months from first_month to last_month. The votes of a new partition's
+    month that were inserted in the default partition, for lack of a partition, are moved to it.
+
+    :param first_month: Any day of the first month
+    :param last_month: Any day of the last month
+    :return: The names of the created partitions
+    """
+
+    check_vendor()
+    existing = get_partitions()
+    created = []
+    month = add_months(first_month, 0)
+    with connection.cursor() as cursor:
+        set_constraints_immediate(cursor)
+        while month <= last_month:
+            if month not in existing:
+                name = get_partition_name(month)
+                bounds = [month, add_months(month, 1)]
+                cursor.execute(
+                    f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+                    f"WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s)",
+                    bounds,
+                )
+                (misplaced,) = cursor.fetchone()
+
+                if misplaced:
+                    # The partition cannot be created while the default partition has rows in its range
+                    cursor.execute(
+                        f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"
+                    )
+                cursor.execute(
+                    f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ('{bounds[0].isoformat()}') TO ('{bounds[1].isoformat()}')"
+                )
+                if misplaced:
+                    cursor.execute(
+                        f"INSERT INTO {TABLE} SELECT * FROM {DEFAULT_PARTITION} "
+                        f"WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s",
+                        bounds,
+                    )
+                    cursor.execute(
+                        f"DELETE FROM {DEFAULT_PARTITION} "
+                        f"WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s",
+                        bounds,
+                    )
+                    cursor.execute(
+                        f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+                    )
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+@transaction.atomic
+def detach_partitions(before: date, *, drop: bool = False) -> list[str]:
+    """
+    Detach the partitions of the months before a date from the votes table. A detached partition is kept as
+    a table of its own, without foreign keys so it does not block deleting users and menus, unless dropped.
+    The vote tallies of its days are kept, so their statistics are still served, and its votes are added to the
+    archived vote summaries, which VoteTally.rebuild counts.
+
+    :param before: Detach the months ending on or before this date
+    :param drop: Drop the detached partitions
+    :return: The names of the detached partitions
+    """
+
+    check_vendor()
+    detached = []
+    with connection.cursor() as cursor:
+        set_constraints_immediate(cursor)
+        for month, name in get_partitions().items():
+            if add_months(month, 1) > before:
+                continue
+
+            cursor.execute(
+                f"SELECT {PARTITION_KEY}, menu_id, COUNT(*) FROM {name} GROUP BY {PARTITION_KEY}, menu_id"
+            )
+            counts = defaultdict(dict)
+            for day, menu_id, count in cursor.fetchall():
+                counts[day][menu_id] = count
+            for day, day_counts in counts.items():
+                ArchivedVoteSummary.add_vote_counts(day, day_counts)
+
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            if drop:
+                cursor.execute(f"DROP TABLE {name}")
+            else:
+                cursor.execute(
+                    "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+                    [name],
+                )
+                for (constraint,) in cursor.fetchall():
+                    cursor.execute(f"ALTER TABLE {name} DROP CONSTRAINT {constraint}")
+            detached.append(name)
+    return detached
@@ -0,0 +1,212 @@
+import csv
+import io
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+from core.day_version import bump_day_version
+from core.models import User
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connection, transaction
+from restaurants.cache import invalidate_today_menu
+from restaurants.models import Item, Menu, Restaurant
+
+from .models import Vote, VoteTally
+
+DISHES = (
+    "Borscht",
+    "Varenyky",
+    "Caesar salad",
+    "Chicken soup",
+    "Pasta carbonara",
+    "Pad thai",
+    "Falafel wrap",
+    "Beef burger",
+    "Mushroom risotto",
+    "Greek salad",
+    "Ramen",
+    "Fish and chips",
+)
+
+
+def seed_data(
+    *,
+    users: int,
+    restaurants: int,
+    days: int,
+    items: int,
+    votes: int,
+    seed: int = 0,
+    skew: float = 1.1,
+    batch_size: int = 10000,
+    prefix: str = "seed",
+    end_date: date | None = None,
+) -> dict[str, int]:
+    """
+    Fill the database with users, restaurants, a menu per restaurant and day with its items, and votes.
+
+    Each vote is from a distinct user and day, so there can be at most users * days votes. The menus are picked
+    with a Zipf distribution of the given skew over a fixed popularity ranking of the restaurants, so a few
+    restaurants get most of the votes. The same seed always generates the same data.
+
+    :param users:
+    :param restaurants:
+    :param days: Number of days with menus, ending on end_date
+    :param items: Number of items per menu
+    :param votes:
+    :param seed:
+    :param skew: Exponent of the Zipf distribution, 0 spreads the votes evenly
+    :param batch_size: Number of rows per insert
+    :param prefix: Prefix of the usernames and restaurant names, to tell the generated rows apart
+    :param end_date: Last day with menus, defaults to today
+    :return: The number of rows created by model
+    """
+
+    if votes > users * days:
+        raise ValueError(
+            f"At most users * days = {users * days} votes can be generated."
+        )
+
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    dates = [end_date - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+
+    with transaction.atomic():
+        created_users = User.objects.bulk_create(
+            (
+                User(
+                    username=f"{prefix}-user-{index}",
+                    email=f"{prefix}-user-{index}@example.com",
+                    password=UNUSABLE_PASSWORD_PREFIX,
+                )
+                for index in range(users)
+            ),
+            batch_size=batch_size,
+        )
+        created_restaurants = Restaurant.objects.bulk_create(
+            (
+                Restaurant(
+                    name=f"{prefix}-restaurant-{index}",
+                    owner_id=created_users[index % users],
+                )
+                for index in range(restaurants)
+            ),
+            batch_size=batch_size,
+        )
+        menus = Menu.objects.bulk_create(
+            (
+                Menu(restaurant=restaurant, date=date_menu)
+                for date_menu in dates
+                for restaurant in created_restaurants
+            ),
+            batch_size=batch_size,
+        )
+        Item.objects.bulk_create(
+            (
+                Item(
+                    menu=menu,
+                    name=rng.choice(DISHES),
+                    price=round(rng.uniform(2, 20), 2),
+                )
+                for menu in menus
+                for _ in range(items)
+            ),
+            batch_size=batch_size,
+        )
+
+        # The menus are created day by day, in the order of the restaurants
+        menu_ids = [menu.id for menu in menus]
+        popularity = list(range(restaurants))
+        rng.shuffle(popularity)
+        cum_weights = list(
+            accumulate(1 / (rank + 1) ** skew for rank in range(restaurants))
+        )
+        picks = rng.choices(popularity, cum_weights=cum_weights, k=votes)
+        adapted_dates = [
+            connection.ops.adapt_datefield_value(date_menu) for date_menu in dates
+        ]
+
+        # Inserted day by day, like they are cast on the day of their menu
+        pairs = sorted(rng.sample(range(users * days), votes))
+        rows = []
+        for pair, restaurant_index in zip(pairs, picks, strict=True):
+            day_index, user_index = divmod(pair, users)
+            rows.append(
+                (
+                    created_users[user_index].id,
+                    menu_ids[day_index * restaurants + restaurant_index],
+                    adapted_dates[day_index],
+                    adapted_dates[day_index],
+                )
+            )
+        insert_votes(rows, batch_size)
+
+        for date_menu in dates:
+            VoteTally.rebuild(date_menu)
+            bump_day_version(date_menu)
+            invalidate_today_menu(date_menu)
+
+    return {
+        "users": users,
+        "restaurants": restaurants,
+        "menus": len(menus),
+        "items": len(menus) * items,
+        "votes": votes,
+    }
+
+
+def insert_votes(rows: list[tuple], batch_size: int) -> None:
+    """
+    Insert (user ID, menu ID, menu date, vote date) rows in the votes table, with COPY on PostgreSQL.
+    The dates are adapted to the database already.
+
+    :param rows:
+    :param batch_size:
+    :return:
+    """
+
+    table = Vote._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            for start in range(0, len(rows), batch_size):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows[start : start + batch_size])
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {table} (user_id, menu_id, menu_date, vote_date) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            return
+
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(
+                f"INSERT INTO {table} (user_id, menu_id, menu_date, vote_date) VALUES (%s, %s, %s, %s)",
+                rows[start : start + batch_size],
+            )
+
+
+def clear_seed_data(prefix: str = "seed") -> int:
+    """
+    Delete the generated users, with their restaurants, menus and votes
+
+    :param prefix:
+    :return: The number of deleted rows
+    """
+
+    users = User.objects.filter(username__startswith=f"{prefix}-user-")
+    user_ids = list(users.values_list("id", flat=True))
+
+    deleted_votes = 0
+    with transaction.atomic():
+        # Deleted without the signals of the votes, which would update the tallies one vote at a time
+        with connection.cursor() as cursor:
+            for start in range(0, len(user_ids), 500):
+                batch = user_ids[start : start + 500]
+                cursor.execute(
+                    f"DELETE FROM {Vote._meta.db_table} "
+                    f"WHERE user_id IN ({', '.join(['%s'] * len(batch))})",
+                    batch,
+                )
+                deleted_votes += cursor.rowcount
+        deleted, _ = users.delete()
+    return deleted_votes + deleted
@@ -1,4 +1,7 @@
+from datetime import date
+
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from restaurants.models import Menu
 
 from .models import Vote
@@ -32,6 +35,52 @@ class VoteSerializer(serializers.ModelSerializer):
         return data
 
 
+class VoteCreateSerializer(serializers.Serializer):
+    user = serializers.IntegerField()
+    menu = serializers.IntegerField()
+
+    def create(self, validated_data) -> dict:
+        """
+        Insert the vote with a single conditional statement. The reason of a rejected vote is only looked up
+        when the insert did not happen, so the successful path stays at one round trip.
+
+        :param validated_data:
+        :return:
+        """
+
+        if Vote.cast_vote(validated_data["user"], validated_data["menu"]):
+            return validated_data
+
+        raise serializers.ValidationError(
+            {
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.get_rejection_reason(validated_data["menu"])
+                ]
+            }
+        )
+
+    @staticmethod
+    def get_rejection_reason(menu_id: int) -> str:
+        """
+        Get the reason why a vote for the menu was not inserted
+
+        :param menu_id:
+        :return:
+        """
+
+        menu_date = (
+            Menu.objects.filter(id=menu_id).values_list("date", flat=True).first()
+        )
+
+        if menu_date is None:
+            return "The menu does not exist."
+
+        if menu_date < date.today():
+            return "Voting for this menu is closed."
+
+        return "You have already voted for this menu."
+
+
 class VoteStatisticsSerializer(serializers.Serializer):
     menu = serializers.IntegerField()
     vote_count = serializers.IntegerField()
@@ -0,0 +1,36 @@
+from core.day_version import bump_day_version
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Vote, VoteTally
+
+
+@receiver(post_save, sender=Vote)
+def increment_vote_tally(sender, instance: Vote, created: bool, **kwargs) -> None:
+    """
+    Count a vote saved through the ORM. Votes inserted by Vote.cast_vote update the tally themselves.
+
+    :param sender:
+    :param instance:
+    :param created:
+    :param kwargs:
+    :return:
+    """
+
+    if created:
+        bump_day_version(VoteTally.increment(instance.menu_id))
+
+
+@receiver(post_delete, sender=Vote)
+def decrement_vote_tally(sender, instance: Vote, **kwargs) -> None:
+    """
+    Uncount a deleted vote, including votes removed by a cascade.
+
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+
+    VoteTally.decrement(instance.menu_id)
+    bump_day_version(instance.menu_date)
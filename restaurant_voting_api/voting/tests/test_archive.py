@@ -0,0 +1,160 @@
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from core.models import User
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from restaurants.models import Menu, Restaurant
+from voting import archive
+from voting.models import ArchivedVoteSummary, Vote, VoteTally
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name
+
+        owner = User.objects.create_user(username="owner", password="password")
+        self.restaurants = [
+            Restaurant.objects.create(name=f"Restaurant {index}", owner_id=owner)
+            for index in range(2)
+        ]
+        self.today = date.today()
+        self.old_day = self.today - timedelta(days=40)
+        self.older_day = self.today - timedelta(days=41)
+        self.users = [
+            User.objects.create_user(username=f"user{index}") for index in range(4)
+        ]
+
+        # Three votes for the first restaurant and one for the second on the old day, one on the older day
+        self.old_menus = [
+            Menu.objects.create(restaurant=restaurant, date=self.old_day)
+            for restaurant in self.restaurants
+        ]
+        for user in self.users[:3]:
+            Vote.objects.create(user=user, menu=self.old_menus[0])
+        Vote.objects.create(user=self.users[3], menu=self.old_menus[1])
+        older_menu = Menu.objects.create(
+            restaurant=self.restaurants[1], date=self.older_day
+        )
+        Vote.objects.create(user=self.users[0], menu=older_menu)
+        self.menu = Menu.objects.create(restaurant=self.restaurants[0], date=self.today)
+        Vote.objects.create(user=self.users[0], menu=self.menu)
+
+    def test_archive_votes(self):
+        """Test that the old votes are moved to memory-mapped shards with a summary per menu."""
+        archived = archive.archive_votes(self.today - timedelta(days=30), self.path)
+
+        self.assertEqual(archived, {self.older_day: 1, self.old_day: 4})
+        self.assertEqual(
+            list(Vote.objects.values_list("menu", flat=True)), [self.menu.id]
+        )
+        self.assertEqual(
+            archive.get_archived_days(self.path), [self.older_day, self.old_day]
+        )
+
+        columns = archive.load_day(self.old_day, self.path)
+        self.assertIsInstance(columns["user"], np.memmap)
+        self.assertEqual(
+            sorted(columns["user"].tolist()), [user.id for user in self.users]
+        )
+        self.assertEqual(
+            dict(
+                ArchivedVoteSummary.objects.filter(date=self.old_day).values_list(
+                    "menu", "vote_count"
+                )
+            ),
+            {self.old_menus[0].id: 3, self.old_menus[1].id: 1},
+        )
+        # The tallies still count the archived votes, and a rebuild agrees
+        self.assertEqual(len(Vote.get_votes_for_day(self.old_day)), 2)
+        self.assertEqual(VoteTally.rebuild(self.old_day), [])
+
+    def test_large_ids(self):
+        """Test that IDs beyond the range of 32-bit integers are archived as they are."""
+        vote_id = 2**31 + 1
+        Vote.objects.filter(menu=self.old_menus[1]).update(id=vote_id)
+
+        archive.archive_votes(self.today - timedelta(days=30), self.path)
+
+        columns = archive.load_day(self.old_day, self.path)
+        self.assertIn(vote_id, columns["id"].tolist())
+
+    def test_statistics(self):
+        """Test that the votes per restaurant are counted from the archive."""
+        archive.archive_votes(self.today - timedelta(days=30), self.path)
+        first, second = self.restaurants
+
+        self.assertEqual(
+            archive.count_votes_by_restaurant(self.older_day, self.old_day, self.path),
+            {first.id: 3, second.id: 2},
+        )
+        self.assertEqual(
+            archive.count_votes_by_restaurant(self.old_day, self.today, self.path),
+            {first.id: 3, second.id: 1},
+        )
+        self.assertEqual(
+            archive.count_restaurant_votes_by_day(
+                second.id, self.older_day, self.today, self.path
+            ),
+            {self.older_day: 1, self.old_day: 1},
+        )
+
+    def test_late_votes(self):
+        """Test that the votes added to an archived day are archived with the previous ones."""
+        archive.archive_votes(self.today - timedelta(days=30), self.path)
+        Vote.objects.create(user=self.users[3], menu=self.old_menus[0])
+
+        self.assertEqual(archive.archive_day(self.old_day, self.path), 1)
+        self.assertEqual(len(archive.load_day(self.old_day, self.path)["user"]), 5)
+        self.assertEqual(
+            ArchivedVoteSummary.objects.get(menu=self.old_menus[0]).vote_count, 4
+        )
+
+    def test_votes_written_meanwhile_are_kept(self):
+        """Test that only the votes written to the shard are deleted from the table."""
+        write_shard = archive.write_shard
+
+        def write_shard_and_vote(*args):
+            write_shard(*args)
+            Vote.objects.create(user=self.users[3], menu=self.old_menus[0])
+
+        with mock.patch.object(archive, "write_shard", write_shard_and_vote):
+            self.assertEqual(archive.archive_day(self.old_day, self.path), 4)
+
+        self.assertEqual(Vote.objects.filter(menu_date=self.old_day).count(), 1)
+        self.assertEqual(len(archive.load_day(self.old_day, self.path)["id"]), 4)
+
+    def test_failed_archive_retried(self):
+        """Test that the votes of a shard written by a failed run are not archived twice by the next one."""
+        with (
+            mock.patch.object(
+                ArchivedVoteSummary, "add_vote_counts", side_effect=DatabaseError
+            ),
+            self.assertRaises(DatabaseError),
+        ):
+            archive.archive_day(self.old_day, self.path)
+        self.assertEqual(Vote.objects.filter(menu_date=self.old_day).count(), 4)
+
+        self.assertEqual(archive.archive_day(self.old_day, self.path), 4)
+
+        columns = archive.load_day(self.old_day, self.path)
+        self.assertEqual(len(set(columns["id"].tolist())), len(columns["id"]))
+        self.assertEqual(len(columns["id"]), 4)
+        self.assertEqual(
+            ArchivedVoteSummary.objects.get(menu=self.old_menus[0]).vote_count, 3
+        )
+
+    def test_command(self):
+        """Test that the command archives the votes older than the retention period."""
+        out = StringIO()
+        with override_settings(VOTE_ARCHIVE={"PATH": self.path, "RETAIN_DAYS": 40}):
+            call_command("archive_votes", stdout=out)
+
+        self.assertIn("1 votes of 1 days archived", out.getvalue())
+        self.assertEqual(archive.get_archived_days(self.path), [self.older_day])
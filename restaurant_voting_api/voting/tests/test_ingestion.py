@@ -0,0 +1,180 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from core.metrics import votes_dropped
+from core.models import User
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurants.models import Menu, Restaurant
+from voting.ingestion import QueueFull, VoteIngestionQueue
+from voting.models import Vote, VoteTally
+
+
+class VoteIngestionQueueTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.restaurant = Restaurant.objects.create(
+            name="Test Restaurant", owner_id=self.user
+        )
+        self.menu = Menu.objects.create(restaurant=self.restaurant, date=date.today())
+        self.queue = VoteIngestionQueue(max_size=10, batch_size=3, flush_interval=0)
+
+    def test_submit_and_flush(self):
+        """Test that queued votes are written and counted on flush"""
+        users = [
+            User.objects.create_user(username=f"user{index}", password="password")
+            for index in range(5)
+        ]
+        for user in users:
+            self.assertIsNone(self.queue.submit(user.id, self.menu.id))
+
+        self.assertEqual(Vote.objects.count(), 0)
+        self.assertEqual(self.queue.flush(), 5)
+        self.assertEqual(Vote.objects.count(), 5)
+        self.assertEqual(Vote.get_votes_for_day(date.today())[0].vote_count, 5)
+
+    def test_duplicate_vote_rejected_from_index(self):
+        """Test that a second vote for the same menu is rejected without queueing it"""
+        self.assertIsNone(self.queue.submit(self.user.id, self.menu.id))
+        self.assertEqual(
+            self.queue.submit(self.user.id, self.menu.id),
+            "You have already voted for this menu.",
+        )
+        self.assertEqual(self.queue.queue.qsize(), 1)
+
+    def test_existing_vote_rejected_from_index(self):
+        """Test that votes already in the database are loaded into the index"""
+        Vote.objects.create(user=self.user, menu=self.menu)
+        self.assertEqual(
+            self.queue.submit(self.user.id, self.menu.id),
+            "You have already voted for this menu.",
+        )
+
+    def test_closed_and_missing_menus_rejected(self):
+        """Test that votes for menus that are not open are rejected"""
+        past_menu = Menu.objects.create(
+            restaurant=self.restaurant, date=date.today() - timedelta(days=1)
+        )
+        self.assertEqual(
+            self.queue.submit(self.user.id, past_menu.id),
+            "Voting for this menu is closed.",
+        )
+        self.assertEqual(
+            self.queue.submit(self.user.id, 9999), "The menu does not exist."
+        )
+
+    def test_conflicting_votes_dropped(self):
+        """Test that a vote written by another process meanwhile is not counted twice"""
+        self.queue.submit(self.user.id, self.menu.id)
+        Vote.cast_vote(self.user.id, self.menu.id)
+
+        self.queue.flush()
+
+        self.assertEqual(Vote.objects.count(), 1)
+        self.assertEqual(Vote.get_votes_for_day(date.today())[0].vote_count, 1)
+
+    def test_votes_added_to_tally_shards(self):
+        """Test that a batch adds its votes to the tally shards instead of recounting them"""
+        VoteTally.objects.create(menu=self.menu, date=self.menu.date, shard=0, count=10)
+        self.queue.submit(self.user.id, self.menu.id)
+
+        with self.settings(VOTE_TALLY_SHARDS=1):
+            self.queue.flush()
+
+        self.assertEqual(VoteTally.objects.get(menu=self.menu).count, 11)
+
+    def test_failed_batch_dropped(self):
+        """Test that the votes of a batch that cannot be written are dropped after the retries and can be cast again"""
+        self.queue.RETRY_DELAY = 0
+        self.queue.submit(self.user.id, self.menu.id)
+        dropped = votes_dropped.values.get(("write_behind",), 0)
+
+        with patch.object(
+            VoteTally, "increment", side_effect=DatabaseError("down")
+        ) as increment:
+            self.queue.flush()
+
+        self.assertEqual(increment.call_count, VoteIngestionQueue.WRITE_ATTEMPTS)
+        self.assertFalse(Vote.objects.exists())
+        self.assertEqual(votes_dropped.values[("write_behind",)], dropped + 1)
+        self.assertIsNone(self.queue.submit(self.user.id, self.menu.id))
+        self.queue.flush()
+        self.assertEqual(Vote.objects.count(), 1)
+
+    def test_queue_full(self):
+        """Test that a full queue pushes back instead of growing"""
+        full_queue = VoteIngestionQueue(max_size=1, batch_size=1, flush_interval=0)
+        other_user = User.objects.create_user(username="other", password="password")
+        full_queue.submit(self.user.id, self.menu.id)
+
+        with self.assertRaises(QueueFull):
+            full_queue.submit(other_user.id, self.menu.id)
+
+        # The rejected vote can be retried once there is room again
+        full_queue.flush()
+        self.assertIsNone(full_queue.submit(other_user.id, self.menu.id))
+
+
+@override_settings(
+    VOTE_INGESTION={
+        "MODE": "write_behind",
+        "QUEUE_SIZE": 1,
+        "BATCH_SIZE": 1,
+        "FLUSH_INTERVAL_MS": 0,
+    }
+)
+class WriteBehindVoteViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.restaurant = Restaurant.objects.create(
+            name="Test Restaurant", owner_id=self.user
+        )
+        self.menu = Menu.objects.create(restaurant=self.restaurant, date=date.today())
+        self.queue = VoteIngestionQueue(max_size=1, batch_size=1, flush_interval=0)
+        self.client.force_authenticate(user=self.user)
+
+        patcher = patch("voting.views.get_ingestion_queue", return_value=self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_vote_accepted(self):
+        response = self.client.post(
+            reverse("vote-list"), {"menu": self.menu.id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {"user": self.user.id, "menu": self.menu.id})
+
+        self.queue.flush()
+        self.assertTrue(Vote.objects.filter(user=self.user, menu=self.menu).exists())
+
+    def test_vote_rejected(self):
+        self.client.post(reverse("vote-list"), {"menu": self.menu.id}, format="json")
+        self.queue.flush()
+
+        response = self.client.post(
+            reverse("vote-list"), {"menu": self.menu.id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["non_field_errors"][0],
+            "You have already voted for this menu.",
+        )
+
+    def test_queue_full(self):
+        other_menu = Menu.objects.create(
+            restaurant=Restaurant.objects.create(name="Other", owner_id=self.user),
+            date=date.today(),
+        )
+        self.client.post(reverse("vote-list"), {"menu": self.menu.id}, format="json")
+
+        response = self.client.post(
+            reverse("vote-list"), {"menu": other_menu.id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
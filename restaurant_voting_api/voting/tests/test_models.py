@@ -1,10 +1,14 @@
 from datetime import date
+from io import StringIO
 
 from core.models import User
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from restaurants.models import Menu, Restaurant
-from voting.models import Vote
+from voting.models import Vote, VoteTally
 
 
 class VoteModelTest(TestCase):
@@ -33,3 +37,114 @@ class VoteModelTest(TestCase):
         # Test that no votes are returned for a nonexistent date
         votes = Vote.get_votes_for_day(date.today() + timezone.timedelta(days=1))
         self.assertEqual(len(votes), 0)
+
+    def test_cast_vote(self):
+        # Test that a vote is inserted once and a duplicate is ignored
+        other_user = User.objects.create_user(username="other", password="password")
+        self.assertTrue(Vote.cast_vote(other_user.id, self.menu.id))
+        self.assertFalse(Vote.cast_vote(other_user.id, self.menu.id))
+        self.assertEqual(Vote.objects.filter(user=other_user).count(), 1)
+
+    def test_menu_date(self):
+        # Test that the menu date is copied to the votes saved or cast for a future menu
+        other_user = User.objects.create_user(username="other", password="password")
+        future_menu = Menu.objects.create(
+            restaurant=self.restaurant, date=date.today() + timezone.timedelta(days=2)
+        )
+        Vote.cast_vote(other_user.id, future_menu.id)
+
+        self.assertEqual(Vote.objects.get(user=self.user).menu_date, date.today())
+        vote = Vote.objects.get(user=other_user)
+        self.assertEqual(vote.menu_date, future_menu.date)
+        self.assertEqual(vote.vote_date, date.today())
+
+    def test_cast_vote_for_closed_menu(self):
+        # Test that no vote is inserted for a menu from a past day
+        past_menu = Menu.objects.create(
+            restaurant=self.restaurant, date=date.today() - timezone.timedelta(days=1)
+        )
+        self.assertFalse(Vote.cast_vote(self.user.id, past_menu.id))
+        self.assertFalse(Vote.objects.filter(menu=past_menu).exists())
+
+
+class VoteTallyModelTest(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="owner", password="password")
+        self.restaurant = Restaurant.objects.create(
+            name="Test Restaurant", owner_id=self.owner
+        )
+        self.menu = Menu.objects.create(restaurant=self.restaurant, date=date.today())
+        self.users = [
+            User.objects.create_user(username=f"user{index}", password="password")
+            for index in range(3)
+        ]
+
+    def test_tally_follows_votes(self):
+        # Test that votes cast directly and through the ORM are both counted
+        Vote.cast_vote(self.users[0].id, self.menu.id)
+        Vote.objects.create(user=self.users[1], menu=self.menu)
+
+        votes = Vote.get_votes_for_day(date.today())
+        self.assertEqual(len(votes), 1)
+        self.assertEqual(votes[0].vote_count, 2)
+        self.assertEqual(votes[0].restaurant_id, self.restaurant.id)
+
+    def test_tally_follows_deleted_votes(self):
+        # Test that deleting a vote removes it from the tally
+        Vote.objects.create(user=self.users[0], menu=self.menu)
+        Vote.objects.create(user=self.users[1], menu=self.menu)
+        self.users[0].delete()
+
+        self.assertEqual(Vote.get_votes_for_day(date.today())[0].vote_count, 1)
+
+    def test_deleted_votes_do_not_load_their_menus(self):
+        # Test that a cascade delete does not load the menu of every deleted vote
+        other_menu = Menu.objects.create(
+            restaurant=self.restaurant, date=date.today() + timezone.timedelta(days=1)
+        )
+        Vote.objects.create(user=self.users[0], menu=self.menu)
+        Vote.objects.create(user=self.users[0], menu=other_menu)
+
+        with CaptureQueriesContext(connection) as captured:
+            self.users[0].delete()
+
+        menu_table = Menu._meta.db_table
+        self.assertFalse(
+            [query for query in captured if f'FROM "{menu_table}"' in query["sql"]]
+        )
+
+    def test_rebuild_fixes_drift(self):
+        # Test that rebuilding the tallies recounts the votes of the day
+        for user in self.users:
+            Vote.cast_vote(user.id, self.menu.id)
+        VoteTally.objects.filter(menu=self.menu).delete()
+        VoteTally.objects.create(menu=self.menu, date=self.menu.date, count=10)
+
+        drift = VoteTally.rebuild(date.today())
+
+        self.assertEqual(drift, [(self.menu.id, 10, 3)])
+        self.assertEqual(VoteTally.objects.get(menu=self.menu).count, 3)
+        self.assertEqual(VoteTally.rebuild(date.today()), [])
+
+    def test_rebuild_vote_tally_command_check(self):
+        # Test that the command only reports the drift in check mode
+        Vote.cast_vote(self.users[0].id, self.menu.id)
+        VoteTally.objects.filter(menu=self.menu).delete()
+
+        call_command("rebuild_vote_tally", "--check", stdout=StringIO())
+        self.assertFalse(VoteTally.objects.filter(menu=self.menu).exists())
+
+        call_command("rebuild_vote_tally", stdout=StringIO())
+        self.assertEqual(VoteTally.objects.get(menu=self.menu).count, 1)
+
+    @override_settings(VOTE_TALLY_SHARDS=4)
+    def test_tally_shards_are_summed(self):
+        # Test that increments spread over the shards still add up to the votes
+        for _ in range(20):
+            VoteTally.increment(self.menu.id)
+        VoteTally.decrement(self.menu.id)
+
+        self.assertLessEqual(VoteTally.objects.filter(menu=self.menu).count(), 4)
+        self.assertEqual(Vote.get_votes_for_day(date.today())[0].vote_count, 19)
+        self.assertEqual(list(Vote.get_today_menu()), [self.menu])
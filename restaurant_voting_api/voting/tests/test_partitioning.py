@@ -0,0 +1,147 @@
+from datetime import date
+from io import StringIO
+from unittest import skipIf, skipUnless
+
+from core.models import User
+from core.query_plans import get_plans
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from restaurants.models import Menu, Restaurant
+from voting.models import ArchivedVoteSummary, Vote, VoteTally
+from voting.partitioning import (
+    DEFAULT_PARTITION,
+    add_months,
+    convert_to_partitioned,
+    create_partitions,
+    detach_partitions,
+    get_partition_name,
+    get_partitions,
+)
+
+
+class AddMonthsTestCase(TestCase):
+    def test_add_months(self):
+        """Test that the first day of a month is found across years."""
+        self.assertEqual(add_months(date(2026, 11, 18), 2), date(2027, 1, 1))
+        self.assertEqual(add_months(date(2026, 1, 31), -1), date(2025, 12, 1))
+        self.assertEqual(add_months(date(2026, 3, 1), 0), date(2026, 3, 1))
+
+
+@skipIf(connection.vendor == "postgresql", "Partitioning is supported")
+class UnsupportedPartitioningTestCase(TestCase):
+    def test_command_fails(self):
+        """Test that the command fails on the databases without declarative partitioning."""
+        with self.assertRaisesMessage(CommandError, "needs PostgreSQL"):
+            call_command("partition_votes", "--convert")
+
+    def test_convert_fails(self):
+        """Test that converting the votes table reports an unsupported database as a configuration error."""
+        with self.assertRaisesMessage(ImproperlyConfigured, "needs PostgreSQL"):
+            convert_to_partitioned(1)
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning needs PostgreSQL")
+class PartitioningTestCase(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username="owner", password="password")
+        restaurant = Restaurant.objects.create(name="Restaurant", owner_id=owner)
+        self.today = date.today()
+        self.menu = Menu.objects.create(restaurant=restaurant, date=self.today)
+        self.old_menu = Menu.objects.create(
+            restaurant=restaurant, date=add_months(self.today, -2)
+        )
+        self.users = [
+            User.objects.create_user(username=f"user{index}") for index in range(3)
+        ]
+        for user in self.users:
+            Vote.objects.create(user=user, menu=self.menu)
+        Vote.objects.create(user=self.users[0], menu=self.old_menu)
+
+    def test_convert(self):
+        """Test that the votes and their constraints are kept in the partitioned table."""
+        created = convert_to_partitioned(months_ahead=1)
+
+        self.assertEqual(
+            created,
+            [
+                get_partition_name(add_months(self.today, offset))
+                for offset in range(-2, 2)
+            ],
+        )
+        self.assertEqual(Vote.objects.count(), 4)
+        self.assertEqual(Vote.count_votes_by_menu(self.today)[0]["vote_count"], 3)
+        # The unique constraint still rejects a second vote, and new votes get IDs after the copied ones
+        self.assertFalse(Vote.cast_vote(self.users[0].id, self.menu.id))
+        other_user = User.objects.create_user(username="other")
+        self.assertTrue(Vote.cast_vote(other_user.id, self.menu.id))
+        self.assertGreater(
+            Vote.objects.get(user=other_user).id,
+            Vote.objects.exclude(user=other_user).order_by("-id").first().id,
+        )
+
+    def test_partition_pruning(self):
+        """Test that the votes of a day are only read from the partition of its month."""
+        convert_to_partitioned(months_ahead=1)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        current = get_partition_name(self.today)
+        for plan in [
+            *get_plans(Vote.count_votes_by_menu(self.today)),
+            *get_plans(lambda: Vote.is_user_voted(self.users[0], self.menu)),
+        ]:
+            plan = "\n".join(plan)
+            self.assertIn(current, plan)
+            for name in [*get_partitions().values(), DEFAULT_PARTITION]:
+                if name != current:
+                    self.assertNotIn(name, plan)
+
+    def test_misplaced_votes_are_moved(self):
+        """Test that the votes of the default partition are moved to the partition created for their month."""
+        convert_to_partitioned(months_ahead=0)
+        future_menu = Menu.objects.create(
+            restaurant=self.menu.restaurant, date=add_months(self.today, 6)
+        )
+        Vote.cast_vote(self.users[1].id, future_menu.id)
+
+        created = create_partitions(self.today, future_menu.date)
+
+        self.assertIn(get_partition_name(future_menu.date), created)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {DEFAULT_PARTITION}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertTrue(Vote.is_user_voted(self.users[1], future_menu))
+
+    def test_detach(self):
+        """Test that the old partitions are detached without blocking the deletion of their menus."""
+        convert_to_partitioned(months_ahead=0)
+
+        detached = detach_partitions(add_months(self.today, -1))
+
+        self.assertEqual(detached, [get_partition_name(self.old_menu.date)])
+        self.assertFalse(Vote.objects.filter(menu=self.old_menu).exists())
+        # The detached votes still count when the tallies are rebuilt
+        self.assertEqual(VoteTally.rebuild(self.old_menu.date), [])
+        self.assertEqual(
+            ArchivedVoteSummary.objects.get(menu=self.old_menu).vote_count, 1
+        )
+        self.old_menu.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {detached[0]}")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_command(self):
+        """Test that the command converts the table, then only creates the missing partitions."""
+        first_run, second_run = StringIO(), StringIO()
+        call_command("partition_votes", "--convert", stdout=first_run)
+        call_command("partition_votes", "--months-ahead", "4", stdout=second_run)
+
+        self.assertIn(
+            get_partition_name(add_months(self.today, 3)), first_run.getvalue()
+        )
+        self.assertEqual(
+            second_run.getvalue().splitlines()[0],
+            f"Created {get_partition_name(add_months(self.today, 4))}.",
+        )
@@ -0,0 +1,64 @@
+from datetime import date
+
+from core.models import User
+from core.query_plans import QueryPlanAssertionsMixin
+from django.db import connection
+from django.test import TestCase
+from restaurants.models import Menu
+from voting.models import Vote, VoteTally
+from voting.seeding import seed_data
+
+
+class VoteQueryPlanTestCase(QueryPlanAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Enough menus and votes for the planner to prefer the indexes, with statistics to base its choice on
+        seed_data(users=2000, restaurants=50, days=200, items=2, votes=20000)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        cls.user = User.objects.get(username="seed-user-1")
+        cls.menu = Menu.objects.filter(date=date.today()).first()
+
+    def test_count_votes_by_menu(self):
+        """Test that the votes of a day are counted from the menu date index, without a join on the menus."""
+        self.assertUsesIndex(
+            Vote.count_votes_by_menu(date.today()), "vote_menu_date_menu_idx"
+        )
+        self.assertNoFullScan(
+            Vote.count_votes_by_menu(date.today()), "voting_vote", "restaurants_menu"
+        )
+
+    def test_user_votes_of_day(self):
+        """Test that the votes of a user on a day are looked up in the user and menu date index."""
+        self.assertUsesIndex(
+            Vote.objects.filter(user=self.user, menu_date=date.today()),
+            "vote_user_menu_date_idx",
+        )
+
+    def test_get_votes_for_day(self):
+        """Test that the statistics of a day only read the tallies of the day."""
+        self.assertNoFullScan(
+            Vote.get_votes_for_day, "voting_votetally", "restaurants_menu"
+        )
+
+    def test_get_today_menu(self):
+        """Test that the winning menus are ranked from the menus and tallies of today only."""
+        self.assertNoFullScan(
+            lambda: list(Vote.get_today_menu()),
+            "restaurants_menu",
+            "voting_votetally",
+            "restaurants_item",
+        )
+
+    def test_is_user_voted(self):
+        """Test that the vote of a user for a menu is looked up in the unique index."""
+        self.assertNoFullScan(
+            lambda: Vote.is_user_voted(self.user, self.menu), "voting_vote"
+        )
+
+    def test_rebuild(self):
+        """Test that rebuilding the tallies of a day does not scan the votes of the other days."""
+        self.assertNoFullScan(
+            lambda: VoteTally.rebuild(date.today()), "voting_vote", "voting_votetally"
+        )
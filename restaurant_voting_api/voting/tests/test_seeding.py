@@ -0,0 +1,65 @@
+from collections import Counter
+from datetime import date
+
+from core.models import User
+from django.db.models import Sum
+from django.test import TestCase
+from restaurants.models import Item, Menu
+from voting.models import Vote, VoteTally
+from voting.seeding import clear_seed_data, seed_data
+
+
+class SeedDataTestCase(TestCase):
+    def seed(self, **kwargs) -> dict[str, int]:
+        options = {
+            "users": 50,
+            "restaurants": 10,
+            "days": 3,
+            "items": 2,
+            "votes": 120,
+            "seed": 1,
+        }
+        return seed_data(**{**options, **kwargs})
+
+    def get_votes(self) -> list[tuple[str, str, date]]:
+        return sorted(
+            Vote.objects.values_list(
+                "user__username", "menu__restaurant__name", "menu__date"
+            )
+        )
+
+    def test_counts(self):
+        """Test that the requested rows are created and the tallies match the votes."""
+        created = self.seed()
+
+        self.assertEqual(created["menus"], 30)
+        self.assertEqual(Menu.objects.count(), 30)
+        self.assertEqual(Item.objects.count(), 60)
+        self.assertEqual(Vote.objects.count(), 120)
+        self.assertEqual(VoteTally.objects.aggregate(total=Sum("count"))["total"], 120)
+        self.assertIn(date.today(), Menu.objects.values_list("date", flat=True))
+
+    def test_deterministic(self):
+        """Test that the same seed generates the same votes."""
+        self.seed()
+        votes = self.get_votes()
+        clear_seed_data()
+
+        self.seed()
+
+        self.assertEqual(self.get_votes(), votes)
+        self.assertEqual(User.objects.count(), 50)
+
+    def test_skew(self):
+        """Test that the most popular restaurant gets far more votes than the least popular one."""
+        self.seed(votes=150, skew=1.5)
+
+        counts = Counter(
+            Vote.objects.values_list("menu__restaurant", flat=True)
+        ).most_common()
+        self.assertGreater(counts[0][1], 5 * counts[-1][1])
+
+    def test_too_many_votes(self):
+        """Test that more votes than users and days are refused."""
+        with self.assertRaises(ValueError):
+            self.seed(votes=151)
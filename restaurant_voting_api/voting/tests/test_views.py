@@ -1,16 +1,25 @@
-from datetime import date
+import threading
+import time
+from datetime import date, timedelta
+from unittest import mock
 
+from core.cache import get_lock_key
 from core.models import User
+from django.conf import settings
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from restaurants.models import Menu, Restaurant
+from restaurants.models import Item, Menu, Restaurant
+from voting.cache import get_cached_vote_statistics
 from voting.models import Vote
 
 
 class VoteViewTests(APITestCase):
 
     def setUp(self):
+        cache.clear()
+
         # Create a test user
         self.user = User.objects.create_user(username="testuser", password="password")
 
@@ -97,3 +106,203 @@ class VoteViewTests(APITestCase):
         # Assert the response data contains the correct menu
         self.assertEqual(len(response.data), 1)  # Only one menu with max votes
         self.assertEqual(response.data[0]["id"], self.menu.id)
+
+    def test_create_vote_query_count(self):
+        """
+        Test that a successful vote is written with the vote insert and the tally update only.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                self.vote_url, {"menu": self.menu.id}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {"user": self.user.id, "menu": self.menu.id})
+
+    def test_create_duplicate_vote(self):
+        """
+        Test that voting twice for the same menu returns a 400 instead of an IntegrityError.
+        """
+        self.client.force_authenticate(user=self.user)
+        self.client.post(self.vote_url, {"menu": self.menu.id}, format="json")
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                self.vote_url, {"menu": self.menu.id}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["non_field_errors"][0],
+            "You have already voted for this menu.",
+        )
+        self.assertEqual(Vote.objects.count(), 1)
+
+    def test_create_vote_for_past_menu(self):
+        """
+        Test that voting for a menu from a past day is rejected.
+        """
+        past_menu = Menu.objects.create(
+            restaurant=self.restaurant, date=date.today() - timedelta(days=1)
+        )
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            self.vote_url, {"menu": past_menu.id}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["non_field_errors"][0], "Voting for this menu is closed."
+        )
+        self.assertEqual(Vote.objects.count(), 0)
+
+    def test_create_vote_for_nonexistent_menu(self):
+        """
+        Test that voting for a missing menu is rejected.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.vote_url, {"menu": 9999}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["non_field_errors"][0], "The menu does not exist."
+        )
+
+    def test_get_vote_statistics_query_count(self):
+        """
+        Test that the statistics are read from the tallies with a single query regardless of the vote count.
+        """
+        for index in range(5):
+            user = User.objects.create_user(
+                username=f"voter{index}", password="password"
+            )
+            Vote.cast_vote(user.id, self.menu.id)
+
+        self.client.force_authenticate(user=self.user)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.vote_statistics_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["vote_count"], 5)
+        self.assertEqual(response.data[0]["restaurant_id"], self.restaurant.id)
+
+    def test_get_today_menu_query_count(self):
+        """
+        Test that the winning menus are loaded with a constant number of queries as the menus grow.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        for count in (1, 10):
+            for index in range(count):
+                restaurant = Restaurant.objects.create(
+                    name=f"Restaurant {count}-{index}", owner_id=self.user
+                )
+                menu = Menu.objects.create(restaurant=restaurant, date=date.today())
+                Item.objects.create(name="Soup", menu=menu, price=4.5)
+                with self.captureOnCommitCallbacks(execute=True):
+                    Vote.cast_vote(self.user.id, menu.id)
+
+            # Menu winner, items
+            with self.assertNumQueries(2):
+                response = self.client.get(self.vote_detail_url)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data), Vote.objects.count())
+            self.assertEqual(response.data[0]["items"][0]["name"], "Soup")
+
+    def test_get_today_menu_single_winner(self):
+        """
+        Test that only the menu with the most votes is returned.
+        """
+        other_user = User.objects.create_user(username="other", password="password")
+        restaurant = Restaurant.objects.create(name="Other", owner_id=self.user)
+        other_menu = Menu.objects.create(restaurant=restaurant, date=date.today())
+        Vote.cast_vote(self.user.id, self.menu.id)
+        Vote.cast_vote(self.user.id, other_menu.id)
+        Vote.cast_vote(other_user.id, other_menu.id)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.vote_detail_url)
+
+        self.assertEqual([menu["id"] for menu in response.data], [other_menu.id])
+
+    def test_vote_changes_etag(self):
+        """
+        Test that the statistics and the today menu are not modified until a vote is cast.
+        """
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.vote_statistics_url)["ETag"]
+
+        for url in (self.vote_statistics_url, self.vote_detail_url):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.vote_url, {"menu": self.menu.id}, format="json")
+
+        for url in (self.vote_statistics_url, self.vote_detail_url):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_older_statistics_not_served_under_new_etag(self):
+        """
+        Test that statistics cached before a vote are not sent with the new ETag while another worker recomputes them.
+        """
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get(self.vote_statistics_url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Vote.cast_vote(self.user.id, self.menu.id)
+        cache.add(get_lock_key(f"vote-statistics:{date.today()}"), "other-worker", 10)
+
+        with self.settings(
+            VOTE_STATS_CACHE={**settings.VOTE_STATS_CACHE, "LOCK_TIMEOUT": 0.05}
+        ):
+            response = self.client.get(
+                self.vote_statistics_url, HTTP_IF_NONE_MATCH=etag
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response["ETag"], etag)
+            self.assertEqual(response.data[0]["vote_count"], 1)
+
+            response = self.client.get(
+                self.vote_statistics_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_concurrent_statistics_aggregate_once(self):
+        """
+        Test that concurrent requests for uncached statistics run the aggregation a single time.
+        """
+        Vote.cast_vote(self.user.id, self.menu.id)
+        votes = list(Vote.get_votes_for_day())
+        calls = []
+
+        def get_votes_for_day(date_menu=None):
+            calls.append(date_menu)
+            time.sleep(0.2)
+            return votes
+
+        barrier = threading.Barrier(8)
+        results = []
+
+        def request():
+            barrier.wait()
+            results.append(get_cached_vote_statistics())
+
+        with mock.patch.object(Vote, "get_votes_for_day", get_votes_for_day):
+            threads = [threading.Thread(target=request) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result[0]["vote_count"] == 1 for result in results))
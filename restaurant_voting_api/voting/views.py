@@ -1,11 +1,15 @@
+from core.day_version import today_conditional
+from core.metrics import votes_ingested
 from core.views import BaseView
+from django.conf import settings
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
-from restaurants.serializers import MenuSerializer
 
-from .models import Vote
-from .serializers import VoteSerializer, VoteStatisticsSerializer
+from .cache import get_cached_today_menu, get_cached_vote_statistics
+from .ingestion import QueueFull, get_ingestion_queue
+from .serializers import VoteCreateSerializer
 
 
 class VoteView(BaseView):
@@ -20,8 +24,47 @@ class VoteView(BaseView):
         """
         data = request.data
         data["user"] = request.user.id
-        return self.validate_serializer(VoteSerializer(data=data))
 
+        mode = settings.VOTE_INGESTION["MODE"]
+        if mode == "write_behind":
+            response = self.enqueue_vote(VoteCreateSerializer(data=data))
+        else:
+            response = self.validate_serializer(VoteCreateSerializer(data=data))
+
+        if response.status_code in (status.HTTP_201_CREATED, status.HTTP_202_ACCEPTED):
+            votes_ingested.inc(mode=mode)
+        return response
+
+    @staticmethod
+    def enqueue_vote(serializer: VoteCreateSerializer) -> Response:
+        """
+        Method to queue a vote for the write-behind ingestion and return the response
+
+        :param serializer:
+        :return:
+        """
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            reason = get_ingestion_queue().submit(
+                serializer.validated_data["user"], serializer.validated_data["menu"]
+            )
+        except QueueFull:
+            return Response(
+                {"detail": "Too many votes are waiting to be saved. Please retry."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+
+        if reason:
+            return Response(
+                {"non_field_errors": [reason]}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @today_conditional
     def get(self, request: Request):
         """
         Method to get the statistics of the votes for the day
@@ -30,14 +73,13 @@ class VoteView(BaseView):
         :return:
         """
 
-        return self.response_200(
-            VoteStatisticsSerializer(Vote.get_votes_for_day(), many=True)
-        )
+        return Response(get_cached_vote_statistics(), status=status.HTTP_200_OK)
 
 
 class VoteDetailView(BaseView):
     permission_classes = [IsAuthenticated]
 
+    @today_conditional
     def get(self, request: Request) -> Response:
         """
         Method to get today menu
@@ -45,4 +87,4 @@ class VoteDetailView(BaseView):
         :return:
         """
 
-        return self.response_200(MenuSerializer(Vote.get_today_menu(), many=True))
+        return Response(get_cached_today_menu(), status=status.HTTP_200_OK)